@@ -8,6 +8,7 @@ from companies.models import Company
 from trade_data.models import CompanyEmbedding
 from utils.ai_service import AIService
 import logging
+from utils.data_version import bump_data_version
 
 logger = logging.getLogger('zarailink')
 
@@ -65,5 +66,6 @@ class Command(BaseCommand):
                 self.stdout.write(f"✓ Created embedding for: {company.name}")
             else:
                 self.stdout.write(self.style.WARNING(f"✗ Failed to get embedding for: {company.name}"))
-        
+        bump_data_version('generate_embeddings')
+
         self.stdout.write(self.style.SUCCESS(f"\nDone! Created {created_count} embeddings."))
@@ -2,6 +2,7 @@ import pandas as pd
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from companies.models import Company, Sector, CompanyRole, CompanyType
+from utils.data_version import bump_data_version
 
 
 class Command(BaseCommand):
@@ -149,7 +150,8 @@ class Command(BaseCommand):
                         self.style.ERROR(f"Row {idx + 2}: ✗ Error: {str(e)}")
                     )
 
-        
+        bump_data_version('import_companies')
+
         self.stdout.write(self.style.SUCCESS("\n" + "=" * 60))
         self.stdout.write(self.style.SUCCESS(f"Import Complete!"))
         self.stdout.write(self.style.SUCCESS(f"  Created/Updated: {created_count}"))
@@ -4,6 +4,7 @@ from utils.ai_service import AIService
 from utils.redis_client import RedisClient
 import logging
 import time
+from utils.data_version import bump_data_version
 
 logger = logging.getLogger('zarailink')
 
@@ -40,5 +41,6 @@ class Command(BaseCommand):
                 time.sleep(0.1)
             else:
                 self.stdout.write(self.style.WARNING(f"Failed to generate embedding for {company.name}"))
-        
+        bump_data_version('index_companies')
+
         self.stdout.write(self.style.SUCCESS(f"Successfully indexed {count} companies."))
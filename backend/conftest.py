@@ -10,12 +10,25 @@ This file provides:
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import Client
 from rest_framework.test import APIClient
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Empty the cache around every test so cached API responses and the ledger
+    data version never leak between tests (test data is rolled back, not loaded
+    through the commands that bump the version).
+    """
+    cache.clear()
+    yield
+    cache.clear()
+
+
 
 
 
@@ -335,28 +348,52 @@ def redeem_code(create_redeem_code):
 
 
 @pytest.fixture
-def create_transaction(db, supplier_company, buyer_company):
-    """Factory fixture for creating trade transactions."""
-    from trade_data.models import Transaction
+def create_transaction(db):
+    """
+    Factory fixture for ledger transactions: by default an IMPORT of 10 MT of
+    HS 17.01 at 400 USD/MT from Brazil into Pakistan, reported today.
+
+    Usage:
+        def test_ledger(create_transaction):
+            tx = create_transaction(buyer='Acme Foods', seller='Seller A', qty_mt='30', usd_per_mt='450')
+
+    ``usd`` defaults to ``qty_mt * usd_per_mt``; any other Transaction field
+    can be passed as a keyword.
+    """
     from datetime import date
-    
+    from decimal import Decimal
+
+    from trade_data.models import Transaction
+
     def _create_transaction(
-        buyer=None,
-        seller=None,
-        hs_code='1006',
-        product_description='Rice',
-        quantity=1000,
-        value=50000,
+        buyer='Acme Foods',
+        seller='Seller A',
+        reporting_date=None,
+        qty_mt='10',
+        usd_per_mt='400',
+        origin_country='Brazil',
+        destination_country='Pakistan',
+        trade_type='IMPORT',
+        hs_code='17.01',
         **kwargs
     ):
+        qty_mt = Decimal(str(qty_mt)) if qty_mt is not None else None
+        usd_per_mt = Decimal(str(usd_per_mt)) if usd_per_mt is not None else None
+        if qty_mt is not None:
+            kwargs.setdefault('usd', qty_mt * (usd_per_mt or 0))
+        kwargs.setdefault('source_file', 'test.csv')
+        kwargs.setdefault('tx_reference', 'T')
+        kwargs.setdefault('shipping_agent', 'Agent')
         return Transaction.objects.create(
-            buyer=buyer or buyer_company.name,
-            seller=seller or supplier_company.name,
+            buyer=buyer,
+            seller=seller,
+            reporting_date=reporting_date or date.today(),
+            qty_mt=qty_mt,
+            usd_per_mt=usd_per_mt,
+            origin_country=origin_country,
+            destination_country=destination_country,
+            trade_type=trade_type,
             hs_code=hs_code,
-            product_description=product_description,
-            quantity=quantity,
-            value=value,
-            reporting_date=kwargs.pop('reporting_date', date.today()),
             **kwargs
         )
     return _create_transaction
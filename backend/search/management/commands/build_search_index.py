@@ -5,6 +5,7 @@ from django.core.management.base import BaseCommand
 from django.conf import settings
 from trade_data.models import ProductSubCategory
 from sentence_transformers import SentenceTransformer
+from utils.data_version import bump_data_version
 
 class Command(BaseCommand):
     help = 'Builds the semantic search index for Product Subcategories'
@@ -37,5 +38,6 @@ class Command(BaseCommand):
                 'hs_codes': hs_codes,
                 'embeddings': embeddings
             }, f)
-            
+        bump_data_version('build_search_index')
+
         self.stdout.write(self.style.SUCCESS(f"Index built successfully at {index_path}"))
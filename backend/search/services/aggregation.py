@@ -16,8 +16,39 @@ class SupplierAggregator:
             volume_filter: Minimum volume capability (Max shipment size).
             time_filter: Dict with 'start_date' and 'end_date'.
         """
+        results, target_field, country_field = self.build_queryset(
+            subcategory_ids,
+            intent=intent,
+            scope=scope,
+            country_filter=country_filter,
+            price_filter=price_filter,
+            volume_filter=volume_filter,
+            time_filter=time_filter,
+        )
+
+        # Convert to list
+        counterparties = []
+        for r in results:
+            counterparties.append({
+                "name": r[target_field],
+                "country": r[country_field],
+                "total_volume": float(r['total_volume'] or 0),
+                "avg_price": float(r['avg_price']) if r['avg_price'] is not None else None,
+                "shipment_count": r['shipment_count'],
+                "last_shipment_date": r['last_shipment_date'],
+                "max_shipment_vol": float(r['max_shipment_vol'] or 0),
+                "type": "Buyer" if intent == 'SELL' else "Supplier"
+            })
+            
+        return counterparties
+
+    def build_queryset(self, subcategory_ids, intent='BUY', scope='WORLDWIDE', country_filter=None, price_filter=None, volume_filter=None, time_filter=None):
+        """
+        Builds the aggregated counterparty QuerySet used by get_suppliers_for_subcategories.
+        Returns (queryset, target_field, country_field) so callers can inspect the SQL/plan.
+        """
         queryset = Transaction.objects.filter(
-            product_item__sub_category_id__in=subcategory_ids
+            sub_category_id__in=subcategory_ids
         )
         
         # Default Scope
@@ -93,22 +124,8 @@ class SupplierAggregator:
             )
             
         results = results.order_by('-total_volume')
-        
-        # Convert to list
-        counterparties = []
-        for r in results:
-            counterparties.append({
-                "name": r[target_field],
-                "country": r[country_field],
-                "total_volume": float(r['total_volume'] or 0),
-                "avg_price": float(r['avg_price']) if r['avg_price'] is not None else None,
-                "shipment_count": r['shipment_count'],
-                "last_shipment_date": r['last_shipment_date'],
-                "max_shipment_vol": float(r['max_shipment_vol'] or 0),
-                "type": "Buyer" if intent == 'SELL' else "Supplier"
-            })
-            
-        return counterparties
+
+        return results, target_field, country_field
 
 
     def get_supplier_details(self, name, subcategory_ids, intent='BUY'):
@@ -123,7 +140,7 @@ class SupplierAggregator:
             filter_kwargs = {'seller': name}
 
         queryset = Transaction.objects.filter(
-            product_item__sub_category_id__in=subcategory_ids,
+            sub_category_id__in=subcategory_ids,
             **filter_kwargs
         ).order_by('-reporting_date')
 
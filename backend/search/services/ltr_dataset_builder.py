@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 from trade_data.models import ProductSubCategory, Transaction
 from .aggregation import SupplierAggregator
+from trade_ledger.services.snapshots import read_ledger_snapshot
 from .ranking_ltr import FeatureExtractor, FAMILY_WEIGHTS, DEFAULT_WEIGHTS
 
 
@@ -18,6 +19,21 @@ class LTRDatasetBuilder:
     """
     Builds a synthetic dataset for LTR training from historical transactions.
     """
+    def _subcategory_trade_types(self):
+        """
+        (sub_category_id, trade_type) pairs present in the ledger, read from the
+        Parquet snapshot when one has been exported.
+        """
+        df = read_ledger_snapshot(['sub_category_id', 'trade_type'])
+        if df is not None:
+            df = df.dropna().drop_duplicates()
+            return {(int(sid), str(tt)) for sid, tt in df.itertuples(index=False, name=None)}
+        return set(
+            Transaction.objects.order_by()
+            .values_list('sub_category_id', 'trade_type')
+            .distinct()
+        )
+
     def build_dataset(self):
         """
         Generates X (features), y (labels), group (query boundaries).
@@ -30,9 +46,11 @@ class LTRDatasetBuilder:
         all_labels = []
         groups = []
 
+        available = self._subcategory_trade_types()
+
         for subcat in subcats:
-            has_imports = Transaction.objects.filter(product_item__sub_category=subcat, trade_type='IMPORT').exists()
-            has_exports = Transaction.objects.filter(product_item__sub_category=subcat, trade_type='EXPORT').exists()
+            has_imports = (subcat.id, 'IMPORT') in available
+            has_exports = (subcat.id, 'EXPORT') in available
 
             if not has_imports and not has_exports:
                 continue
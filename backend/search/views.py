@@ -7,6 +7,7 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from django.utils.decorators import method_decorator
 
 from .services.nlp import QueryMatcher
 from .services.aggregation import SupplierAggregator
@@ -14,6 +15,20 @@ from .services.ranking import ComparableFinder
 from .services.ranking_ltr import RankingEnsemble
 from .services.query_parser import QueryInterpreter
 from trade_data.models import Transaction
+from utils.conditional import conditional_on_data_version
+from utils.streaming_export import EXPORT_FORMATS, export_response
+
+SEARCH_EXPORT_COLUMNS = [
+    ('name', 'Name'),
+    ('type', 'Type'),
+    ('country', 'Country'),
+    ('total_volume', 'Total Volume (MT)'),
+    ('avg_price', 'Avg Price (USD/MT)'),
+    ('shipment_count', 'Shipments'),
+    ('max_shipment_vol', 'Largest Shipment (MT)'),
+    ('last_shipment_date', 'Last Shipment'),
+    ('volume_fit', 'Volume Fit'),
+]
 
 # Module-level singleton to avoid reloading LTR model per request
 _ranking_ensemble = None
@@ -30,15 +45,42 @@ class SearchViewSet(viewsets.ViewSet):
     """
     permission_classes = [AllowAny]
 
+    @method_decorator(conditional_on_data_version)
     def list(self, request):
         """
         GET /api/search/query/?q=...
         """
+        data, status = self._search(request)
+        return Response(data, status=status)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        GET /api/search/export/?q=...&fmt=csv|xlsx
+        Streams the ranked result list of the same query as a CSV/XLSX download.
+        """
+        fmt = request.query_params.get('fmt', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return Response({"error": f"fmt must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+
+        data, status = self._search(request)
+        if status != 200:
+            return Response(data, status=status)
+        return export_response(
+            iter(data.get('results', [])),
+            SEARCH_EXPORT_COLUMNS,
+            filename='search_results',
+            fmt=fmt,
+            sheet_title='Search Results',
+        )
+
+    def _search(self, request):
+        """Runs the search pipeline for ``request``; returns (response data, HTTP status)."""
         query = request.query_params.get('q', '').strip()
         scope_param = request.query_params.get('scope', None)
 
         if not query:
-            return Response({"error": "Query parameter 'q' is required"}, status=400)
+            return {"error": "Query parameter 'q' is required"}, 400
 
         # 0. Query Interpretation (with explicit scope)
         interpreter = QueryInterpreter()
@@ -133,14 +175,14 @@ class SearchViewSet(viewsets.ViewSet):
                     conflict_msg = f"You are searching for Pakistani suppliers but specified {', '.join(non_pakistan_countries)} as a country filter. Switch scope to Worldwide to search international suppliers."
                 else:
                     conflict_msg = f"You are searching for Pakistani buyers but specified {', '.join(non_pakistan_countries)} as a country filter. Switch scope to Worldwide to search international buyers."
-                return Response({
+                return {
                     "query": query,
                     "parsed_query": parsed_query,
                     "error": "scope_country_conflict",
                     "message": conflict_msg,
                     "results": [],
                     "count": 0
-                })
+                }, 200
 
         # 1. NLP: Match query to subcategories
         # Only run NLP if we have a real product term (not empty after stopword removal)
@@ -164,7 +206,7 @@ class SearchViewSet(viewsets.ViewSet):
                 if not product_text:
                     browse_all_search = True
                     all_subcategory_ids = list(
-                        Transaction.objects.values_list('product_item__sub_category_id', flat=True)
+                        Transaction.objects.order_by().values_list('sub_category_id', flat=True)
                         .distinct()[:50]
                     )
                     if all_subcategory_ids:
@@ -199,13 +241,13 @@ class SearchViewSet(viewsets.ViewSet):
                     else:
                         results = []
                 else:
-                    return Response({
+                    return {
                         "query": query,
                         "parsed_query": parsed_query,
                         "matched_subcategories": [],
                         "results": [],
                         "message": f"No matching products found for \"{nlp_search_term}\". Try searching for a product name like 'dextrose', 'sugar', or 'urea'."
-                    })
+                    }, 200
 
         if not company_name_search and not browse_all_search:
             # Normal product-based search path
@@ -295,9 +337,10 @@ class SearchViewSet(viewsets.ViewSet):
             entity_type = "buyers" if intent == "SELL" else "suppliers"
             response_data["message"] = f"Browsing all {entity_type}"
 
-        return Response(response_data)
+        return response_data, 200
 
     @action(detail=False, methods=['get'], url_path='supplier-detail')
+    @method_decorator(conditional_on_data_version)
     def supplier_detail(self, request):
         """
         GET /api/search/supplier-detail/?name=XYZ&query=dextrose&intent=BUY&scope=WORLDWIDE
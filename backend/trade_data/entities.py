@@ -0,0 +1,107 @@
+"""
+Buyer/seller name normalization and resolution to TradeEntity ids.
+
+Ledger rows carry free-text company names. Each name is normalized
+(Unicode-folded, upper-cased, punctuation and whitespace collapsed) and mapped
+to one TradeEntity row, so grouping, counting and graph jobs can work on
+integer keys. Blank and placeholder names ("Unknown", "N/A", ...) resolve to
+``None`` instead of collapsing into one giant pseudo-company.
+"""
+
+import re
+import unicodedata
+
+from trade_data.models import TradeEntity
+
+
+PLACEHOLDER_NAMES = {'', 'UNKNOWN', 'NAN', 'NONE', 'NULL', 'N/A', 'NA', '-'}
+
+ROLE_FLAGS = {'buyer': 'is_buyer', 'seller': 'is_seller'}
+
+_PUNCTUATION_RE = re.compile(r"[.,;:'\"`]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_entity_name(name):
+    """
+    Canonical form of a company name, or '' for blank/placeholder names.
+
+    >>> normalize_entity_name('  Acme Foods (Pvt.) Ltd. ')
+    'ACME FOODS (PVT) LTD'
+    """
+    if name is None:
+        return ''
+    text = unicodedata.normalize('NFKC', str(name)).upper()
+    text = _PUNCTUATION_RE.sub('', text)
+    text = _WHITESPACE_RE.sub(' ', text).strip()
+    if text in PLACEHOLDER_NAMES:
+        return ''
+    return text[:500]
+
+
+def resolve_entity(name, role, country=None):
+    """
+    TradeEntity id for ``name`` acting as ``role`` ('buyer' or 'seller'),
+    creating the entity if needed. Returns None for placeholder names.
+    """
+    normalized = normalize_entity_name(name)
+    if not normalized:
+        return None
+
+    flag = ROLE_FLAGS[role]
+    entity, created = TradeEntity.objects.get_or_create(
+        normalized_name=normalized,
+        defaults={'name': str(name).strip()[:500], flag: True, 'country': country or 'Unknown'},
+    )
+    if not created and not getattr(entity, flag):
+        TradeEntity.objects.filter(pk=entity.pk).update(**{flag: True})
+    return entity.pk
+
+
+class EntityResolver:
+    """
+    In-memory cache in front of resolve_entity for ingestion loops.
+
+    Usage:
+        resolver = EntityResolver()
+        tx.buyer_entity_id = resolver.resolve(row['buyer'], 'buyer', 'Pakistan')
+    """
+
+    def __init__(self, preload=True):
+        # normalized name -> [id, is_buyer, is_seller]
+        self._cache = {}
+        if preload:
+            for pk, normalized, is_buyer, is_seller in TradeEntity.objects.values_list(
+                'id', 'normalized_name', 'is_buyer', 'is_seller'
+            ).iterator(chunk_size=10000):
+                self._cache[normalized] = [pk, is_buyer, is_seller]
+
+    def __len__(self):
+        return len(self._cache)
+
+    def resolve(self, name, role, country=None):
+        normalized = normalize_entity_name(name)
+        if not normalized:
+            return None
+
+        slot = 1 if role == 'buyer' else 2
+        cached = self._cache.get(normalized)
+        if cached is None:
+            pk = resolve_entity(name, role, country)
+            cached = self._cache[normalized] = [pk, role == 'buyer', role == 'seller']
+        elif not cached[slot]:
+            TradeEntity.objects.filter(pk=cached[0]).update(**{ROLE_FLAGS[role]: True})
+        cached[slot] = True
+        return cached[0]
+
+
+def canonical_name_map():
+    """
+    {entity id: display name of its canonical entity}, after name variants
+    were merged by resolve_trade_entities.
+    """
+    names = dict(TradeEntity.objects.values_list('id', 'name'))
+    return {
+        pk: names.get(canonical_id or pk, names[pk])
+        for pk, canonical_id in TradeEntity.objects.values_list('id', 'canonical_entity_id')
+    }
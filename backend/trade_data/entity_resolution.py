@@ -0,0 +1,158 @@
+"""
+Offline clustering of TradeEntity name variants ("ABC SUGAR MILLS (PVT) LTD",
+"A.B.C Sugar Mills", ...) with MinHash locality-sensitive hashing.
+
+Pipeline (run by the ``resolve_trade_entities`` command):
+
+1. ``resolution_key``: the normalized name with legal-form words
+   (PVT, LTD, LIMITED, CO, ...) and non-alphanumerics removed.
+2. Character shingles of the key, hashed once to 32-bit ints.
+3. MinHash signatures (numpy, ``num_perm`` universal hash functions).
+4. LSH banding: names whose signatures agree on every row of at least one
+   band land in the same bucket. Only names sharing a bucket are compared,
+   so the work grows with the number of names rather than its square.
+5. Exact Jaccard similarity of the shingle sets within each bucket, with a
+   union-find over the pairs that pass ``threshold``.
+
+The result is a list of clusters (lists of entity ids); the command picks the
+most-traded member of each cluster as its canonical entity.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+from itertools import combinations
+
+import numpy as np
+
+
+LEGAL_FORM_WORDS = {
+    'PVT', 'PRIVATE', 'LTD', 'LIMITED', 'CO', 'COMPANY', 'CORP', 'CORPORATION',
+    'INC', 'INCORPORATED', 'LLC', 'LLP', 'PLC', 'SMC', 'GMBH', 'SA', 'SPA', 'BV',
+    'AG', 'FZE', 'FZCO', 'FZ', 'M/S', 'MS', 'THE', 'AND', '&',
+}
+
+MERSENNE_PRIME = (1 << 31) - 1
+_TOKEN_RE = re.compile(r"[A-Z0-9&/]+")
+
+
+def resolution_key(normalized_name):
+    """
+    Blocking/comparison key: legal-form words dropped, tokens concatenated
+    without separators so "A B C" and "ABC" agree.
+
+    >>> resolution_key('ABC SUGAR MILLS (PVT) LTD')
+    'ABCSUGARMILLS'
+    >>> resolution_key('A B C SUGAR MILLS')
+    'ABCSUGARMILLS'
+    """
+    tokens = [t for t in _TOKEN_RE.findall(normalized_name.upper()) if t not in LEGAL_FORM_WORDS]
+    key = ''.join(re.sub(r"[^A-Z0-9]", '', t) for t in tokens)
+    # A name made only of legal-form words keeps its raw characters.
+    return key or re.sub(r"[^A-Z0-9]", '', normalized_name.upper())
+
+
+def shingles(key, size=3):
+    """Set of hashed character shingles of ``key``."""
+    if len(key) <= size:
+        return {zlib.crc32(key.encode('utf-8'))}
+    return {zlib.crc32(key[i:i + size].encode('utf-8')) for i in range(len(key) - size + 1)}
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """Universal hash family h(x) = (a*x + b) mod p, vectorized over all permutations."""
+
+    def __init__(self, num_perm=64, seed=42):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self.b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+
+    def signature(self, shingle_set):
+        values = np.fromiter(shingle_set, dtype=np.int64, count=len(shingle_set)) % MERSENNE_PRIME
+        # (num_perm, n_shingles); a*x < 2**62 so int64 does not overflow.
+        hashed = (np.outer(self.a, values) + self.b[:, None]) % MERSENNE_PRIME
+        return hashed.min(axis=1)
+
+
+def lsh_candidate_pairs(signatures, bands, max_bucket_size=200):
+    """
+    Pairs of indexes into ``signatures`` (shape (n, num_perm)) that share at
+    least one LSH bucket. Oversized buckets (usually generic names such as
+    "TRADING") are skipped rather than exploding into quadratic work.
+    """
+    n, num_perm = signatures.shape
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+    rows = num_perm // bands
+
+    pairs = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for idx in range(n):
+            buckets[block[idx].tobytes()].append(idx)
+        for members in buckets.values():
+            if 1 < len(members) <= max_bucket_size:
+                pairs.update(combinations(members, 2))
+    return pairs
+
+
+class UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[ry] = rx
+
+
+def cluster_names(names, threshold=0.7, num_perm=64, bands=16, max_bucket_size=200):
+    """
+    Groups ``names`` (list of (entity_id, normalized_name)) into clusters of
+    likely duplicates. Returns (clusters, stats) where clusters only lists
+    groups with more than one member.
+    """
+    keys = [resolution_key(name) for _, name in names]
+    shingle_sets = [shingles(key) for key in keys]
+
+    if names:
+        hasher = MinHasher(num_perm=num_perm)
+        signatures = np.vstack([hasher.signature(s) for s in shingle_sets])
+        candidates = lsh_candidate_pairs(signatures, bands, max_bucket_size=max_bucket_size)
+    else:
+        candidates = set()
+
+    uf = UnionFind(len(names))
+    matched = 0
+    for i, j in candidates:
+        if keys[i] == keys[j] or jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+            uf.union(i, j)
+            matched += 1
+
+    groups = defaultdict(list)
+    for idx, (entity_id, _) in enumerate(names):
+        groups[uf.find(idx)].append(entity_id)
+    clusters = [members for members in groups.values() if len(members) > 1]
+
+    stats = {
+        'names': len(names),
+        'candidate_pairs': len(candidates),
+        'matched_pairs': matched,
+        'clusters': len(clusters),
+        'entities_after': len(groups),
+    }
+    return clusters, stats
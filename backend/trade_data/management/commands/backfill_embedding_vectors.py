@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+from django.db.models import Max, Min
+
+from trade_data.models import CompanyEmbedding, ProductEmbedding
+from trade_data.vectors import VECTOR_DTYPES, default_vector_dtype
+from utils.data_version import bump_data_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfills the binary CompanyEmbedding.vector / ProductEmbedding.vector "
+        "columns from the JSON embedding lists, in id-range batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Embedding ids covered by each batch",
+        )
+        parser.add_argument(
+            "--dtype",
+            choices=sorted(VECTOR_DTYPES),
+            default=None,
+            help="Storage precision (default: settings.EMBEDDING_VECTOR_DTYPE or float32)",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-encode every row (e.g. to switch precision), not just rows without a vector",
+        )
+
+    def handle(self, *args, **options):
+        dtype = options["dtype"] or default_vector_dtype()
+        total = 0
+        for model in (CompanyEmbedding, ProductEmbedding):
+            total += self._backfill(model, dtype, options["batch_size"], options["all"])
+
+        bump_data_version("backfill_embedding_vectors")
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {total} embedding vectors as {dtype}."))
+
+    def _backfill(self, model, dtype, batch_size, everything):
+        name = model._meta.verbose_name_plural
+        bounds = model.objects.aggregate(lo=Min("id"), hi=Max("id"))
+        if bounds["lo"] is None:
+            self.stdout.write(self.style.WARNING(f"No {name} found - nothing to backfill."))
+            return 0
+
+        updated = 0
+        for start in range(bounds["lo"], bounds["hi"] + 1, batch_size):
+            batch = model.objects.filter(id__gte=start, id__lt=start + batch_size)
+            if not everything:
+                batch = batch.filter(vector__isnull=True)
+            rows = list(batch.only("id", "embedding"))
+            for row in rows:
+                row.sync_vector(dtype)
+            with db_transaction.atomic():
+                model.objects.bulk_update(rows, ["vector", "vector_dtype"])
+            updated += len(rows)
+
+            self.stdout.write(f"  {name} ids {start}..{start + batch_size - 1}: {updated} updated so far")
+        return updated
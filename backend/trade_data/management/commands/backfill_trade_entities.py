@@ -0,0 +1,67 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+from django.db.models.functions import Now
+
+from trade_data.entities import EntityResolver
+from trade_data.models import Transaction
+from utils.data_version import bump_data_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates TradeEntity rows for every distinct buyer/seller name and fills "
+        "Transaction.buyer_entity / Transaction.seller_entity."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--names-per-update",
+            type=int,
+            default=500,
+            help="Raw names matched by each UPDATE ... WHERE name IN (...)",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-resolve every row, not just rows without an entity",
+        )
+
+    def handle(self, *args, **options):
+        resolver = EntityResolver()
+        self.stdout.write(f"Loaded {len(resolver)} existing entities.")
+
+        # (name field, entity field, role, country field for new entities)
+        sides = [
+            ("buyer", "buyer_entity", "buyer", "destination_country"),
+            ("seller", "seller_entity", "seller", "origin_country"),
+        ]
+        for name_field, entity_field, role, country_field in sides:
+            rows = Transaction.objects.order_by()
+            if not options["all"]:
+                rows = rows.filter(**{f"{entity_field}__isnull": True})
+            pairs = rows.values_list(name_field, country_field).distinct()
+
+            names_by_entity = defaultdict(set)
+            for raw_name, country in pairs.iterator(chunk_size=10000):
+                entity_id = resolver.resolve(raw_name, role, country)
+                if entity_id is not None:
+                    names_by_entity[entity_id].add(raw_name)
+
+            updated = self.update_side(names_by_entity, name_field, entity_field, options["names_per_update"])
+            self.stdout.write(self.style.SUCCESS(
+                f"{role}: {len(names_by_entity)} entities, {updated} transactions updated."
+            ))
+        bump_data_version("backfill_trade_entities")
+
+    def update_side(self, names_by_entity, name_field, entity_field, names_per_update):
+        updated = 0
+        for entity_id, names in names_by_entity.items():
+            names = sorted(names)
+            with db_transaction.atomic():
+                for start in range(0, len(names), names_per_update):
+                    updated += Transaction.objects.filter(
+                        **{f"{name_field}__in": names[start:start + names_per_update]}
+                    ).update(**{f"{entity_field}_id": entity_id}, ingested_at=Now())
+        return updated
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+from django.db.models.functions import Now
+
+from trade_data.models import ProductItem, Transaction
+from utils.data_version import bump_data_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfills the denormalized Transaction.sub_category / Transaction.category "
+        "keys from product_item, in id-range batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20000,
+            help="Transaction ids covered by each UPDATE",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every row (e.g. after products were moved between sub-categories), not just missing keys",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        bounds = Transaction.objects.aggregate(lo=Min("id"), hi=Max("id"))
+        if bounds["lo"] is None:
+            self.stdout.write(self.style.WARNING("No transactions found - nothing to backfill."))
+            return
+
+        item_keys = ProductItem.objects.filter(pk=OuterRef("product_item_id"))
+        sub_category = Subquery(item_keys.values("sub_category_id")[:1])
+        category = Subquery(item_keys.values("sub_category__category_id")[:1])
+
+        updated = 0
+        cleared = 0
+        for start in range(bounds["lo"], bounds["hi"] + 1, batch_size):
+            batch = Transaction.objects.filter(id__gte=start, id__lt=start + batch_size)
+            with db_transaction.atomic():
+                mapped = batch.filter(product_item__isnull=False)
+                if not options["all"]:
+                    mapped = mapped.filter(sub_category__isnull=True)
+                # update() skips auto_now: stamp ingested_at so aggregates/snapshots see the change.
+                updated += mapped.update(sub_category_id=sub_category, category_id=category, ingested_at=Now())
+
+                # Rows whose product item was deleted (SET_NULL) keep stale keys.
+                cleared += batch.filter(
+                    product_item__isnull=True, sub_category__isnull=False
+                ).update(sub_category=None, category=None, ingested_at=Now())
+
+            self.stdout.write(f"  ids {start}..{start + batch_size - 1}: {updated} updated so far")
+
+        bump_data_version("backfill_transaction_product_keys")
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled product keys on {updated} transactions ({cleared} cleared)."
+        ))
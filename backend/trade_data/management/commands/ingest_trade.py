@@ -8,6 +8,8 @@ from trade_data.models import (
     ProductItem,
 )
 from django.db import transaction as db_transaction
+from trade_data.entities import EntityResolver
+from utils.data_version import bump_data_version
 
 
 class Command(BaseCommand):
@@ -62,6 +64,7 @@ class Command(BaseCommand):
             raise ValueError(f"[ERROR] Missing columns in file: {missing}")
 
         transactions_to_create = []
+        entity_resolver = EntityResolver()
 
         # -------------------------
         # Ingestion
@@ -136,10 +139,14 @@ class Command(BaseCommand):
 
                     hs_code=hs_code_full,
                     product_item=product_item,
+                    sub_category=sub_category,
+                    category=category,
 
                     buyer=str(row["buyer"]),
                     seller=str(row["seller"]),
                     shipping_agent=str(row["shipping_agents"]),
+                    buyer_entity_id=entity_resolver.resolve(row["buyer"], "buyer", destination_country),
+                    seller_entity_id=entity_resolver.resolve(row["seller"], "seller", origin_country),
 
                     origin_country=origin_country,
                     destination_country=destination_country,
@@ -162,6 +169,8 @@ class Command(BaseCommand):
                     transactions_to_create,
                     ignore_conflicts=True
                 )
+                # Bump only once the rows are visible to other connections.
+                db_transaction.on_commit(lambda: bump_data_version('ingest_trade'))
 
                 self.stdout.write(
                     self.style.SUCCESS(
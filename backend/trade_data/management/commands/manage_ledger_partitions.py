@@ -0,0 +1,109 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from trade_data.partitioning import (
+    TABLE,
+    PartitioningError,
+    convert_to_partitioned,
+    create_future_partitions,
+    detach_partitions,
+    get_partition_settings,
+    is_partitioned,
+    list_partitions,
+)
+from utils.data_version import bump_data_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Manages reporting_date range partitions of the Transaction table: "
+        "status, one-off conversion of the existing table, creating upcoming "
+        "partitions and detaching old ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "action",
+            choices=["status", "convert", "create", "detach"],
+            help="status | convert (one-off, rewrites the table) | create (upcoming partitions) | detach (old partitions)",
+        )
+        parser.add_argument("--granularity", choices=["month", "year"], default=None,
+                            help="Partition size for convert (defaults to LEDGER_PARTITIONING)")
+        parser.add_argument("--by-trade-type", action="store_true",
+                            help="Sub-partition each period by trade_type on convert")
+        parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=None,
+                            help="Create partitions from this date on convert, even if no data exists yet")
+        parser.add_argument("--ahead", type=int, default=None,
+                            help="Periods to create beyond the current one (defaults to LEDGER_PARTITIONING['premake'])")
+        parser.add_argument("--older-than", type=date.fromisoformat, default=None,
+                            help="Detach partitions that end on or before this date (YYYY-MM-DD)")
+        parser.add_argument("--archive-schema", type=str, default=None,
+                            help="Move detached partitions into this schema")
+        parser.add_argument("--drop", action="store_true",
+                            help="Drop detached partitions instead of keeping them as plain tables")
+
+    def handle(self, *args, **options):
+        action = options["action"]
+        try:
+            if action == "status":
+                self.show_status()
+            elif action == "convert":
+                self.convert(options)
+            elif action == "create":
+                created = create_future_partitions(periods=options["ahead"])
+                self.report_created(created)
+            elif action == "detach":
+                self.detach(options)
+        except PartitioningError as e:
+            raise CommandError(str(e))
+
+    def show_status(self):
+        conf = get_partition_settings()
+        if not is_partitioned():
+            self.stdout.write(self.style.WARNING(
+                f"{TABLE} is not partitioned. Configured granularity: {conf['granularity']}."
+            ))
+            return
+
+        partitions = list_partitions()
+        self.stdout.write(self.style.SUCCESS(f"{TABLE} has {len(partitions)} partition(s):"))
+        for name, lower, upper in partitions:
+            bounds = f"{lower} .. {upper}" if lower else "DEFAULT"
+            self.stdout.write(f"  {name}: {bounds}")
+
+    def convert(self, options):
+        self.stdout.write(self.style.WARNING(
+            f"Converting {TABLE} to a partitioned table. This copies every row inside one transaction."
+        ))
+        created = convert_to_partitioned(
+            granularity=options["granularity"],
+            by_trade_type=options["by_trade_type"] or None,
+            first=options["date_from"],
+        )
+        self.report_created(created)
+
+    def detach(self, options):
+        if not options["older_than"]:
+            raise CommandError("detach requires --older-than YYYY-MM-DD")
+        if options["drop"] and options["archive_schema"]:
+            raise CommandError("Use either --drop or --archive-schema, not both")
+
+        detached = detach_partitions(
+            options["older_than"],
+            archive_schema=options["archive_schema"],
+            drop=options["drop"],
+        )
+        if not detached:
+            self.stdout.write(self.style.WARNING("No partitions old enough to detach."))
+            return
+        for name in detached:
+            self.stdout.write(f"  detached {name}")
+        # The detached rows left the ledger: cached results and freshness checks are stale.
+        bump_data_version("manage_ledger_partitions detach")
+        self.stdout.write(self.style.SUCCESS(f"Detached {len(detached)} partition(s)."))
+
+    def report_created(self, created):
+        for name in created:
+            self.stdout.write(f"  created {name}")
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partition(s)."))
@@ -0,0 +1,89 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+from django.db.models import Count
+
+from trade_data.entity_resolution import cluster_names
+from trade_data.models import TradeEntity, Transaction
+from utils.data_version import bump_data_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Clusters TradeEntity name variants with MinHash LSH and points every "
+        "variant at one canonical entity (TradeEntity.canonical_entity)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold", type=float, default=0.7,
+                            help="Minimum Jaccard similarity of name shingles to merge two names")
+        parser.add_argument("--num-perm", type=int, default=64, help="MinHash signature length")
+        parser.add_argument("--bands", type=int, default=16,
+                            help="LSH bands (num-perm must be divisible by this); more bands = more recall")
+        parser.add_argument("--max-bucket-size", type=int, default=200,
+                            help="Skip LSH buckets larger than this (generic names)")
+        parser.add_argument("--dry-run", action="store_true", help="Report clusters without writing")
+        parser.add_argument("--show", type=int, default=20, help="Print this many of the largest clusters")
+
+    def handle(self, *args, **options):
+        names = list(TradeEntity.objects.order_by("id").values_list("id", "normalized_name"))
+        self.stdout.write(f"Clustering {len(names)} entity names...")
+
+        clusters, stats = cluster_names(
+            names,
+            threshold=options["threshold"],
+            num_perm=options["num_perm"],
+            bands=options["bands"],
+            max_bucket_size=options["max_bucket_size"],
+        )
+        self.stdout.write(
+            f"{stats['candidate_pairs']} candidate pairs, {stats['matched_pairs']} matched, "
+            f"{stats['clusters']} clusters: {stats['names']} -> {stats['entities_after']} entities."
+        )
+
+        activity = self.trade_counts()
+        display = dict(TradeEntity.objects.values_list("id", "name"))
+        canonical = {}
+        for members in clusters:
+            # Most-traded variant wins; shortest name breaks ties.
+            root = max(members, key=lambda pk: (activity[pk], -len(display[pk]), -pk))
+            for pk in members:
+                canonical[pk] = None if pk == root else root
+
+        for members in sorted(clusters, key=len, reverse=True)[:options["show"]]:
+            root = next(pk for pk in members if canonical[pk] is None)
+            variants = ", ".join(display[pk] for pk in members if pk != root)
+            self.stdout.write(f"  {display[root]} <- {variants}")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run - nothing written."))
+            return
+
+        with db_transaction.atomic():
+            # Entities that are no longer in any cluster become canonical again.
+            TradeEntity.objects.exclude(pk__in=list(canonical)).filter(
+                canonical_entity__isnull=False
+            ).update(canonical_entity=None)
+            entities = list(TradeEntity.objects.filter(pk__in=list(canonical)))
+            for entity in entities:
+                entity.canonical_entity_id = canonical[entity.pk]
+            TradeEntity.objects.bulk_update(entities, ["canonical_entity"], batch_size=2000)
+
+        bump_data_version("resolve_trade_entities")
+        self.stdout.write(self.style.SUCCESS(
+            f"Linked {sum(1 for v in canonical.values() if v)} variants to {len(clusters)} canonical entities."
+        ))
+
+    def trade_counts(self):
+        counts = Counter()
+        for field in ("buyer_entity", "seller_entity"):
+            rows = (
+                Transaction.objects.order_by()
+                .filter(**{f"{field}__isnull": False})
+                .values(field)
+                .annotate(n=Count("id"))
+                .values_list(field, "n")
+            )
+            counts.update(dict(rows))
+        return counts
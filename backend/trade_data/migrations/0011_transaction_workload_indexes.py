@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_data', '0010_remove_aggcompanymonthproduct_company_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='trade_data__buyer_7bec3d_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='trade_data__seller_e13850_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='trade_data__trade_t_584967_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='trade_data__origin__9d8dad_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='trade_data__destina_dcf34b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['trade_type', 'destination_country', 'product_item', 'reporting_date'], include=('seller', 'origin_country', 'qty_mt', 'usd_per_mt'), name='txn_type_dest_item_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['trade_type', 'origin_country', 'product_item', 'reporting_date'], include=('buyer', 'destination_country', 'qty_mt', 'usd_per_mt'), name='txn_type_origin_item_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['buyer', 'reporting_date'], include=('seller', 'qty_mt', 'usd'), name='txn_buyer_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['seller', 'reporting_date'], include=('buyer', 'qty_mt', 'usd'), name='txn_seller_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('product_item__isnull', False)), fields=['product_item', 'seller'], name='txn_item_seller_mapped_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('product_item__isnull', False)), fields=['product_item', 'buyer'], name='txn_item_buyer_mapped_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_data', '0011_transaction_workload_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='txn_type_dest_item_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='txn_type_origin_item_idx',
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='trade_data.productcategory'),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='sub_category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='trade_data.productsubcategory'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['trade_type', 'destination_country', 'sub_category', 'reporting_date'], include=('seller', 'origin_country', 'qty_mt', 'usd_per_mt'), name='txn_type_dest_subcat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['trade_type', 'origin_country', 'sub_category', 'reporting_date'], include=('buyer', 'destination_country', 'qty_mt', 'usd_per_mt'), name='txn_type_origin_subcat_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_data', '0012_transaction_product_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TradeEntity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('normalized_name', models.CharField(max_length=500, unique=True)),
+                ('name', models.CharField(max_length=500)),
+                ('is_buyer', models.BooleanField(default=False)),
+                ('is_seller', models.BooleanField(default=False)),
+                ('country', models.CharField(db_index=True, default='Unknown', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Trade Entity',
+                'verbose_name_plural': 'Trade Entities',
+            },
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='buyer_entity',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchases', to='trade_data.tradeentity'),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='seller_entity',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sales', to='trade_data.tradeentity'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_data', '0013_trade_entity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tradeentity',
+            name='canonical_entity',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='aliases', to='trade_data.tradeentity'),
+        ),
+    ]
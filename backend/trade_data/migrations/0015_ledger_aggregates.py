@@ -0,0 +1,113 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_data', '0014_tradeentity_canonical_entity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AggCompanyMonthProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('direction', models.CharField(choices=[('import', 'Import (company is the buyer)'), ('export', 'Export (company is the seller)')], max_length=10)),
+                ('company', models.CharField(max_length=500)),
+                ('country', models.CharField(max_length=100)),
+                ('total_qty_mt', models.DecimalField(decimal_places=6, default=0, max_digits=30)),
+                ('total_usd', models.DecimalField(blank=True, decimal_places=2, max_digits=30, null=True)),
+                ('price_sum', models.DecimalField(decimal_places=6, default=0, max_digits=30)),
+                ('price_count', models.IntegerField(default=0)),
+                ('transaction_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Agg Company Month Product',
+                'verbose_name_plural': 'Agg Company Month Product',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AggProductMonthCountry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('trade_type', models.CharField(choices=[('IMPORT', 'Import'), ('EXPORT', 'Export')], max_length=10)),
+                ('origin_country', models.CharField(max_length=100)),
+                ('destination_country', models.CharField(max_length=100)),
+                ('total_qty_mt', models.DecimalField(decimal_places=6, default=0, max_digits=30)),
+                ('total_usd', models.DecimalField(blank=True, decimal_places=2, max_digits=30, null=True)),
+                ('price_sum', models.DecimalField(decimal_places=6, default=0, max_digits=30)),
+                ('price_count', models.IntegerField(default=0)),
+                ('transaction_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Agg Product Month Country',
+                'verbose_name_plural': 'Agg Product Month Country',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AggregateRefreshState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['ingested_at'], name='txn_ingested_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='aggproductmonthcountry',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trade_data.productcategory'),
+        ),
+        migrations.AddField(
+            model_name='aggproductmonthcountry',
+            name='product_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trade_data.productitem'),
+        ),
+        migrations.AddField(
+            model_name='aggproductmonthcountry',
+            name='sub_category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trade_data.productsubcategory'),
+        ),
+        migrations.AddField(
+            model_name='aggcompanymonthproduct',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trade_data.productcategory'),
+        ),
+        migrations.AddField(
+            model_name='aggcompanymonthproduct',
+            name='product_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trade_data.productitem'),
+        ),
+        migrations.AddField(
+            model_name='aggcompanymonthproduct',
+            name='sub_category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trade_data.productsubcategory'),
+        ),
+        migrations.AddIndex(
+            model_name='aggproductmonthcountry',
+            index=models.Index(fields=['trade_type', 'sub_category', 'month'], name='agg_pmc_subcat_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aggproductmonthcountry',
+            index=models.Index(fields=['month'], name='agg_pmc_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aggcompanymonthproduct',
+            index=models.Index(fields=['direction', 'company', 'month'], name='agg_cmp_company_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aggcompanymonthproduct',
+            index=models.Index(fields=['month'], name='agg_cmp_month_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_data', '0015_ledger_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductCoTrade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('companies', models.IntegerField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trade_data.productitem')),
+                ('product_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trade_data.productitem')),
+            ],
+            options={
+                'verbose_name': 'Product Co-Trade',
+                'verbose_name_plural': 'Product Co-Trades',
+                'ordering': ['product_item', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='productcotrade',
+            constraint=models.UniqueConstraint(fields=('product_item', 'rank'), name='product_cotrade_rank_uniq'),
+        ),
+    ]
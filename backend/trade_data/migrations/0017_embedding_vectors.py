@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_data', '0016_product_co_trade'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companyembedding',
+            name='vector',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='companyembedding',
+            name='vector_dtype',
+            field=models.CharField(default='float32', editable=False, max_length=8),
+        ),
+        migrations.AddField(
+            model_name='productembedding',
+            name='vector',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='productembedding',
+            name='vector_dtype',
+            field=models.CharField(default='float32', editable=False, max_length=8),
+        ),
+    ]
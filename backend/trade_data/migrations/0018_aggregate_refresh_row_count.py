@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_data', '0017_embedding_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aggregaterefreshstate',
+            name='row_count',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
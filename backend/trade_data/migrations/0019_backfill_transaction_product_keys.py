@@ -0,0 +1,45 @@
+from django.db import migrations, transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+from django.db.models.functions import Now
+
+BATCH_SIZE = 20000
+
+
+def backfill_product_keys(apps, schema_editor):
+    """
+    Fills Transaction.sub_category / category (added in 0012) from product_item,
+    so category filters work right after deploy. Same id-range batches as the
+    backfill_transaction_product_keys command, one transaction per batch.
+    """
+    Transaction = apps.get_model('trade_data', 'Transaction')
+    ProductItem = apps.get_model('trade_data', 'ProductItem')
+
+    bounds = Transaction.objects.aggregate(lo=Min('id'), hi=Max('id'))
+    if bounds['lo'] is None:
+        return
+
+    item_keys = ProductItem.objects.filter(pk=OuterRef('product_item_id'))
+    sub_category = Subquery(item_keys.values('sub_category_id')[:1])
+    category = Subquery(item_keys.values('sub_category__category_id')[:1])
+
+    for start in range(bounds['lo'], bounds['hi'] + 1, BATCH_SIZE):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            Transaction.objects.filter(
+                id__gte=start,
+                id__lt=start + BATCH_SIZE,
+                product_item__isnull=False,
+                sub_category__isnull=True,
+            ).update(sub_category_id=sub_category, category_id=category, ingested_at=Now())
+
+
+class Migration(migrations.Migration):
+    # Batches commit on their own instead of holding one lock over the whole ledger.
+    atomic = False
+
+    dependencies = [
+        ('trade_data', '0018_aggregate_refresh_row_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_product_keys, migrations.RunPython.noop),
+    ]
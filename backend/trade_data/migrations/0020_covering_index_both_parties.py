@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trade_data', '0019_backfill_transaction_product_keys'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='txn_type_dest_subcat_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='txn_type_origin_subcat_idx',
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['trade_type', 'destination_country', 'sub_category', 'reporting_date'], include=('buyer', 'seller', 'origin_country', 'qty_mt', 'usd_per_mt'), name='txn_type_dest_subcat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['trade_type', 'origin_country', 'sub_category', 'reporting_date'], include=('buyer', 'seller', 'destination_country', 'qty_mt', 'usd_per_mt'), name='txn_type_origin_subcat_idx'),
+        ),
+    ]
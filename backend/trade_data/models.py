@@ -1,5 +1,6 @@
 from django.db import models
 from auditlog.registry import auditlog
+from trade_data.vectors import VectorFieldsMixin
 
 
 class HsToProductMap(models.Model):
@@ -58,6 +59,40 @@ class ProductItem(models.Model):
         return self.name
 
 
+# -------------------------
+# TRADE ENTITIES
+# -------------------------
+
+class TradeEntity(models.Model):
+    """Canonical buyer/seller, keyed by normalized name (see trade_data.entities)."""
+
+    normalized_name = models.CharField(max_length=500, unique=True)
+    name = models.CharField(max_length=500)
+    is_buyer = models.BooleanField(default=False)
+    is_seller = models.BooleanField(default=False)
+    country = models.CharField(max_length=100, db_index=True, default="Unknown")
+    # Set by resolve_trade_entities on name variants; NULL means this entity is canonical.
+    canonical_entity = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='aliases'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Trade Entity'
+        verbose_name_plural = 'Trade Entities'
+
+    @property
+    def canonical_id(self):
+        return self.canonical_entity_id or self.pk
+
+    def __str__(self):
+        return f"{self.name} ({self.country})"
+
+
 # -------------------------
 # TRANSACTION MODEL (UPDATED)
 # -------------------------
@@ -93,11 +128,43 @@ class Transaction(models.Model):
         null=True,
         blank=True
     )
+    # Denormalized from product_item so ledger filters skip the hierarchy joins.
+    # Filled by save(), by the ingestion commands (bulk_create skips save())
+    # and by backfill_transaction_product_keys.
+    sub_category = models.ForeignKey(
+        ProductSubCategory,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    category = models.ForeignKey(
+        ProductCategory,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
 
     # Companies
     buyer = models.CharField(max_length=500)
     seller = models.CharField(max_length=500)
     shipping_agent = models.CharField(max_length=500)
+    # Integer keys for buyer/seller; NULL for blank/"Unknown" names.
+    buyer_entity = models.ForeignKey(
+        TradeEntity,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='purchases'
+    )
+    seller_entity = models.ForeignKey(
+        TradeEntity,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='sales'
+    )
 
     # Directional geography (VERY IMPORTANT)
     origin_country = models.CharField(max_length=100, db_index=True, default="Unknown")
@@ -124,14 +191,128 @@ class Transaction(models.Model):
         ordering = ['-reporting_date']
         indexes = [
             models.Index(fields=['reporting_date']),
-            models.Index(fields=['buyer']),
-            models.Index(fields=['seller']),
             models.Index(fields=['hs_code']),
-            models.Index(fields=['trade_type']),
-            models.Index(fields=['origin_country']),
-            models.Index(fields=['destination_country']),
+            # Watermark lookups (Max(ingested_at)) for snapshots and aggregates.
+            models.Index(fields=['ingested_at'], name='txn_ingested_at_idx'),
+            # Supplier search / market views: direction + country + sub-category,
+            # covering the aggregates and both parties (each index serves one
+            # intent grouped by buyer and another grouped by seller).
+            models.Index(
+                fields=['trade_type', 'destination_country', 'sub_category', 'reporting_date'],
+                include=['buyer', 'seller', 'origin_country', 'qty_mt', 'usd_per_mt'],
+                name='txn_type_dest_subcat_idx',
+            ),
+            models.Index(
+                fields=['trade_type', 'origin_country', 'sub_category', 'reporting_date'],
+                include=['buyer', 'seller', 'destination_country', 'qty_mt', 'usd_per_mt'],
+                name='txn_type_origin_subcat_idx',
+            ),
+            # Company pages and link prediction: one side of the trade + date range.
+            # These also serve plain buyer= / seller= lookups.
+            models.Index(
+                fields=['buyer', 'reporting_date'],
+                include=['seller', 'qty_mt', 'usd'],
+                name='txn_buyer_date_idx',
+            ),
+            models.Index(
+                fields=['seller', 'reporting_date'],
+                include=['buyer', 'qty_mt', 'usd'],
+                name='txn_seller_date_idx',
+            ),
+            # Product-overlap link prediction only looks at mapped rows.
+            models.Index(
+                fields=['product_item', 'seller'],
+                condition=models.Q(product_item__isnull=False),
+                name='txn_item_seller_mapped_idx',
+            ),
+            models.Index(
+                fields=['product_item', 'buyer'],
+                condition=models.Q(product_item__isnull=False),
+                name='txn_item_buyer_mapped_idx',
+            ),
         ]
 
+    # (entity key, name field, role, country field for new entities)
+    ENTITY_SIDES = (
+        ('buyer_entity_id', 'buyer', 'buyer', 'destination_country'),
+        ('seller_entity_id', 'seller', 'seller', 'origin_country'),
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_stored_sources()
+        return instance
+
+    def save(self, *args, **kwargs):
+        changed_keys = self.fill_product_keys() + self.fill_entity_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and changed_keys:
+            kwargs['update_fields'] = {*update_fields, *changed_keys}
+        super().save(*args, **kwargs)
+        self._remember_stored_sources()
+
+    def _remember_stored_sources(self):
+        """
+        Snapshot of product_item and the names/countries/entity keys as stored,
+        for fill_product_keys and fill_entity_keys.
+        """
+        deferred = self.get_deferred_fields()
+        fields = ['product_item_id', *(field for side in self.ENTITY_SIDES for field in (side[0], side[1], side[3]))]
+        self._stored_sources = {field: getattr(self, field) for field in fields if field not in deferred}
+
+    def fill_product_keys(self):
+        """
+        Copies sub_category/category from product_item, looking the item up
+        only when it changed since the row was loaded or the keys are missing.
+        Returns the keys it changed.
+        """
+        stored = getattr(self, '_stored_sources', {})
+        if self.product_item_id is None:
+            keys = (None, None)
+        elif (
+            'product_item_id' in stored
+            and stored['product_item_id'] == self.product_item_id
+            and self.sub_category_id is not None
+        ):
+            return []
+        else:
+            keys = (
+                ProductItem.objects.filter(pk=self.product_item_id)
+                .values_list('sub_category_id', 'sub_category__category_id')
+                .first()
+            ) or (None, None)
+
+        changed = []
+        for field, value in zip(('sub_category_id', 'category_id'), keys):
+            if getattr(self, field) != value:
+                setattr(self, field, value)
+                changed.append(field)
+        return changed
+
+    def fill_entity_keys(self):
+        """
+        Resolves buyer/seller names to TradeEntity ids when not set yet, or when
+        the name or country changed since the row was loaded (unless the entity
+        key was reassigned as well). Returns the entity keys it changed.
+        """
+        from trade_data.entities import resolve_entity
+
+        stored = getattr(self, '_stored_sources', {})
+        changed = []
+        for entity_field, name_field, role, country_field in self.ENTITY_SIDES:
+            entity_id = getattr(self, entity_field)
+            renamed = any(
+                field in stored and stored[field] != getattr(self, field)
+                for field in (name_field, country_field)
+            )
+            if entity_id is None or (renamed and entity_id == stored.get(entity_field)):
+                resolved = resolve_entity(getattr(self, name_field), role, getattr(self, country_field))
+                if resolved != entity_id:
+                    setattr(self, entity_field, resolved)
+                    changed.append(entity_field)
+        return changed
+
     def __str__(self):
         item_name = self.product_item.name if self.product_item else "Unknown Item"
         return (
@@ -142,13 +323,125 @@ class Transaction(models.Model):
         )
 
 
+# -------------------------
+# LEDGER AGGREGATES
+# -------------------------
+# Maintained by refresh_ledger_aggregates; one row per group and month.
+# Averages are stored as (price_sum, price_count) so they roll up exactly.
+
+class AggCompanyMonthProduct(models.Model):
+    """Monthly totals per company (as buyer or seller), product and counterparty country."""
+
+    DIRECTION_CHOICES = (
+        ("import", "Import (company is the buyer)"),
+        ("export", "Export (company is the seller)"),
+    )
+
+    month = models.DateField()
+    direction = models.CharField(max_length=10, choices=DIRECTION_CHOICES)
+    company = models.CharField(max_length=500)
+    product_item = models.ForeignKey(ProductItem, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    sub_category = models.ForeignKey(ProductSubCategory, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    category = models.ForeignKey(ProductCategory, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    country = models.CharField(max_length=100)
+
+    total_qty_mt = models.DecimalField(max_digits=30, decimal_places=6, default=0)
+    total_usd = models.DecimalField(max_digits=30, decimal_places=2, null=True, blank=True)
+    price_sum = models.DecimalField(max_digits=30, decimal_places=6, default=0)
+    price_count = models.IntegerField(default=0)
+    transaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Agg Company Month Product'
+        verbose_name_plural = 'Agg Company Month Product'
+        ordering = ['-month']
+        indexes = [
+            models.Index(fields=['direction', 'company', 'month'], name='agg_cmp_company_month_idx'),
+            models.Index(fields=['month'], name='agg_cmp_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.company} | {self.direction} | {self.month:%Y-%m}"
+
+
+class AggProductMonthCountry(models.Model):
+    """Monthly market totals per trade type, product and origin/destination pair."""
+
+    month = models.DateField()
+    trade_type = models.CharField(max_length=10, choices=Transaction.TRADE_TYPE_CHOICES)
+    product_item = models.ForeignKey(ProductItem, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    sub_category = models.ForeignKey(ProductSubCategory, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    category = models.ForeignKey(ProductCategory, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    origin_country = models.CharField(max_length=100)
+    destination_country = models.CharField(max_length=100)
+
+    total_qty_mt = models.DecimalField(max_digits=30, decimal_places=6, default=0)
+    total_usd = models.DecimalField(max_digits=30, decimal_places=2, null=True, blank=True)
+    price_sum = models.DecimalField(max_digits=30, decimal_places=6, default=0)
+    price_count = models.IntegerField(default=0)
+    transaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Agg Product Month Country'
+        verbose_name_plural = 'Agg Product Month Country'
+        ordering = ['-month']
+        indexes = [
+            models.Index(fields=['trade_type', 'sub_category', 'month'], name='agg_pmc_subcat_month_idx'),
+            models.Index(fields=['month'], name='agg_pmc_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.trade_type} | {self.origin_country} → {self.destination_country} | {self.month:%Y-%m}"
+
+
+class AggregateRefreshState(models.Model):
+    """Ingestion watermark (max Transaction.ingested_at) covered by each aggregate table."""
+
+    name = models.CharField(max_length=100, unique=True)
+    watermark = models.DateTimeField(null=True, blank=True)
+    # Transactions the refresh covered; a lower count later means rows were deleted.
+    row_count = models.BigIntegerField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.watermark}"
+
+
+class ProductCoTrade(models.Model):
+    """
+    Top-k co-traded products per product: ``companies`` is the number of
+    companies (as buyer or seller) that trade both, i.e. the product x
+    product entry of the company-product incidence matrix A^T.A.
+    Maintained by refresh_co_trade_matrix.
+    """
+
+    product_item = models.ForeignKey(ProductItem, on_delete=models.CASCADE, related_name='+')
+    neighbour = models.ForeignKey(ProductItem, on_delete=models.CASCADE, related_name='+')
+    companies = models.IntegerField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        verbose_name = 'Product Co-Trade'
+        verbose_name_plural = 'Product Co-Trades'
+        ordering = ['product_item', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product_item', 'rank'], name='product_cotrade_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_item_id} → {self.neighbour_id} ({self.companies})"
+
+
 # -------------------------
 # EMBEDDINGS
 # -------------------------
 
-class CompanyEmbedding(models.Model):
+class CompanyEmbedding(VectorFieldsMixin, models.Model):
     company_name = models.CharField(max_length=500, unique=True)
     embedding = models.JSONField()
+    # Binary copy of ``embedding`` (see trade_data.vectors), filled on save / by backfill_embedding_vectors.
+    vector = models.BinaryField(null=True, blank=True, editable=False)
+    vector_dtype = models.CharField(max_length=8, default='float32', editable=False)
     cluster_tag = models.CharField(max_length=100, blank=True)
     pagerank = models.FloatField(default=0.0)
     degree = models.IntegerField(default=0)
@@ -162,9 +455,12 @@ class CompanyEmbedding(models.Model):
         return f"{self.company_name} → {self.cluster_tag}"
 
 
-class ProductEmbedding(models.Model):
+class ProductEmbedding(VectorFieldsMixin, models.Model):
     product_item = models.ForeignKey(ProductItem, on_delete=models.CASCADE)
     embedding = models.JSONField()
+    # Binary copy of ``embedding`` (see trade_data.vectors), filled on save / by backfill_embedding_vectors.
+    vector = models.BinaryField(null=True, blank=True, editable=False)
+    vector_dtype = models.CharField(max_length=8, default='float32', editable=False)
     cluster_tag = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -0,0 +1,314 @@
+"""
+Declarative range partitioning of the Transaction table (PostgreSQL only).
+
+The ledger table is partitioned by RANGE (reporting_date), one partition per
+month or per year, optionally sub-partitioned by LIST (trade_type). Ledger
+queries that filter on reporting_date and trade_type then only touch the
+partitions they need (partition pruning).
+
+Partitions are named after the table and period, e.g.::
+
+    trade_data_transaction_p2025_01           (monthly)
+    trade_data_transaction_p2025              (yearly)
+    trade_data_transaction_p2025_01_import    (trade_type sub-partition)
+
+Rows outside every partition land in ``trade_data_transaction_default``.
+
+Configuration lives in ``settings.LEDGER_PARTITIONING``; the
+``manage_ledger_partitions`` command drives conversion and maintenance.
+"""
+
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction as db_transaction
+
+from trade_data.models import Transaction
+
+
+TABLE = Transaction._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+LEGACY_TABLE = f"{TABLE}_legacy"
+
+DEFAULT_SETTINGS = {
+    'granularity': 'month',   # 'month' or 'year'
+    'by_trade_type': False,   # LIST sub-partitions per trade_type
+    'premake': 3,             # future periods kept ready by create_future_partitions
+}
+
+BOUND_RE = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+
+class PartitioningError(Exception):
+    pass
+
+
+def get_partition_settings():
+    conf = dict(DEFAULT_SETTINGS)
+    conf.update(getattr(settings, 'LEDGER_PARTITIONING', {}) or {})
+    if conf['granularity'] not in ('month', 'year'):
+        raise PartitioningError(f"Unsupported partition granularity: {conf['granularity']!r}")
+    return conf
+
+
+# -------------------------
+# PERIOD HELPERS
+# -------------------------
+
+def period_start(d, granularity):
+    if granularity == 'year':
+        return date(d.year, 1, 1)
+    return date(d.year, d.month, 1)
+
+
+def next_period(start, granularity):
+    if granularity == 'year':
+        return date(start.year + 1, 1, 1)
+    return date(start.year + (start.month // 12), start.month % 12 + 1, 1)
+
+
+def add_periods(start, count, granularity):
+    for _ in range(count):
+        start = next_period(start, granularity)
+    return start
+
+
+def iter_periods(first, last, granularity):
+    """Yields the start date of every period from ``first`` to ``last`` inclusive."""
+    current = period_start(first, granularity)
+    last = period_start(last, granularity)
+    while current <= last:
+        yield current
+        current = next_period(current, granularity)
+
+
+def partition_name(start, granularity):
+    suffix = f"p{start:%Y}" if granularity == 'year' else f"p{start:%Y_%m}"
+    return f"{TABLE}_{suffix}"
+
+
+def parse_bounds(bound_expr):
+    """(from, to) dates from pg_get_expr(relpartbound), or None for DEFAULT/LIST bounds."""
+    match = BOUND_RE.search(bound_expr or '')
+    if not match:
+        return None
+    return date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))
+
+
+# -------------------------
+# CATALOG QUERIES
+# -------------------------
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def _require_postgres():
+    if connection.vendor != 'postgresql':
+        raise PartitioningError("Ledger partitioning requires PostgreSQL.")
+
+
+def relation_exists(name):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+        return cursor.fetchone()[0]
+
+
+def is_partitioned():
+    _require_postgres()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+            [TABLE],
+        )
+        return cursor.fetchone()[0]
+
+
+def list_partitions():
+    """[(name, from_date, to_date)] for the top-level range partitions; DEFAULT has None bounds."""
+    _require_postgres()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            ORDER BY c.relname
+            """,
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound_expr in rows:
+        bounds = parse_bounds(bound_expr)
+        partitions.append((name, bounds[0] if bounds else None, bounds[1] if bounds else None))
+    return partitions
+
+
+# -------------------------
+# DDL
+# -------------------------
+
+def create_partition(start, granularity, by_trade_type):
+    """Creates the partition for the period starting at ``start``. Returns False if it already exists."""
+    name = partition_name(start, granularity)
+    if relation_exists(name):
+        return False
+
+    end = next_period(start, granularity)
+    sub_clause = " PARTITION BY LIST (trade_type)" if by_trade_type else ""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {_qn(name)} PARTITION OF {_qn(TABLE)} "
+            f"FOR VALUES FROM (%s) TO (%s){sub_clause}",
+            [start, end],
+        )
+        if by_trade_type:
+            for trade_type, _ in Transaction.TRADE_TYPE_CHOICES:
+                cursor.execute(
+                    f"CREATE TABLE {_qn(f'{name}_{trade_type.lower()}')} "
+                    f"PARTITION OF {_qn(name)} FOR VALUES IN (%s)",
+                    [trade_type],
+                )
+            cursor.execute(f"CREATE TABLE {_qn(f'{name}_other')} PARTITION OF {_qn(name)} DEFAULT")
+    return True
+
+
+def ensure_partitions(first, last, granularity=None, by_trade_type=None):
+    """Creates every missing partition covering ``first``..``last``. Returns the names created."""
+    conf = get_partition_settings()
+    granularity = granularity or conf['granularity']
+    by_trade_type = conf['by_trade_type'] if by_trade_type is None else by_trade_type
+
+    created = []
+    for start in iter_periods(first, last, granularity):
+        if create_partition(start, granularity, by_trade_type):
+            created.append(partition_name(start, granularity))
+    return created
+
+
+def ensure_default_partition():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {_qn(DEFAULT_PARTITION)} PARTITION OF {_qn(TABLE)} DEFAULT"
+        )
+
+
+def create_future_partitions(periods=None, today=None):
+    """Keeps ``periods`` partitions ready beyond the current one."""
+    _require_postgres()
+    if not is_partitioned():
+        raise PartitioningError(f"{TABLE} is not partitioned. Run 'manage_ledger_partitions convert' first.")
+    conf = get_partition_settings()
+    periods = conf['premake'] if periods is None else periods
+    today = today or date.today()
+    first = period_start(today, conf['granularity'])
+    return ensure_partitions(first, add_periods(first, periods, conf['granularity']))
+
+
+def detach_partitions(before, archive_schema=None, drop=False):
+    """
+    Detaches range partitions whose upper bound is on or before ``before``.
+    Detached tables are moved to ``archive_schema`` or dropped; otherwise they
+    are left in place as plain tables. Returns the names detached.
+    """
+    _require_postgres()
+    detached = []
+    with db_transaction.atomic():
+        with connection.cursor() as cursor:
+            if archive_schema:
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {_qn(archive_schema)}")
+            for name, _, upper in list_partitions():
+                if upper is None or upper > before:
+                    continue
+                cursor.execute(f"ALTER TABLE {_qn(TABLE)} DETACH PARTITION {_qn(name)}")
+                if archive_schema:
+                    cursor.execute(f"ALTER TABLE {_qn(name)} SET SCHEMA {_qn(archive_schema)}")
+                elif drop:
+                    cursor.execute(f"DROP TABLE {_qn(name)}")
+                detached.append(name)
+    return detached
+
+
+def convert_to_partitioned(granularity=None, by_trade_type=None, first=None, last=None):
+    """
+    Migration path from the plain heap to a partitioned table, in one transaction:
+
+    1. rename the current table to ``<table>_legacy``;
+    2. create the partitioned parent with the same columns, a (id, reporting_date)
+       primary key and the same foreign keys;
+    3. create partitions covering the data (plus ``premake`` future periods) and
+       a DEFAULT partition;
+    4. copy the rows, move the identity sequence past the highest id;
+    5. drop the legacy table and recreate its indexes on the parent, which
+       cascades them to every partition.
+
+    Returns the names of the partitions created.
+    """
+    _require_postgres()
+    conf = get_partition_settings()
+    granularity = granularity or conf['granularity']
+    by_trade_type = conf['by_trade_type'] if by_trade_type is None else by_trade_type
+
+    if is_partitioned():
+        raise PartitioningError(f"{TABLE} is already partitioned.")
+
+    with db_transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT indexdef FROM pg_indexes
+                WHERE schemaname = current_schema() AND tablename = %s
+                  AND indexname NOT IN (
+                      SELECT conname FROM pg_constraint
+                      WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u')
+                  )
+                """,
+                [TABLE, TABLE],
+            )
+            index_defs = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute(f"ALTER TABLE {_qn(TABLE)} RENAME TO {_qn(LEGACY_TABLE)}")
+            cursor.execute(
+                f"CREATE TABLE {_qn(TABLE)} (LIKE {_qn(LEGACY_TABLE)} "
+                f"INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING STORAGE INCLUDING COMMENTS) "
+                f"PARTITION BY RANGE (reporting_date)"
+            )
+            cursor.execute(f"ALTER TABLE {_qn(TABLE)} ADD PRIMARY KEY (id, reporting_date)")
+
+            for field in Transaction._meta.concrete_fields:
+                if not field.remote_field:
+                    continue
+                target = field.remote_field.model._meta
+                cursor.execute(
+                    f"ALTER TABLE {_qn(TABLE)} ADD CONSTRAINT {_qn(f'{TABLE}_{field.column}_fk_part')} "
+                    f"FOREIGN KEY ({_qn(field.column)}) REFERENCES {_qn(target.db_table)} ({_qn(target.pk.column)}) "
+                    f"DEFERRABLE INITIALLY DEFERRED"
+                )
+
+            cursor.execute(f"SELECT MIN(reporting_date), MAX(reporting_date) FROM {_qn(LEGACY_TABLE)}")
+            data_first, data_last = cursor.fetchone()
+
+        today = date.today()
+        first = first or data_first or today
+        last = max(filter(None, [last, data_last, add_periods(period_start(today, granularity), conf['premake'], granularity)]))
+        created = ensure_partitions(first, last, granularity=granularity, by_trade_type=by_trade_type)
+        ensure_default_partition()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {_qn(TABLE)} SELECT * FROM {_qn(LEGACY_TABLE)}")
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {_qn(TABLE)}",
+                [TABLE],
+            )
+            cursor.execute(f"DROP TABLE {_qn(LEGACY_TABLE)}")
+
+            # Definitions were read before the rename, so they already name the
+            # new parent; dropping the legacy table freed the index names.
+            for index_def in index_defs:
+                cursor.execute(index_def)
+
+    return created
@@ -0,0 +1,122 @@
+"""
+Compact binary storage for embedding vectors.
+
+CompanyEmbedding and ProductEmbedding keep their JSON ``embedding`` list (what
+the embedding jobs write) plus a ``vector`` column holding the same values as
+raw little-endian float32 bytes, or float16 with ``vector_dtype='float16'``
+(half the size again, ~3 significant digits, plenty for cosine similarity).
+Reading the binary column skips JSON float parsing and the Python list
+entirely: ``unpack_vector`` is a zero-copy NumPy view of the bytes.
+
+- ``pack_vector(values, dtype)`` -> bytes for the ``vector`` column
+- ``unpack_vector(data, dtype)`` -> read-only 1-D view (no copy)
+- ``load_vectors(queryset, *fields)`` -> every vector of the queryset in one
+  float32 matrix, read with a single query
+
+Rows saved through the model get their vector on ``save()``; rows written
+with ``bulk_create`` / ``update`` or before the column existed are filled in
+by the ``backfill_embedding_vectors`` command. Until then loaders fall back to
+the JSON list for those rows.
+"""
+
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+
+
+VECTOR_DTYPES = {
+    'float32': np.dtype('<f4'),
+    'float16': np.dtype('<f2'),
+}
+DEFAULT_VECTOR_DTYPE = 'float32'
+
+
+def default_vector_dtype():
+    """``settings.EMBEDDING_VECTOR_DTYPE`` ('float32' unless configured)."""
+    dtype = getattr(settings, 'EMBEDDING_VECTOR_DTYPE', DEFAULT_VECTOR_DTYPE)
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"EMBEDDING_VECTOR_DTYPE must be one of {sorted(VECTOR_DTYPES)}, not {dtype!r}")
+    return dtype
+
+
+def pack_vector(values, dtype=None):
+    """Raw bytes of ``values`` in the given storage dtype, or None for an empty/invalid list."""
+    if not isinstance(values, (list, tuple, np.ndarray)) or not len(values):
+        return None
+    return np.asarray(values, dtype=VECTOR_DTYPES[dtype or default_vector_dtype()]).tobytes()
+
+
+def unpack_vector(data, dtype=DEFAULT_VECTOR_DTYPE):
+    """Read-only NumPy view over the stored bytes (float16 stays float16)."""
+    if data is None:
+        return None
+    return np.frombuffer(data, dtype=VECTOR_DTYPES[dtype])
+
+
+def vector_dim(data, dtype=DEFAULT_VECTOR_DTYPE):
+    return len(data) // VECTOR_DTYPES[dtype].itemsize
+
+
+class VectorFieldsMixin:
+    """Model helpers for models with ``embedding``, ``vector`` and ``vector_dtype`` fields."""
+
+    def sync_vector(self, dtype=None):
+        self.vector_dtype = dtype or default_vector_dtype()
+        self.vector = pack_vector(self.embedding, self.vector_dtype)
+
+    def save(self, *args, **kwargs):
+        self.sync_vector(self.vector_dtype if self.vector is not None else None)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'embedding' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'vector', 'vector_dtype'}
+        super().save(*args, **kwargs)
+
+    def as_array(self):
+        """The embedding as a NumPy array: a zero-copy view of ``vector`` when it is set."""
+        if self.vector is not None:
+            return unpack_vector(self.vector, self.vector_dtype)
+        return np.asarray(self.embedding, dtype=np.float32)
+
+
+def load_vectors(queryset, *fields, dim=None):
+    """
+    ``(rows, matrix)``: the ``fields`` values of each row and a C-contiguous
+    float32 matrix with one vector per row, from a single query. The matrix
+    may be a read-only view of the fetched bytes; copy it before writing.
+
+    Rows whose dimension is not ``dim`` (default: the most common one, so
+    leftovers of an older embedding run are dropped) or without a vector are
+    skipped. Rows not backfilled yet are read from their JSON list with one
+    extra query.
+    """
+    fields = list(fields)
+    raw = list(queryset.order_by().values_list('pk', 'vector', 'vector_dtype', *fields))
+
+    missing = [pk for pk, data, _, *_ in raw if data is None]
+    if missing:
+        lists = dict(queryset.model.objects.filter(pk__in=missing).values_list('pk', 'embedding'))
+        raw = [
+            (pk, pack_vector(lists.get(pk), DEFAULT_VECTOR_DTYPE), DEFAULT_VECTOR_DTYPE, *rest)
+            if data is None else (pk, data, dtype, *rest)
+            for pk, data, dtype, *rest in raw
+        ]
+
+    raw = [row for row in raw if row[1]]
+    if not raw:
+        return [], np.zeros((0, dim or 0), dtype=np.float32)
+    dims = [vector_dim(data, dtype) for _, data, dtype, *_ in raw]
+    if dim is None:
+        dim = Counter(dims).most_common(1)[0][0]
+    raw = [row for row, row_dim in zip(raw, dims) if row_dim == dim]
+
+    dtypes = {dtype for _, _, dtype, *_ in raw}
+    if len(dtypes) == 1:
+        # One buffer, one view: no per-row work beyond the bytes join.
+        stored = np.frombuffer(b''.join(data for _, data, _, *_ in raw), dtype=VECTOR_DTYPES[dtypes.pop()])
+        matrix = stored.reshape(len(raw), dim).astype(np.float32, copy=False)
+    else:
+        matrix = np.empty((len(raw), dim), dtype=np.float32)
+        for i, (_, data, dtype, *_) in enumerate(raw):
+            matrix[i] = unpack_vector(data, dtype)
+    return [tuple(rest) for _, _, _, *rest in raw], matrix
@@ -2,26 +2,46 @@ import pandas as pd
 import networkx as nx
 from datetime import timedelta
 from django.core.management.base import BaseCommand
-from trade_data.models import Transaction
+from trade_data.entities import canonical_name_map
+from trade_ledger.services.snapshots import load_ledger_frame
 from tqdm import tqdm
 
 class Command(BaseCommand):
     help = 'Builds GNN graphs for import-focused trade intelligence, including buyer-seller for link prediction.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--snapshot',
+            action='store_true',
+            help='Read transactions from the Parquet ledger snapshot (export_ledger_parquet) instead of the database',
+        )
+        parser.add_argument(
+            '--canonical-names',
+            action='store_true',
+            help='Merge name variants into their canonical entity (resolve_trade_entities) before building graphs',
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Loading import transactions...")
 
-        transactions = Transaction.objects.values(
-            'buyer', 'seller', 'country', 'qty_mt',
-            'product_item_id', 'reporting_date'
+        df = load_ledger_frame(
+            ['buyer', 'seller', 'buyer_entity_id', 'seller_entity_id', 'qty_mt', 'product_item_id', 'reporting_date'],
+            prefer_snapshot=options['snapshot'],
         )
 
-        df = pd.DataFrame(list(transactions))
-
         if df.empty:
             self.stdout.write(self.style.ERROR("No transactions found!"))
             return
 
+        if options['canonical_names']:
+            canonical = canonical_name_map()
+            for side in ('buyer', 'seller'):
+                mapped = df[f'{side}_entity_id'].map(canonical)
+                df[side] = mapped.where(mapped.notna(), df[side])
+            self.stdout.write(
+                f"Using canonical names: {df['buyer'].nunique()} buyers, {df['seller'].nunique()} sellers."
+            )
+
         df = df.dropna(subset=['product_item_id'])
         df['product_item_id'] = df['product_item_id'].astype(int)
 
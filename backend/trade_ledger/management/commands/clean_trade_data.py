@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from trade_ledger.models import (
     TradeTrend, TradePartner, TradeProduct, TradeCompany, ProductCategory
 )
+from utils.data_version import bump_data_version
 
 
 class Command(BaseCommand):
@@ -46,6 +47,7 @@ class Command(BaseCommand):
         category_count = ProductCategory.objects.count()
         ProductCategory.objects.all().delete()
         self.stdout.write(self.style.SUCCESS(f'✓ Deleted {category_count} product categories'))
-        
+        bump_data_version('clean_trade_data')
+
         self.stdout.write(self.style.SUCCESS('\n✅ Trade ledger data cleaned successfully!'))
         self.stdout.write(self.style.WARNING('Note: Base Company records were NOT deleted.'))
@@ -5,6 +5,7 @@ from node2vec import Node2Vec
 import networkx as nx
 from sklearn.cluster import HDBSCAN
 from trade_data.models import CompanyEmbedding, ProductEmbedding
+from utils.data_version import bump_data_version
 
 class Command(BaseCommand):
     help = 'Generates GNN embeddings and clusters from pre-built graphs'
@@ -101,6 +102,7 @@ class Command(BaseCommand):
 
         if G_pp.number_of_edges() == 0:
             self.stdout.write(self.style.WARNING("       No product co-trade edges - skipping product embeddings"))
+            bump_data_version("generate_gnn_embeddings")
             self.stdout.write(self.style.SUCCESS("\n[OK] GNN embeddings generated (companies only)!"))
             return
 
@@ -155,4 +157,5 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(f"       Skipped {skipped_count} products (not in database)"))
         self.stdout.write(self.style.SUCCESS(f"       Saved {saved_count} product embeddings"))
 
+        bump_data_version("generate_gnn_embeddings")
         self.stdout.write(self.style.SUCCESS("\n[OK] GNN embeddings and clusters generated!"))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from trade_ledger.generate_fixture_data import main
+from utils.data_version import bump_data_version
 
 
 class Command(BaseCommand):
@@ -7,3 +8,4 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         main()
+        bump_data_version('generate_trade_data')
@@ -1,10 +1,12 @@
 import pandas as pd
 from django.core.management.base import BaseCommand
 from trade_data.models import Transaction, ProductItem, ProductSubCategory, ProductCategory, Product
+from trade_data.entities import EntityResolver
 from django.db import transaction
 from datetime import datetime
 import os
 import uuid
+from utils.data_version import bump_data_version
 
 class Command(BaseCommand):
     help = 'Import transactions from Excel file with option to wipe existing data'
@@ -44,6 +46,7 @@ class Command(BaseCommand):
         )
 
         records_to_create = []
+        entity_resolver = EntityResolver()
         product_item_cache = {}
         
         self.stdout.write("Processing rows...")
@@ -93,9 +96,9 @@ class Command(BaseCommand):
                             sub_category=sub_cat
                         )
                     
-                    product_item_cache[cache_key] = item
+                    product_item_cache[cache_key] = (item, sub_cat, category)
                 
-                p_item = product_item_cache[cache_key]
+                p_item, p_sub_cat, p_category = product_item_cache[cache_key]
 
                 qty_kg = pd.to_numeric(row.get('Qty KG'), errors='coerce') or 0
                 qty_mt = pd.to_numeric(row.get('Qty MT'), errors='coerce') or 0
@@ -110,17 +113,22 @@ class Command(BaseCommand):
                     reporting_date=date_val,
                     hs_code=hs_code_tx,
                     product_item=p_item,
+                    sub_category=p_sub_cat,
+                    category=p_category,
                     buyer=str(row.get('Buyer', '')).strip(),
                     seller=str(row.get('Seller', '')).strip(),
+                    buyer_entity_id=entity_resolver.resolve(row.get('Buyer'), 'buyer', 'Pakistan'),
+                    seller_entity_id=entity_resolver.resolve(row.get('Seller'), 'seller', str(row.get('Country', '')).strip() or None),
                     shipping_agent=str(row.get('Shipping Agents', '')).strip(),
-                    country=str(row.get('Country', '')).strip(),
+                    origin_country=str(row.get('Country', '')).strip() or 'Unknown',
+                    destination_country='Pakistan',
                     qty_kg=qty_kg,
                     qty_mt=qty_mt,
                     usd_per_kg=usd_kg,
                     usd_per_mt=usd_mt,
                     pkr=pkr_val,
                     usd=usd_val,
-                    trade_type='import',
+                    trade_type='IMPORT',
                     std_unit='MT'
                 )
                 records_to_create.append(tx)
@@ -135,5 +143,6 @@ class Command(BaseCommand):
 
         if records_to_create:
             Transaction.objects.bulk_create(records_to_create)
-        
+        bump_data_version('import_ledger_data')
+
         self.stdout.write(self.style.SUCCESS(f"Successfully imported {Transaction.objects.count()} transactions."))
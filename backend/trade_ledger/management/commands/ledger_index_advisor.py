@@ -0,0 +1,160 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Avg, Count, Max, Sum
+
+from search.services.aggregation import SupplierAggregator
+from trade_data.models import Transaction
+from trade_ledger.services.explorer import get_explorer_base_queryset
+from trade_ledger.services.filters import apply_transaction_filters
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays the hot ledger query mix (supplier search, Explorer, company pages, "
+        "link prediction) with EXPLAIN ANALYZE and reports sequential scans on the "
+        "ledger, badly misestimated row counts and ledger indexes that are never used."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--misestimate-ratio', type=float, default=10.0,
+                            help='Flag plan nodes whose actual/estimated rows differ by more than this factor')
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help='Print the full JSON plan of every query')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("The index advisor requires PostgreSQL (EXPLAIN ANALYZE, pg_stat_user_indexes).")
+
+        sample = self.pick_sample()
+        if sample is None:
+            self.stdout.write(self.style.WARNING("No transactions found - nothing to analyze."))
+            return
+
+        ratio = options['misestimate_ratio']
+        total_findings = 0
+        for label, queryset in self.query_mix(sample):
+            plan = json.loads(queryset.explain(format='json', analyze=True))[0]
+            findings = self.inspect_plan(plan['Plan'], ratio)
+            total_findings += len(findings)
+
+            style = self.style.WARNING if findings else self.style.SUCCESS
+            self.stdout.write(style(f"{label}: {plan['Execution Time']:.1f} ms"))
+            for finding in findings:
+                self.stdout.write(f"    - {finding}")
+            if options['verbose_plans']:
+                self.stdout.write(json.dumps(plan, indent=2))
+
+        self.report_unused_indexes()
+        self.stdout.write(self.style.SUCCESS(f"Done. {total_findings} plan finding(s)."))
+
+    def pick_sample(self):
+        """A real buyer, seller, subcategory and date window so the plans reflect actual data."""
+        last_date = Transaction.objects.aggregate(d=Max('reporting_date'))['d']
+        if last_date is None:
+            return None
+
+        busiest = lambda field: (  # noqa: E731
+            Transaction.objects.order_by().exclude(**{f'{field}__isnull': True}).values(field)
+            .annotate(n=Count('id')).order_by('-n')
+            .values_list(field, flat=True).first()
+        )
+        return {
+            'buyer': busiest('buyer'),
+            'seller': busiest('seller'),
+            'subcategory_id': busiest('sub_category_id'),
+            'date_from': last_date - timedelta(days=365),
+            'date_to': last_date,
+        }
+
+    def query_mix(self, sample):
+        """(label, QuerySet) pairs mirroring the queries the API issues most."""
+        aggregator = SupplierAggregator()
+        time_filter = {'start_date': sample['date_from'], 'end_date': sample['date_to']}
+        dates = {'date_from': sample['date_from'], 'date_to': sample['date_to']}
+
+        # Without any mapped product the supplier search has nothing to filter on.
+        if sample['subcategory_id']:
+            for intent in ('BUY', 'SELL'):
+                for scope in ('WORLDWIDE', 'PAKISTAN'):
+                    queryset, _, _ = aggregator.build_queryset(
+                        [sample['subcategory_id']], intent=intent, scope=scope, time_filter=time_filter
+                    )
+                    yield f"supplier search {intent}/{scope}", queryset
+
+        yield "explorer importers", (
+            get_explorer_base_queryset(**dates).order_by().values('buyer')
+            .annotate(volume=Sum('qty_mt'), trades=Count('id')).order_by('-volume')
+        )
+        yield "explorer exporters", (
+            get_explorer_base_queryset(**dates).order_by().values('seller')
+            .annotate(volume=Sum('qty_mt'), trades=Count('id')).order_by('-volume')
+        )
+
+        for direction, name in (('import', sample['buyer']), ('export', sample['seller'])):
+            partner = 'seller' if direction == 'import' else 'buyer'
+            qs = apply_transaction_filters(Transaction.objects.order_by(), direction=direction, company_name=name, **dates)
+            yield f"company overview ({direction})", qs.values(partner).annotate(
+                volume=Sum('qty_mt'), avg_price=Avg('usd_per_mt')
+            )
+
+        current_sellers = Transaction.objects.filter(buyer=sample['buyer']).values('seller')
+        yield "link prediction neighbors", (
+            Transaction.objects.order_by().filter(seller__in=current_sellers)
+            .exclude(buyer=sample['buyer']).values('buyer').distinct()
+        )
+        buyer_products = (
+            Transaction.objects.filter(buyer=sample['buyer'], product_item__isnull=False)
+            .values('product_item_id')
+        )
+        yield "link prediction product overlap", (
+            Transaction.objects.order_by().filter(product_item_id__in=buyer_products)
+            .values('seller').annotate(matches=Count('product_item_id', distinct=True))
+            .order_by('-matches')[:10]
+        )
+
+    def inspect_plan(self, node, ratio):
+        """Walks a JSON plan tree and returns human-readable findings."""
+        findings = []
+        relation = node.get('Relation Name', '')
+
+        if node['Node Type'] == 'Seq Scan' and relation.startswith(Transaction._meta.db_table):
+            findings.append(
+                f"Seq Scan on {relation} ({node.get('Actual Rows', 0)} rows"
+                f"{', filter: ' + node['Filter'] if node.get('Filter') else ''})"
+            )
+
+        estimated = node.get('Plan Rows', 0)
+        actual = node.get('Actual Rows', 0) * max(node.get('Actual Loops', 1), 1)
+        if estimated and actual and max(estimated, actual) / min(estimated, actual) > ratio:
+            findings.append(
+                f"{node['Node Type']}{' on ' + relation if relation else ''}: "
+                f"estimated {estimated} rows, actual {actual}"
+            )
+
+        for child in node.get('Plans', []):
+            findings.extend(self.inspect_plan(child, ratio))
+        return findings
+
+    def report_unused_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT relname, indexrelname, idx_scan,
+                       pg_size_pretty(pg_relation_size(indexrelid))
+                FROM pg_stat_user_indexes
+                WHERE relname LIKE %s AND idx_scan = 0
+                ORDER BY pg_relation_size(indexrelid) DESC
+                """,
+                [Transaction._meta.db_table + '%'],
+            )
+            rows = cursor.fetchall()
+
+        if not rows:
+            self.stdout.write(self.style.SUCCESS("Every ledger index has been scanned at least once."))
+            return
+        self.stdout.write(self.style.WARNING(f"{len(rows)} ledger index(es) never scanned since stats reset:"))
+        for table, index, _, size in rows:
+            self.stdout.write(f"    - {index} on {table} ({size})")
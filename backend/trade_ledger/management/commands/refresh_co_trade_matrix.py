@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from trade_ledger.services.co_trade import DEFAULT_TOP_K, refresh_co_trade
+from utils.data_version import bump_data_version
+
+
+class Command(BaseCommand):
+    help = (
+        'Refreshes the precomputed co-traded products (ProductCoTrade) from the '
+        'sparse company x product incidence matrix. Incremental by default: only '
+        'products traded by companies with transactions ingested since the last '
+        'refresh are recomputed, unless rows seen by that refresh were deleted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every product and drop products without trades')
+        parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K, help='Neighbours stored per product')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Products multiplied and written per batch')
+
+    def handle(self, *args, **options):
+        written = refresh_co_trade(full=options['full'], top_k=options['top_k'], chunk_size=options['chunk_size'])
+        if not written:
+            self.stdout.write(self.style.SUCCESS("Co-trade matrix is up to date."))
+            return
+
+        bump_data_version('refresh_co_trade_matrix')
+        self.stdout.write(self.style.SUCCESS(f"Rewrote co-traded products for {written} product(s)."))
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models.functions import TruncMonth
+
+from trade_data.models import AggCompanyMonthProduct, AggProductMonthCountry, Transaction
+from trade_ledger.services.aggregates import get_refresh_state, ledger_state, refresh_month, set_watermark
+from utils.data_version import bump_data_version
+
+
+class Command(BaseCommand):
+    help = (
+        'Refreshes the monthly ledger aggregates (AggCompanyMonthProduct, '
+        'AggProductMonthCountry). Incremental by default: only months with '
+        'transactions ingested or rewritten since the last refresh are recomputed, '
+        'every month when aggregated transactions were deleted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every month and drop months that no longer have data')
+        parser.add_argument('--months', nargs='+', default=None, metavar='YYYY-MM',
+                            help='Also recompute these months (e.g. after deleting transactions)')
+
+    def handle(self, *args, **options):
+        # Captured before reading so rows ingested mid-refresh are picked up next run.
+        current = ledger_state()
+        new_watermark = current['watermark']
+        if new_watermark is None:
+            self.stdout.write(self.style.WARNING("No transactions found - nothing to aggregate."))
+            return
+
+        touched = Transaction.objects.order_by()
+        state = get_refresh_state() or {}
+        watermark = state.get('watermark')
+        if watermark is not None and not options['full'] and state.get('row_count') is not None:
+            # Rows covered by the last refresh that are gone (deleted) or moved
+            # past the watermark leave stale months nobody can name: recompute all.
+            kept = Transaction.objects.filter(ingested_at__lte=watermark).count()
+            if kept < state['row_count']:
+                self.stdout.write(self.style.WARNING(
+                    f"{state['row_count'] - kept} aggregated transaction(s) deleted or rewritten - recomputing every month."
+                ))
+                options['full'] = True
+        if watermark is not None and not options['full']:
+            touched = touched.filter(ingested_at__gt=watermark)
+        months = set(
+            touched.annotate(month=TruncMonth('reporting_date')).values_list('month', flat=True).distinct()
+        )
+
+        for value in options['months'] or []:
+            try:
+                months.add(datetime.strptime(value, '%Y-%m').date())
+            except ValueError:
+                raise CommandError(f"Invalid month '{value}', expected YYYY-MM")
+
+        if options['full']:
+            AggCompanyMonthProduct.objects.exclude(month__in=months).delete()
+            AggProductMonthCountry.objects.exclude(month__in=months).delete()
+
+        if not months:
+            if state.get('watermark') != new_watermark or state.get('row_count') != current['row_count']:
+                set_watermark(new_watermark, row_count=current['row_count'])
+                # aggregates_are_current is memoized per data version.
+                bump_data_version('refresh_ledger_aggregates')
+            self.stdout.write(self.style.SUCCESS("Aggregates are up to date."))
+            return
+
+        self.stdout.write(f"Refreshing {len(months)} month(s)...")
+        total = 0
+        for month in sorted(months):
+            rows = refresh_month(month)
+            total += rows
+            self.stdout.write(f"  {month:%Y-%m}: {rows} aggregate rows")
+
+        set_watermark(new_watermark, row_count=current['row_count'])
+        bump_data_version('refresh_ledger_aggregates')
+        self.stdout.write(self.style.SUCCESS(f"Wrote {total} aggregate rows across {len(months)} month(s)."))
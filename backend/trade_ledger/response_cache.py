@@ -0,0 +1,242 @@
+"""
+Response cache for the trade ledger JSON endpoints.
+
+``cached_json`` replaces ``cache_page`` on the views in ``trade_ledger.views``:
+
+- Keys are built from the view name, URL kwargs and a canonical form of the
+  query parameters (or JSON body for POST views): only the parameters the view
+  reads, sorted, with blanks dropped, defaults filled in, dates in ISO format
+  and integer ids normalized. ``?country=Brazil&direction=import`` and
+  ``?direction=import&country=Brazil&date_from=`` share one entry, and
+  cache-busting extras such as ``?_=1712345`` are ignored.
+- Keys include the global data version (utils.data_version), so every load
+  invalidates them and the freshness window can be long.
+- Once an entry is past its fresh window it is served stale for up to
+  ``stale_ttl`` seconds while a single request recomputes it. A lock taken
+  with ``cache.add`` makes sure only one worker recomputes a given page; the
+  others keep serving the stale copy, or on a cold miss wait briefly for the
+  winner's result.
+- Hits, stale hits, misses and recompute times are counted per view and
+  returned by ``get_cache_stats`` (served at ``/cache-stats/``).
+"""
+
+import json
+import time
+from datetime import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from utils.data_version import get_data_version_info, versioned_cache_key
+
+FILTER_PARAMS = (
+    'direction', 'date_from', 'date_to', 'country',
+    'product_category_id', 'product_subcategory_id', 'product_item_id',
+)
+DATE_PARAMS = {'date_from', 'date_to'}
+INT_PARAMS = {'limit', 'top_k', 'product_category_id', 'product_subcategory_id', 'product_item_id'}
+
+DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%Y%m%d')
+
+STAT_FIELDS = ('hits', 'stale_hits', 'misses', 'recomputes', 'recompute_ms', 'recompute_ms_max')
+
+_registered_views = []
+
+
+def _config(name, default):
+    return getattr(settings, 'LEDGER_RESPONSE_CACHE', {}).get(name, default)
+
+
+def parse_date(value):
+    """Date from 'YYYY-MM-DD', 'YYYY/MM/DD', 'YYYYMMDD' or an ISO datetime; None if unparseable."""
+    if not value:
+        return None
+    value = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        return None
+
+
+def canonical_params(source, params, defaults=None):
+    """
+    Sorted tuple of (name, value) pairs for the ``params`` a view reads from
+    ``source`` (QueryDict or dict), normalized the same way the view parses them.
+
+    ``defaults`` apply only to absent params, as with ``request.GET.get(name,
+    default)``: a blank ``?direction=`` reaches the view as '' (both sides),
+    so it keeps its own key instead of sharing the default's.
+    """
+    defaults = defaults or {}
+    items = []
+    for name in sorted(params):
+        value = source.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None:
+            value = defaults.get(name)
+        if value in ('', []) and name in defaults:
+            items.append((name, ''))
+            continue
+        if value in (None, '', []):
+            continue
+
+        if name in DATE_PARAMS:
+            parsed = parse_date(value)
+            if parsed is None:
+                continue  # the view treats unparseable dates as "no filter"
+            value = parsed.isoformat()
+        elif name in INT_PARAMS:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                value = str(value)
+        elif isinstance(value, list):
+            value = tuple(str(v).strip() for v in value)
+        else:
+            value = str(value)
+        items.append((name, value))
+    return tuple(items)
+
+
+# -------------------------
+# STATS
+# -------------------------
+
+def _stat_key(view_name, field):
+    return f"tl:cache_stats:{view_name}:{field}"
+
+
+def _incr(key, delta=1):
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        if cache.add(key, delta, timeout=None):
+            return delta
+        return cache.incr(key, delta)
+
+
+def _record_recompute(view_name, elapsed_ms):
+    _incr(_stat_key(view_name, 'recomputes'))
+    _incr(_stat_key(view_name, 'recompute_ms'), elapsed_ms)
+    max_key = _stat_key(view_name, 'recompute_ms_max')
+    if elapsed_ms > (cache.get(max_key) or 0):
+        cache.set(max_key, elapsed_ms, timeout=None)
+
+
+def get_cache_stats():
+    """Per-view counters plus hit ratio and mean recompute time, and the current data version."""
+    views = {}
+    for view_name in _registered_views:
+        values = cache.get_many([_stat_key(view_name, f) for f in STAT_FIELDS])
+        row = {f: values.get(_stat_key(view_name, f), 0) for f in STAT_FIELDS}
+        served = row['hits'] + row['stale_hits'] + row['misses']
+        row['hit_ratio'] = round((row['hits'] + row['stale_hits']) / served, 4) if served else None
+        row['recompute_ms_avg'] = round(row['recompute_ms'] / row['recomputes'], 1) if row['recomputes'] else None
+        views[view_name] = row
+    version, bumped_at = get_data_version_info()
+    return {'data_version': version, 'data_version_bumped_at': bumped_at, 'views': views}
+
+
+def reset_cache_stats():
+    cache.delete_many([_stat_key(v, f) for v in _registered_views for f in STAT_FIELDS])
+
+
+# -------------------------
+# DECORATOR
+# -------------------------
+
+def _to_response(entry, state):
+    response = HttpResponse(entry['body'], status=entry['status'], content_type=entry['content_type'])
+    response['X-Cache'] = state
+    return response
+
+
+def cached_json(view_name, params=(), defaults=None, timeout=60 * 60, stale_ttl=None, from_body=False):
+    """
+    Caches a JSON view's 200 responses under a canonical, data-versioned key.
+
+    ``params`` lists the query parameters (or JSON body fields with
+    ``from_body=True``) the view reads; ``defaults`` are the values it
+    assumes when one is missing. Entries are fresh for ``timeout`` seconds
+    and may then be served stale for ``stale_ttl`` more seconds while one
+    request recomputes them. Positional and keyword path arguments are part
+    of the key.
+    """
+    _registered_views.append(view_name)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _config('ENABLED', True):
+                return view_func(request, *args, **kwargs)
+
+            if from_body:
+                try:
+                    source = json.loads(request.body)
+                except ValueError:
+                    return view_func(request, *args, **kwargs)
+                if not isinstance(source, dict):
+                    return view_func(request, *args, **kwargs)
+            else:
+                source = request.GET
+
+            key = versioned_cache_key(
+                f"tl:{view_name}",
+                args,
+                tuple(sorted(kwargs.items())),
+                canonical_params(source, params, defaults),
+            )
+            lock_key = f"{key}:lock"
+            now = time.time()
+            entry = cache.get(key)
+
+            if entry is not None and now < entry['fresh_until']:
+                _incr(_stat_key(view_name, 'hits'))
+                return _to_response(entry, 'HIT')
+
+            owns_lock = cache.add(lock_key, 1, timeout=_config('LOCK_TIMEOUT', 30))
+            if not owns_lock:
+                if entry is not None:
+                    # Someone else is already recomputing this page.
+                    _incr(_stat_key(view_name, 'stale_hits'))
+                    return _to_response(entry, 'STALE')
+                # Cold miss while another worker computes it: wait for its result.
+                deadline = now + _config('LOCK_WAIT', 5)
+                while time.time() < deadline:
+                    time.sleep(0.05)
+                    entry = cache.get(key)
+                    if entry is not None:
+                        _incr(_stat_key(view_name, 'hits'))
+                        return _to_response(entry, 'HIT')
+
+            _incr(_stat_key(view_name, 'misses'))
+            try:
+                started = time.perf_counter()
+                response = view_func(request, *args, **kwargs)
+                _record_recompute(view_name, int((time.perf_counter() - started) * 1000))
+
+                if response.status_code == 200 and not response.streaming:
+                    fresh_for = timeout
+                    stale_for = _config('STALE_TTL', 24 * 60 * 60) if stale_ttl is None else stale_ttl
+                    cache.set(key, {
+                        'body': response.content,
+                        'status': response.status_code,
+                        'content_type': response['Content-Type'],
+                        'fresh_until': time.time() + fresh_for,
+                    }, timeout=fresh_for + stale_for)
+            finally:
+                if owns_lock:
+                    cache.delete(lock_key)
+
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,196 @@
+"""
+Maintained monthly aggregates of the ledger (AggCompanyMonthProduct,
+AggProductMonthCountry).
+
+``refresh_month`` rebuilds every aggregate row of one calendar month from
+Transaction; the ``refresh_ledger_aggregates`` command calls it for the months
+touched since the last ingestion watermark. Commands that rewrite existing
+rows with ``update()`` set ``ingested_at=Now()`` themselves (``auto_now`` only
+applies to ``save()``) so their months count as touched.
+
+``company_month_aggregates`` is the read side used by the company services:
+it returns a filtered AggCompanyMonthProduct queryset when the requested
+filters can be answered from monthly rows (company + import/export direction,
+whole-month date range) and the aggregates are up to date, and ``None``
+otherwise so the caller falls back to Transaction. The up-to-date check reads
+the whole ledger, so it is memoized per data version: every command that
+ingests, deletes or backfills transactions bumps the version afterwards.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction as db_transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, Max, Sum
+from django.db.models.functions import NullIf
+
+from trade_data.models import (
+    AggCompanyMonthProduct,
+    AggProductMonthCountry,
+    AggregateRefreshState,
+    Transaction,
+)
+from utils.data_version import per_data_version
+from .filters import counterparty_country_field
+from .snapshots import month_bounds
+
+
+STATE_NAME = 'ledger_monthly'
+
+# Average usd_per_mt over the underlying transactions, rolled up from monthly rows.
+AGG_AVG_PRICE = ExpressionWrapper(
+    Sum('price_sum') / NullIf(Sum('price_count'), 0),
+    output_field=DecimalField(max_digits=20, decimal_places=6),
+)
+
+MEASURES = dict(
+    total_qty_mt=Sum('qty_mt'),
+    total_usd=Sum('usd'),
+    price_sum=Sum('usd_per_mt'),
+    price_count=Count('usd_per_mt'),
+    transaction_count=Count('id'),
+)
+
+
+# -------------------------
+# REFRESH
+# -------------------------
+
+def _measures(row):
+    return {
+        'total_qty_mt': row['total_qty_mt'] or 0,
+        'total_usd': row['total_usd'],
+        'price_sum': row['price_sum'] or 0,
+        'price_count': row['price_count'],
+        'transaction_count': row['transaction_count'],
+    }
+
+
+def refresh_month(month, batch_size=5000):
+    """Recomputes all aggregate rows for the month containing ``month``. Returns rows written."""
+    month_start, month_end = month_bounds(month)
+    rows = Transaction.objects.filter(
+        reporting_date__gte=month_start, reporting_date__lt=month_end
+    ).order_by()
+    product_keys = ('product_item_id', 'sub_category_id', 'category_id')
+
+    company_rows = []
+    for direction, company_field in (('import', 'buyer'), ('export', 'seller')):
+        country_field = counterparty_country_field(direction)
+        for row in rows.values(company_field, country_field, *product_keys).annotate(**MEASURES):
+            company_rows.append(AggCompanyMonthProduct(
+                month=month_start,
+                direction=direction,
+                company=row[company_field],
+                country=row[country_field],
+                **{key: row[key] for key in product_keys},
+                **_measures(row),
+            ))
+
+    market_rows = [
+        AggProductMonthCountry(
+            month=month_start,
+            trade_type=row['trade_type'],
+            origin_country=row['origin_country'],
+            destination_country=row['destination_country'],
+            **{key: row[key] for key in product_keys},
+            **_measures(row),
+        )
+        for row in rows.values('trade_type', 'origin_country', 'destination_country', *product_keys).annotate(**MEASURES)
+    ]
+
+    with db_transaction.atomic():
+        AggCompanyMonthProduct.objects.filter(month=month_start).delete()
+        AggProductMonthCountry.objects.filter(month=month_start).delete()
+        AggCompanyMonthProduct.objects.bulk_create(company_rows, batch_size=batch_size)
+        AggProductMonthCountry.objects.bulk_create(market_rows, batch_size=batch_size)
+
+    return len(company_rows) + len(market_rows)
+
+
+def get_watermark(name=STATE_NAME):
+    return (
+        AggregateRefreshState.objects.filter(name=name)
+        .values_list('watermark', flat=True)
+        .first()
+    )
+
+
+def get_refresh_state(name=STATE_NAME):
+    """``{'watermark', 'row_count'}`` of the last refresh, or None."""
+    return AggregateRefreshState.objects.filter(name=name).values('watermark', 'row_count').first()
+
+
+def set_watermark(watermark, name=STATE_NAME, row_count=None):
+    AggregateRefreshState.objects.update_or_create(
+        name=name, defaults={'watermark': watermark, 'row_count': row_count}
+    )
+
+
+def ledger_state():
+    """``{'watermark': Max(ingested_at), 'row_count': Count}`` of Transaction, from one query."""
+    return Transaction.objects.aggregate(watermark=Max('ingested_at'), row_count=Count('id'))
+
+
+# -------------------------
+# READ
+# -------------------------
+
+@per_data_version
+def aggregates_are_current():
+    """
+    True when the aggregates cover exactly the current ledger rows: nothing
+    ingested or rewritten since the refresh (backfills stamp ``ingested_at``)
+    and no rows deleted (the row count still matches). Checked once per
+    data version.
+    """
+    state = get_refresh_state()
+    if state is None or state['watermark'] is None or state['row_count'] is None:
+        return False
+    current = ledger_state()
+    if current['watermark'] is not None and current['watermark'] > state['watermark']:
+        return False
+    return current['row_count'] == state['row_count']
+
+
+def is_month_aligned(date_from=None, date_to=None):
+    """True when the range starts on a 1st and ends on a month's last day (open ends allowed)."""
+    if date_from and date_from.day != 1:
+        return False
+    if date_to and (date_to + timedelta(days=1)).day != 1:
+        return False
+    return True
+
+
+def company_month_aggregates(
+    direction=None,
+    company_name=None,
+    date_from=None,
+    date_to=None,
+    country=None,
+    product_category_id=None,
+    product_subcategory_id=None,
+    product_item_id=None,
+):
+    """
+    AggCompanyMonthProduct rows matching the same filters as
+    apply_transaction_filters, or None when those filters need raw transactions.
+    """
+    if direction not in ('import', 'export') or not company_name:
+        return None
+    if not is_month_aligned(date_from, date_to) or not aggregates_are_current():
+        return None
+
+    qs = AggCompanyMonthProduct.objects.filter(direction=direction, company=company_name).order_by()
+    if date_from:
+        qs = qs.filter(month__gte=date_from)
+    if date_to:
+        qs = qs.filter(month__lte=date_to)
+    if country:
+        qs = qs.filter(country=country)
+    if product_item_id:
+        qs = qs.filter(product_item_id=product_item_id)
+    elif product_subcategory_id:
+        qs = qs.filter(sub_category_id=product_subcategory_id)
+    elif product_category_id:
+        qs = qs.filter(category_id=product_category_id)
+    return qs
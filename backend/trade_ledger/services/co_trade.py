@@ -0,0 +1,151 @@
+"""
+Precomputed product co-trade neighbours (ProductCoTrade).
+
+A is the sparse company x product incidence matrix (1 when a company traded
+the product, as buyer or seller), built in CSR from the distinct
+(company, product) pairs of the ledger. (A^T.A)[x, y] is the number of
+companies trading both x and y; ``refresh_co_trade`` stores the ``top_k``
+largest off-diagonal entries of each product's row, so the "co-traded
+products" panel is one indexed lookup instead of a scan over every
+transaction of every company that ever traded the product.
+
+Incremental by default: a new (company, product) pair changes the rows of
+every product that company trades, so only those rows are recomputed for
+companies with transactions ingested since the last refresh. ``full=True``
+rewrites every row and drops products that no longer have trades; it is
+forced when rows covered by the last refresh were deleted, since a lost pair
+can shrink rows the incremental pass never revisits. Products without a
+stored list yet are answered by ``live_neighbours`` from the ledger.
+"""
+
+from collections import Counter
+
+import numpy as np
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from scipy import sparse
+
+from trade_data.models import ProductCoTrade, Transaction
+from .aggregates import get_refresh_state, ledger_state, set_watermark
+
+STATE_NAME = 'product_co_trade'
+DEFAULT_TOP_K = 20
+
+
+def _company_product_pairs(companies=None):
+    named = Q(product_item__isnull=False)
+    buyers = Transaction.objects.filter(named, buyer__isnull=False).exclude(buyer='')
+    sellers = Transaction.objects.filter(named, seller__isnull=False).exclude(seller='')
+    if companies is not None:
+        buyers = buyers.filter(buyer__in=companies)
+        sellers = sellers.filter(seller__in=companies)
+    buyers = buyers.order_by().values_list('buyer', 'product_item_id')
+    sellers = sellers.order_by().values_list('seller', 'product_item_id')
+    return buyers.union(sellers)  # UNION drops duplicate pairs
+
+
+def build_incidence():
+    """(A, company index {name: row}, product ids by column) for the whole ledger."""
+    company_index = {}
+    rows, product_ids = [], []
+    for company, product_id in _company_product_pairs().iterator():
+        rows.append(company_index.setdefault(company, len(company_index)))
+        product_ids.append(product_id)
+
+    products, cols = np.unique(np.asarray(product_ids, dtype=np.int64), return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (np.asarray(rows, dtype=np.int64), cols)),
+        shape=(len(company_index), len(products)),
+    )
+    return matrix, company_index, products
+
+
+def top_neighbours(matrix, products, columns, top_k=DEFAULT_TOP_K):
+    """
+    Yields (product_id, [(neighbour_id, companies), ...]) for the product
+    ``columns`` of A: their rows of A^T.A, largest first (ties by product id),
+    without the product itself.
+    """
+    if len(columns) == 0:
+        return
+    co_trade = (matrix[:, columns].T @ matrix).tocsr()
+    for i, column in enumerate(columns):
+        start, end = co_trade.indptr[i], co_trade.indptr[i + 1]
+        cols, counts = co_trade.indices[start:end], co_trade.data[start:end]
+        keep = cols != column
+        cols, counts = cols[keep], counts[keep]
+        order = np.lexsort((products[cols], -counts))[:top_k]
+        yield int(products[column]), [(int(products[cols[j]]), int(counts[j])) for j in order]
+
+
+def live_neighbours(product_item_id, top_k=DEFAULT_TOP_K):
+    """
+    The ``top_neighbours`` row of one product computed straight from the
+    ledger: [(neighbour_id, companies), ...], same order as the stored lists.
+    """
+    traded = Transaction.objects.filter(product_item_id=product_item_id).order_by()
+    companies = (
+        set(traded.values_list('buyer', flat=True).distinct())
+        | set(traded.values_list('seller', flat=True).distinct())
+    ) - {None, ''}
+    if not companies:
+        return []
+    counts = Counter(
+        product_id for _, product_id in _company_product_pairs(companies).iterator()
+        if product_id != product_item_id
+    )
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+
+
+def _write(neighbour_lists):
+    product_ids = [product_id for product_id, _ in neighbour_lists]
+    rows = [
+        ProductCoTrade(product_item_id=product_id, neighbour_id=neighbour_id, companies=companies, rank=rank)
+        for product_id, neighbours in neighbour_lists
+        for rank, (neighbour_id, companies) in enumerate(neighbours, start=1)
+    ]
+    with db_transaction.atomic():
+        ProductCoTrade.objects.filter(product_item_id__in=product_ids).delete()
+        ProductCoTrade.objects.bulk_create(rows)
+
+
+def refresh_co_trade(full=False, top_k=DEFAULT_TOP_K, chunk_size=1000):
+    """
+    Recomputes the stored neighbour lists (all of them, or only those touched
+    since the last refresh). Returns the number of products rewritten.
+    """
+    # Captured before reading so rows ingested mid-refresh are picked up next run.
+    current = ledger_state()
+    state = get_refresh_state(STATE_NAME) or {}
+    watermark = state.get('watermark')
+    full = full or watermark is None or state.get('row_count') is None
+    if not full and Transaction.objects.filter(ingested_at__lte=watermark).count() < state['row_count']:
+        # Rows seen by the last refresh are gone: their pairs may linger in any row.
+        full = True
+
+    matrix, company_index, products = build_incidence()
+
+    if full:
+        columns = np.arange(len(products))
+        stored = set(ProductCoTrade.objects.values_list('product_item_id', flat=True).distinct())
+        stale = list(stored - set(products.tolist()))
+        for start in range(0, len(stale), chunk_size):
+            ProductCoTrade.objects.filter(product_item_id__in=stale[start:start + chunk_size]).delete()
+    else:
+        changed = Transaction.objects.filter(ingested_at__gt=watermark).order_by()
+        companies = (
+            set(changed.values_list('buyer', flat=True).distinct())
+            | set(changed.values_list('seller', flat=True).distinct())
+        )
+        company_rows = [company_index[c] for c in companies if c in company_index]
+        columns = np.unique(matrix[company_rows].indices) if company_rows else np.arange(0)
+
+    written = 0
+    for start in range(0, len(columns), chunk_size):
+        chunk = list(top_neighbours(matrix, products, columns[start:start + chunk_size], top_k))
+        _write(chunk)
+        written += len(chunk)
+
+    if current['watermark'] is not None:
+        set_watermark(current['watermark'], STATE_NAME, row_count=current['row_count'])
+    return written
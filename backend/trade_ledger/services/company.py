@@ -1,96 +1,240 @@
-from django.db.models import Sum, Avg, Count, F
+from django.db import connection
+from django.db.models import Sum, Avg, Case, Count, F, IntegerField, Q, Value, When
 from datetime import date, timedelta
 from trade_data.models import Transaction
-from .filters import apply_transaction_filters
+from .aggregates import company_month_aggregates, is_month_aligned
+from .filters import apply_transaction_filters, counterparty_country_field, country_filter_q
 
 
-def get_mom_growth_for_company(company_name, direction='import', date_to=None):
-    """
-    Computes Month-over-Month growth in volume (%).
-    Compares the last full month vs the prior full month.
-    """
+def mom_windows(date_to=None):
+    """(last_start, last_end, prior_start, prior_end): the last full month before ``date_to`` and the one before it."""
     if date_to is None:
         date_to = date.today()
 
-    
-    if date_to.day == 1:
-        
-        last_month_end = date_to.replace(day=1) - timedelta(days=1)
-    else:
-        last_month_end = date_to.replace(day=1) - timedelta(days=1)
-
-    
+    last_month_end = date_to.replace(day=1) - timedelta(days=1)
     last_month_start = last_month_end.replace(day=1)
-
-    
     prior_month_end = last_month_start - timedelta(days=1)
     prior_month_start = prior_month_end.replace(day=1)
+    return last_month_start, last_month_end, prior_month_start, prior_month_end
+
+
+def growth_pct(current, previous):
+    if not previous:
+        return None
+    return round(((current - previous) / previous) * 100, 2)
 
-    base_qs = Transaction.objects.all()
-    if direction == 'import':
-        base_qs = base_qs.filter(buyer=company_name)
+
+def get_mom_growth_for_company(company_name, direction='import', date_to=None):
+    """
+    Computes Month-over-Month growth in volume (%).
+    Compares the last full month vs the prior full month.
+    """
+    last_month_start, last_month_end, prior_month_start, prior_month_end = mom_windows(date_to)
+
+    agg = company_month_aggregates(
+        direction=direction,
+        company_name=company_name,
+        date_from=prior_month_start,
+        date_to=last_month_end,
+    )
+    if agg is not None:
+        monthly = dict(agg.values('month').annotate(v=Sum('total_qty_mt')).values_list('month', 'v'))
+        last_month_vol = monthly.get(last_month_start) or 0
+        prior_month_vol = monthly.get(prior_month_start) or 0
     else:
-        base_qs = base_qs.filter(seller=company_name)
+        base_qs = Transaction.objects.all()
+        if direction == 'import':
+            base_qs = base_qs.filter(buyer=company_name)
+        else:
+            base_qs = base_qs.filter(seller=company_name)
+
+        last_month_vol = base_qs.filter(
+            reporting_date__range=[last_month_start, last_month_end]
+        ).aggregate(v=Sum('qty_mt'))['v'] or 0
+
+        prior_month_vol = base_qs.filter(
+            reporting_date__range=[prior_month_start, prior_month_end]
+        ).aggregate(v=Sum('qty_mt'))['v'] or 0
+
+    return growth_pct(last_month_vol, prior_month_vol)
+
+
+# -------------------------
+# Company overview: two queries for the whole page
+# -------------------------
+
+def filters_scope_q(
+    direction=None,
+    date_from=None,
+    date_to=None,
+    country=None,
+    product_category_id=None,
+    product_subcategory_id=None,
+    product_item_id=None,
+    monthly=False,
+):
+    """
+    The non-company filters of apply_transaction_filters as one Q, for
+    Transaction rows or (``monthly=True``) AggCompanyMonthProduct rows.
+    """
+    date_field = 'month' if monthly else 'reporting_date'
+    q = Q()
+    if date_from:
+        q &= Q(**{f'{date_field}__gte': date_from})
+    if date_to:
+        q &= Q(**{f'{date_field}__lte': date_to})
+    if country:
+        q &= Q(country=country) if monthly else country_filter_q(country, direction)
+    if product_item_id:
+        q &= Q(product_item_id=product_item_id)
+    elif product_subcategory_id:
+        q &= Q(sub_category_id=product_subcategory_id)
+    elif product_category_id:
+        q &= Q(category_id=product_category_id)
+    return q
+
+
+def in_scope_flag(scope_q):
+    """1 for rows matching ``scope_q``, else 0 (always 1 without filters)."""
+    if not scope_q:
+        return Value(1, output_field=IntegerField())
+    return Case(When(scope_q, then=Value(1)), default=Value(0), output_field=IntegerField())
+
+
+def _overview_scalars(company_name, direction, scope_q, date_to=None):
+    """
+    Totals, average price and distinct partners for the filtered rows, plus
+    the two MoM month windows, in one conditional-aggregation query over the
+    company's raw transactions (distinct partners cannot be rolled up from
+    monthly aggregates).
+    """
+    last_start, last_end, prior_start, prior_end = mom_windows(date_to)
+    last_q = Q(reporting_date__range=[last_start, last_end])
+    prior_q = Q(reporting_date__range=[prior_start, prior_end])
+
+    qs = apply_transaction_filters(Transaction.objects.all(), direction=direction, company_name=company_name)
+    if scope_q:
+        qs = qs.filter(scope_q | Q(reporting_date__range=[prior_start, last_end]))
+
+    return qs.aggregate(
+        total_volume=Sum('qty_mt', filter=scope_q),
+        total_value=Sum('usd', filter=scope_q),
+        avg_price=Avg('usd_per_mt', filter=scope_q),
+        active_partners=Count('seller' if direction == 'import' else 'buyer', distinct=True, filter=scope_q),
+        last_month_volume=Sum('qty_mt', filter=last_q),
+        prior_month_volume=Sum('qty_mt', filter=prior_q),
+    )
 
-    
-    last_month_vol = base_qs.filter(
-        reporting_date__range=[last_month_start, last_month_end]
-    ).aggregate(v=Sum('qty_mt'))['v'] or 0
 
-    
-    prior_month_vol = base_qs.filter(
-        reporting_date__range=[prior_month_start, prior_month_end]
-    ).aggregate(v=Sum('qty_mt'))['v'] or 0
+def _overview_groups(company_name, direction, filters):
+    """
+    Per-country and per-product volumes in one grouped query: countries over
+    the company's whole history (with the filtered share as scope_volume) and
+    products within the filters. Reads the monthly aggregates when they can
+    answer the filters, raw transactions otherwise.
+    """
+    agg = None
+    if is_month_aligned(filters.get('date_from'), filters.get('date_to')):
+        agg = company_month_aggregates(direction=direction, company_name=company_name)
+
+    if agg is not None:
+        scope_q = filters_scope_q(direction, monthly=True, **filters)
+        base = agg.annotate(in_scope=in_scope_flag(scope_q)).values(
+            'country', 'in_scope',
+            volume=F('total_qty_mt'),
+            value=F('total_usd'),
+            product_name=F('product_item__name'),
+            subcat=F('sub_category__name'),
+            cat=F('category__name'),
+        )
+    else:
+        scope_q = filters_scope_q(direction, **filters)
+        qs = apply_transaction_filters(Transaction.objects.all(), direction=direction, company_name=company_name)
+        base = qs.order_by().annotate(in_scope=in_scope_flag(scope_q)).values(
+            'in_scope',
+            country=F(counterparty_country_field(direction)),
+            volume=F('qty_mt'),
+            value=F('usd'),
+            product_name=F('product_item__name'),
+            subcat=F('product_item__sub_category__name'),
+            cat=F('product_item__sub_category__category__name'),
+        )
 
-    if prior_month_vol == 0:
-        return None 
-    return round(((last_month_vol - prior_month_vol) / prior_month_vol) * 100, 2)
+    base_sql, base_params = base.query.sql_with_params()
+    sql = f"""
+        WITH base AS ({base_sql})
+        SELECT 'country' AS kind, country AS label, NULL AS subcat, NULL AS cat,
+               SUM(volume) FILTER (WHERE in_scope = 1) AS scope_volume,
+               SUM(volume) AS volume, SUM(value) AS value
+        FROM base
+        GROUP BY country
+        UNION ALL
+        SELECT 'product', product_name, subcat, cat, SUM(volume), NULL, NULL
+        FROM base
+        WHERE in_scope = 1 AND product_name IS NOT NULL
+        GROUP BY product_name, subcat, cat
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, base_params)
+        return cursor.fetchall()
 
-def get_company_overview_metrics(company_name, direction='import', **filters):
-    from datetime import timedelta  
 
-    qs = Transaction.objects.all()
-    qs = apply_transaction_filters(qs, direction=direction, company_name=company_name, **filters)
+def get_company_overview_metrics(company_name, direction='import', country_limit=10, **filters):
+    """
+    Headline metrics for the company overview page in two queries (see
+    _overview_scalars and _overview_groups): totals, partners, MoM growth,
+    top 3 products and countries within the filters, and the top
+    ``country_limit`` counterparty countries over the company's whole history.
+    """
+    scope_q = filters_scope_q(direction, **filters)
+    totals = _overview_scalars(company_name, direction, scope_q, filters.get('date_to'))
 
-    total_volume = qs.aggregate(v=Sum('qty_mt'))['v'] or 0
-    total_value = qs.aggregate(v=Sum('usd'))['v'] or (total_volume * (qs.aggregate(p=Avg('usd_per_mt'))['p'] or 0))
-    active_partners = qs.aggregate(
-        c=Count('seller' if direction == 'import' else 'buyer', distinct=True)
-    )['c'] or 0
+    total_volume = totals['total_volume'] or 0
+    total_value = totals['total_value'] or (total_volume * (totals['avg_price'] or 0))
+    mom_growth = growth_pct(totals['last_month_volume'] or 0, totals['prior_month_volume'] or 0)
 
-    mom_growth = get_mom_growth_for_company(company_name, direction, filters.get('date_to'))
+    countries, products = [], []
+    for kind, label, subcat, cat, scope_volume, volume, value in _overview_groups(company_name, direction, filters):
+        if kind == 'country':
+            countries.append((label, scope_volume, volume, value))
+        else:
+            products.append({'name': label, 'subcat': subcat, 'cat': cat, 'vol': scope_volume})
 
-    top_products = (
-        qs.filter(product_item__isnull=False)
-        .values(
-            name=F('product_item__name'),
-            subcat=F('product_item__sub_category__name'),
-            cat=F('product_item__sub_category__category__name')
-        )
-        .annotate(vol=Sum('qty_mt'))
-        .order_by('-vol')[:3]
-    )
-    
-    
-    top_products_list = []
     vol_denom = float(total_volume) if total_volume else 1.0
-    
-    for p in top_products:
-        p_vol = float(p['vol'])
-        p['share_pct'] = round((p_vol / vol_denom) * 100, 1)
-        top_products_list.append(p)
-
-    top_countries = (
-        qs.values('country')
-        .annotate(vol=Sum('qty_mt'))
-        .order_by('-vol')[:3]
-    )
+    top_products_list = sorted(products, key=lambda p: (-float(p['vol']), p['name']))[:3]
+    for p in top_products_list:
+        p['share_pct'] = round((float(p['vol']) / vol_denom) * 100, 1)
+
+    in_scope = [c for c in countries if c[1] is not None]
+    top_countries = [
+        {'country': label, 'vol': scope_volume}
+        for label, scope_volume, _, _ in sorted(in_scope, key=lambda c: (-float(c[1]), c[0] or ''))[:3]
+    ]
+    country_distribution = [
+        {'name': label or 'Unknown', 'volume': float(volume or 0), 'value': float(value or 0)}
+        for label, _, volume, value in sorted(countries, key=lambda c: (-float(c[2] or 0), c[0] or ''))[:country_limit]
+    ]
 
     return {
         'est_revenue_usd': float(total_value),
         'total_volume_mt': float(total_volume),
-        'active_partners': active_partners,
+        'active_partners': totals['active_partners'] or 0,
         'mom_growth_pct': mom_growth,
         'top_products': top_products_list,
-        'top_countries': list(top_countries),
-    }
\ No newline at end of file
+        'top_countries': top_countries,
+        'country_distribution': country_distribution,
+    }
+
+def get_country_distribution(company_name, direction='import', limit=10):
+    """Volume and value per counterparty country, across the company's whole history."""
+    agg = company_month_aggregates(direction=direction, company_name=company_name)
+    if agg is not None:
+        rows = agg.values('country').annotate(volume=Sum('total_qty_mt'), value=Sum('total_usd'))
+    else:
+        company_field = 'buyer' if direction == 'import' else 'seller'
+        rows = (
+            Transaction.objects.filter(**{company_field: company_name})
+            .values(country=F(counterparty_country_field(direction)))
+            .annotate(volume=Sum('qty_mt'), value=Sum('usd'))
+        )
+    return rows.order_by('-volume')[:limit]
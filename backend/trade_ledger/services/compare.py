@@ -1,71 +1,136 @@
-from django.db.models import Sum, Avg, StdDev, F, FloatField, Count, Min
-from django.db.models.functions import Cast
+from django.db import connection
+from django.db.models import DateField, Q
 from trade_data.models import Transaction, CompanyEmbedding
-from .company import get_mom_growth_for_company
-from .filters import apply_transaction_filters
+from .company import filters_scope_q, growth_pct, in_scope_flag, mom_windows
 
-def get_company_comparison_metrics(company_names, direction='import', **filters):
-    results = {}
-    for name in company_names:
-        qs = Transaction.objects.all()
-        qs = apply_transaction_filters(qs, direction=direction, company_name=name, **filters)
+_to_date = DateField().to_python
 
-        
-        aggs = qs.aggregate(
-            total_vol=Sum('qty_mt'),
-            total_val=Sum('usd'),
-            active_partners=Count('seller' if direction == 'import' else 'buyer', distinct=True),
-            total_prods=Count('product_item', distinct=True),
-            first_txn=Min('reporting_date')
-        )
-        
-        total_volume = aggs['total_vol'] or 0
-        total_value = aggs['total_val'] or 0
-        active_partners = aggs['active_partners'] or 0
-        total_products = aggs['total_prods'] or 0
-        active_since = aggs['first_txn']
 
-        mom_growth = get_mom_growth_for_company(name, direction, filters.get('date_to'))
-        price_std = qs.aggregate(s=StdDev('usd_per_mt'))['s']
+def _comparison_rows(company_names, direction='import', **filters):
+    """
+    One query for every compared company: totals, partners, products, first
+    trade, price standard deviation and the two MoM windows by conditional
+    aggregation (GROUP BY company), and the partner HHI from per-partner
+    volumes divided by a window SUM over the company's total.
+
+    Returns {company: row dict}. direction='both' counts a company on either
+    side of a trade, with the other side as its partner.
+    """
+    scope_q = filters_scope_q(direction, **filters)
+    last_start, last_end, prior_start, prior_end = mom_windows(filters.get('date_to'))
+
+    if direction == 'import':
+        company_q = Q(buyer__in=company_names)
+    elif direction == 'export':
+        company_q = Q(seller__in=company_names)
+    else:
+        company_q = Q(buyer__in=company_names) | Q(seller__in=company_names)
+    qs = Transaction.objects.filter(company_q)
+    if scope_q:
+        qs = qs.filter(scope_q | Q(reporting_date__range=[prior_start, last_end]))
+
+    base_sql, base_params = (
+        qs.order_by()
+        .annotate(in_scope=in_scope_flag(scope_q))
+        .values('buyer', 'seller', 'qty_mt', 'usd', 'usd_per_mt', 'product_item_id', 'reporting_date', 'in_scope')
+        .query.sql_with_params()
+    )
+
+    placeholders = ', '.join(['%s'] * len(company_names))
+    columns = 'qty_mt, usd, usd_per_mt, product_item_id, reporting_date, in_scope'
+    side_params = list(company_names)
+    if direction == 'export':
+        sides = f"SELECT seller AS company, buyer AS partner, {columns} FROM base WHERE seller IN ({placeholders})"
+    else:
+        sides = f"SELECT buyer AS company, seller AS partner, {columns} FROM base WHERE buyer IN ({placeholders})"
+        if direction != 'import':
+            # A self-trade counts once.
+            sides += f"""
+            UNION ALL
+            SELECT seller, buyer, {columns} FROM base
+            WHERE seller IN ({placeholders}) AND buyer <> seller"""
+            side_params += list(company_names)
 
-        
-        total_vol_query = total_volume if total_volume > 0 else 1
-        hhi = (
-            qs.values('seller' if direction == 'import' else 'buyer')
-            .annotate(vol=Sum('qty_mt'))
-            .aggregate(
-                hhi=Sum(
-                    Cast(
-                        (F('vol') / total_vol_query) * (F('vol') / total_vol_query),
-                        FloatField()
-                    )
-                )
-            )['hhi'] or 1.0
+    sql = f"""
+        WITH base AS ({base_sql}),
+        sides AS ({sides}),
+        totals AS (
+            SELECT company,
+                   SUM(qty_mt) FILTER (WHERE in_scope = 1) AS total_vol,
+                   SUM(usd) FILTER (WHERE in_scope = 1) AS total_val,
+                   COUNT(DISTINCT partner) FILTER (WHERE in_scope = 1) AS active_partners,
+                   COUNT(DISTINCT product_item_id) FILTER (WHERE in_scope = 1) AS total_prods,
+                   MIN(reporting_date) FILTER (WHERE in_scope = 1) AS first_txn,
+                   STDDEV_POP(usd_per_mt) FILTER (WHERE in_scope = 1) AS price_std,
+                   SUM(qty_mt) FILTER (WHERE reporting_date BETWEEN %s AND %s) AS last_month_vol,
+                   SUM(qty_mt) FILTER (WHERE reporting_date BETWEEN %s AND %s) AS prior_month_vol
+            FROM sides
+            GROUP BY company
+        ),
+        partner_volumes AS (
+            SELECT company, partner, SUM(qty_mt) AS vol
+            FROM sides
+            WHERE in_scope = 1
+            GROUP BY company, partner
+        ),
+        hhi AS (
+            SELECT company, SUM(share * share) AS hhi
+            FROM (
+                SELECT company,
+                       CAST(vol AS FLOAT) / NULLIF(SUM(vol) OVER (PARTITION BY company), 0) AS share
+                FROM partner_volumes
+            ) shares
+            GROUP BY company
         )
-        partner_diversity = 1.0 - hhi
+        SELECT totals.company, total_vol, total_val, active_partners, total_prods, first_txn,
+               price_std, last_month_vol, prior_month_vol, hhi.hhi
+        FROM totals
+        LEFT JOIN hhi ON hhi.company = totals.company
+    """
+    params = list(base_params) + side_params + [last_start, last_end, prior_start, prior_end]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        fields = [col[0] for col in cursor.description]
+        return {row[0]: dict(zip(fields, row)) for row in cursor.fetchall()}
 
-        
-        pagerank = 0.0
-        degree = 0
-        try:
-            emb = CompanyEmbedding.objects.filter(company_name=name).first()
-            if emb:
-                pagerank = emb.pagerank
-                degree = emb.degree
-        except:
-            pass
+
+def get_company_comparison_metrics(company_names, direction='import', **filters):
+    """
+    Comparison metrics for ``company_names`` (any number of companies) in two
+    queries: _comparison_rows for the ledger metrics and one bulk
+    CompanyEmbedding lookup for the network metrics.
+    """
+    company_names = list(dict.fromkeys(company_names))
+    if not company_names:
+        return {}
+
+    rows = _comparison_rows(company_names, direction, **filters)
+    embeddings = {}
+    for emb in CompanyEmbedding.objects.filter(company_name__in=company_names).order_by('pk'):
+        embeddings.setdefault(emb.company_name, emb)
+
+    results = {}
+    for name in company_names:
+        row = rows.get(name, {})
+        total_volume = row.get('total_vol') or 0
+        total_value = row.get('total_val') or 0
+        price_std = row.get('price_std')
+        active_since = _to_date(row.get('first_txn'))
+        # No partner volume -> fully concentrated, as for a single partner.
+        hhi = row.get('hhi') or 1.0
+        emb = embeddings.get(name)
 
         results[name] = {
             'trade_volume': float(total_volume),
             'estimated_revenue': float(total_value),
-            'total_partners': active_partners,
-            'total_products': total_products,
-            'partner_diversity_score': float(partner_diversity),
-            'mom_growth_pct': mom_growth,
+            'total_partners': row.get('active_partners') or 0,
+            'total_products': row.get('total_prods') or 0,
+            'partner_diversity_score': float(1.0 - hhi),
+            'mom_growth_pct': growth_pct(row.get('last_month_vol') or 0, row.get('prior_month_vol') or 0),
             'price_volatility': float(price_std) if price_std else 0,
             'active_since': active_since.isoformat() if active_since else None,
-            'pagerank': float(pagerank),
-            'network_degree': degree,
+            'pagerank': float(emb.pagerank) if emb else 0.0,
+            'network_degree': emb.degree if emb else 0,
         }
-            
-    return results
\ No newline at end of file
+
+    return results
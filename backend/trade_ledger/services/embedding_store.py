@@ -0,0 +1,181 @@
+"""
+Process-wide company embedding matrix for similarity lookups.
+
+``get_company_embedding_store()`` loads every CompanyEmbedding once per data
+version (see utils.data_version.per_data_version) into a contiguous float32
+matrix with unit-length rows, a name -> row index and the cluster tags.
+Cosine similarity against all companies, or a subset of them, is then one
+matrix-vector product, and top-k selection uses argpartition instead of a
+full sort.
+
+Vectors are read from the binary column with one query (see
+trade_data.vectors.load_vectors). Rows whose dimension differs from the most
+common one (embeddings from an older model run) are left out, as the
+similarity code always did.
+
+``get_company_name_index()`` resolves a free-text company name to an embedded
+company without reading any embedding payloads: exact name, then normalized
+name (see trade_data.entities.normalize_entity_name), then candidates from
+first-word and character trigram postings ranked by trigram Jaccard
+similarity. The ranked list doubles as "did you mean" suggestions.
+"""
+
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from trade_data.entities import normalize_entity_name
+from trade_data.entity_resolution import shingles
+from trade_data.models import CompanyEmbedding
+from trade_data.vectors import load_vectors
+from utils.data_version import per_data_version
+
+
+def _unit(vectors):
+    """Rows scaled to unit length; zero rows stay zero (similarity 0 to everything)."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class CompanyEmbeddingStore:
+    """Unit-normalized company embeddings with name and cluster tag lookup."""
+
+    def __init__(self, names, vectors, tags):
+        self.names = list(names)
+        self.tags = list(tags)
+        self.index = {name: row for row, name in enumerate(self.names)}
+        self.vectors = np.ascontiguousarray(_unit(np.asarray(vectors, dtype=np.float32)))
+        self.dim = self.vectors.shape[1] if len(self.names) else 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def vector(self, name):
+        """Unit vector of ``name`` (a read-only view), or None."""
+        row = self.index.get(name)
+        if row is None:
+            return None
+        view = self.vectors[row]
+        view.flags.writeable = False
+        return view
+
+    def tag(self, name):
+        row = self.index.get(name)
+        return self.tags[row] if row is not None else None
+
+    def nearest(self, query, top_k=10, exclude=(), candidates=None):
+        """
+        ``[(name, cosine similarity, cluster tag), ...]`` for the ``top_k``
+        companies closest to ``query`` (a vector, or a company name in the
+        store), best first. ``candidates`` limits the search to those names;
+        ``exclude`` names are never returned.
+        """
+        if isinstance(query, str):
+            query = self.vector(query)
+            if query is None:
+                return []
+        query = np.asarray(query, dtype=np.float32).ravel()
+        if not len(self) or query.shape[0] != self.dim:
+            return []
+        query = _unit(query)
+
+        if candidates is None:
+            rows = np.arange(len(self))
+        else:
+            rows = np.fromiter(
+                (self.index[name] for name in set(candidates) if name in self.index), dtype=np.int64
+            )
+        if exclude:
+            excluded = [self.index[name] for name in exclude if name in self.index]
+            rows = rows[~np.isin(rows, excluded)]
+        k = min(top_k, len(rows))
+        if k <= 0:
+            return []
+
+        scores = self.vectors[rows] @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.names[rows[i]], float(scores[i]), self.tags[rows[i]]) for i in top]
+
+
+@per_data_version
+def get_company_embedding_store():
+    """The CompanyEmbeddingStore for the current data version (built on first use)."""
+    rows, vectors = load_vectors(CompanyEmbedding.objects.all(), 'company_name', 'cluster_tag')
+    return CompanyEmbeddingStore([name for name, _ in rows], vectors, [tag for _, tag in rows])
+
+
+class CompanyNameIndex:
+    """Exact, normalized, first-word and trigram lookups over company names."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.rows = {}
+        self.by_key = {}
+        self.first_words = defaultdict(list)
+        self.postings = defaultdict(list)
+        self.keys = []
+        self.sizes = []
+        for row, name in enumerate(self.names):
+            key = self._key(name)
+            self.rows.setdefault(name, row)
+            self.by_key.setdefault(key, row)
+            words = key.split()
+            if words:
+                self.first_words[words[0]].append(row)
+            grams = shingles(key)
+            for gram in grams:
+                self.postings[gram].append(row)
+            self.keys.append(key)
+            self.sizes.append(len(grams))
+
+    @staticmethod
+    def _key(name):
+        return normalize_entity_name(name) or str(name).strip().upper()
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=5, min_similarity=0.3):
+        """
+        ``[(name, similarity, close), ...]`` best first. ``close`` marks the
+        matches the old table scan accepted (one name contains the other, or
+        both start with the same word); they rank ahead of names that are only
+        similar, which need at least ``min_similarity`` trigram Jaccard.
+        """
+        if query is None or not str(query).strip():
+            return []
+        key = self._key(query)
+        exact = self.rows.get(query, self.by_key.get(key))
+        if exact is not None:
+            return [(self.names[exact], 1.0, True)]
+
+        grams = shingles(key)
+        shared = Counter(row for gram in grams for row in self.postings.get(gram, ()))
+        words = key.split()
+        for row in self.first_words.get(words[0], ()) if words else ():
+            shared.setdefault(row, 0)
+
+        ranked = []
+        for row, common in shared.items():
+            similarity = common / (len(grams) + self.sizes[row] - common)
+            candidate = self.keys[row]
+            close = key in candidate or candidate in key or candidate.split()[:1] == words[:1]
+            if close or similarity >= min_similarity:
+                ranked.append((-close, -similarity, self.names[row], similarity, close))
+        ranked.sort()
+        return [(name, similarity, close) for _, _, name, similarity, close in ranked[:limit]]
+
+    def resolve(self, query):
+        """The company ``query`` most likely refers to, or None."""
+        best = self.search(query, limit=1)
+        return best[0][0] if best and best[0][2] else None
+
+
+@per_data_version
+def get_company_name_index():
+    """The CompanyNameIndex for the current data version (names only, no embeddings)."""
+    return CompanyNameIndex(CompanyEmbedding.objects.order_by('company_name').values_list('company_name', flat=True))
@@ -1,214 +1,508 @@
-from django.db.models import Sum, Avg, Count, Q, F, Max, Min
-from django.db.models.functions import ExtractYear
-from trade_data.models import Transaction
-from .filters import apply_transaction_filters
-from datetime import datetime, timedelta
+from django.db import connection
+from django.db.models import Sum, Avg, Count, F, Max, Min, Q, DateField, DecimalField, Value
+from django.db.models.functions import Coalesce
+from trade_data.models import ProductItem, Transaction
+from .filters import apply_transaction_filters, counterparty_country_field, country_filter_q
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
 from collections import defaultdict
+import base64
+import binascii
+import json
 
-def get_explorer_companies(
-    direction='import',
+
+# Explorer sort keys -> the row field they order by (largest first, ties by company name).
+EXPLORER_SORTS = {
+    'volume': 'total_volume',
+    'value': 'total_value',
+    'partners': 'active_partners',
+    'last_trade': 'last_trade',
+}
+
+
+def encode_explorer_cursor(row, sort='volume'):
+    """
+    Opaque keyset cursor pointing just after ``row``: its sort metric and
+    company name, url-safe base64. Built from the raw (pre-float) values so
+    the next page starts exactly where this one stopped.
+    """
+    value = row[EXPLORER_SORTS[sort]]
+    if isinstance(value, date):
+        value = value.isoformat()
+    elif isinstance(value, (Decimal, float)):
+        value = str(value)
+    payload = json.dumps([sort, value, row['company']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_explorer_cursor(cursor, sort='volume'):
+    """
+    (metric value, company) from ``encode_explorer_cursor``. Raises ValueError
+    for malformed cursors and for cursors issued under another sort key.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, value, company = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise ValueError('Invalid cursor') from exc
+    if cursor_sort != sort or not isinstance(company, str):
+        raise ValueError('Cursor does not match the requested sort')
+    try:
+        if sort == 'last_trade':
+            value = date.fromisoformat(value)
+        elif sort == 'partners':
+            value = int(value)
+        else:
+            value = Decimal(value)
+    except (TypeError, ValueError, InvalidOperation) as exc:
+        raise ValueError('Invalid cursor') from exc
+    return value, company
+
+
+def get_explorer_base_queryset(
+    direction=None,
     date_from=None,
     date_to=None,
     country=None,
     product_category_id=None,
     product_subcategory_id=None,
     product_item_id=None,
-    search_query=None,
-    limit=100
 ):
     """
-    Returns list of companies for Explorer page table.
-    Direction determines company role: import → buyer, export → seller, both → all unique.
-    Enhanced to include: country, top products, YoY growth, transaction count, total value.
+    Transaction QuerySet with the Explorer page filters applied.
+    Kept separate so the filter set can be reused (and EXPLAINed) on its own.
     """
     base_qs = Transaction.objects.all()
-    
-    
+
     if date_from:
         base_qs = base_qs.filter(reporting_date__gte=date_from)
     if date_to:
         base_qs = base_qs.filter(reporting_date__lte=date_to)
     if country:
-        base_qs = base_qs.filter(country=country)
+        base_qs = base_qs.filter(country_filter_q(country, direction))
     if product_item_id:
         base_qs = base_qs.filter(product_item_id=product_item_id)
     elif product_subcategory_id:
-        base_qs = base_qs.filter(product_item__sub_category_id=product_subcategory_id)
+        base_qs = base_qs.filter(sub_category_id=product_subcategory_id)
     elif product_category_id:
-        base_qs = base_qs.filter(product_item__sub_category__category_id=product_category_id)
+        base_qs = base_qs.filter(category_id=product_category_id)
 
-    
-    if direction == 'both':
-        
-        company_stats = defaultdict(lambda: {
-            'total_volume': 0, 'total_value': 0, 'avg_price': 0.0, 
-            'transaction_count': 0, 'active_partners': set(), 
-            'first_trade': None, 'last_trade': None
-        })
-        
-        for tx in base_qs.values('buyer', 'seller', 'qty_mt', 'usd', 'usd_per_mt', 'reporting_date'):
-            for role in ['buyer', 'seller']:
-                name = tx[role]
-                if name and name.lower() != 'unknown':
-                    cs = company_stats[name]
-                    cs['total_volume'] += float(tx['qty_mt'] or 0)
-                    cs['total_value'] += float(tx['usd'] or 0)
-                    cs['transaction_count'] += 1
-                    cs['active_partners'].add(tx['seller' if role == 'buyer' else 'buyer'])
-                    if cs['first_trade'] is None or tx['reporting_date'] < cs['first_trade']:
-                        cs['first_trade'] = tx['reporting_date']
-                    if cs['last_trade'] is None or tx['reporting_date'] > cs['last_trade']:
-                        cs['last_trade'] = tx['reporting_date']
-        
-        
-        companies = []
-        for name, stats in company_stats.items():
-            companies.append({
-                'company': name,
-                'total_volume': stats['total_volume'],
-                'total_value': stats['total_value'],
-                'avg_price': stats['total_value'] / stats['total_volume'] if stats['total_volume'] > 0 else 0,
-                'active_partners': len(stats['active_partners']),
-                'transaction_count': stats['transaction_count'],
-                'first_trade': stats['first_trade'],
-                'last_trade': stats['last_trade'],
-            })
-        
-        
-        companies.sort(key=lambda x: x['total_volume'], reverse=True)
-        if search_query:
-            companies = [c for c in companies if search_query.lower() in c['company'].lower()]
-        companies = companies[:limit]
-        
-    else:
-        
-        company_field = 'buyer' if direction == 'import' else 'seller'
-        counterparty_field = 'seller' if direction == 'import' else 'buyer'
-
-        
-        qs = (
-            base_qs.values(company=F(company_field))
-            .annotate(
-                total_volume=Sum('qty_mt'),
-                avg_price=Avg('usd_per_mt'),
-                total_value=Sum('usd'),
-                active_partners=Count(counterparty_field, distinct=True),
-                transaction_count=Count('id'),
-                first_trade=Min('reporting_date'),
-                last_trade=Max('reporting_date'),
-            )
-            .order_by('-total_volume')
+    return base_qs
+
+
+def _company_totals(base_qs, direction, search_query=None, sort='volume', after=None):
+    """
+    Per-company totals for one direction ('import' or 'export'), ordered by the
+    ``sort`` metric (largest first) and company name. ``after`` is a decoded
+    cursor: only rows ordered after it are returned (a HAVING condition).
+    """
+    company_field = 'buyer' if direction == 'import' else 'seller'
+    counterparty_field = 'seller' if direction == 'import' else 'buyer'
+    metric = EXPLORER_SORTS[sort]
+
+    qs = (
+        base_qs.values(company=F(company_field))
+        .annotate(
+            total_volume=Sum('qty_mt'),
+            avg_price=Avg('usd_per_mt'),
+            total_value=Coalesce(Sum('usd'), Value(Decimal(0)), output_field=DecimalField()),
+            active_partners=Count(counterparty_field, distinct=True),
+            transaction_count=Count('id'),
+            first_trade=Min('reporting_date'),
+            last_trade=Max('reporting_date'),
         )
+        .order_by(f'-{metric}', 'company')
+    )
+
+    if search_query:
+        qs = qs.filter(company__icontains=search_query)
+    if after is not None:
+        value, company = after
+        qs = qs.filter(Q(**{f'{metric}__lt': value}) | Q(**{metric: value, 'company__gt': company}))
+    return qs
 
-        if search_query:
-            qs = qs.filter(company__icontains=search_query)
 
-        companies = list(qs[:limit])
+def _enrich_companies(base_qs, companies, direction):
+    """
+    Adds country, top products and YoY growth to rows from _company_totals (in
+    place), with one query: ROW_NUMBER() ranks each company's counterparty
+    countries and products by volume, and conditional sums give this year's
+    and last year's volume.
+    """
+    if not companies:
+        return companies
 
-    
-    
+    company_field = 'buyer' if direction == 'import' else 'seller'
     company_names = [c['company'] for c in companies]
-    
-    
-    if direction == 'both':
-        
-        company_countries = {}
-        company_products = defaultdict(list)
-        
-        for comp_name in company_names:
-            
-            country_row = (
-                base_qs.filter(Q(buyer=comp_name) | Q(seller=comp_name))
-                .values('country')
-                .annotate(vol=Sum('qty_mt'))
-                .order_by('-vol')
-                .first()
-            )
-            company_countries[comp_name] = country_row['country'] if country_row else 'N/A'
-            
-            
-            prods = (
-                base_qs.filter(Q(buyer=comp_name) | Q(seller=comp_name))
-                .values(product_name=F('product_item__name'))
-                .annotate(vol=Sum('qty_mt'))
-                .order_by('-vol')[:3]
-            )
-            company_products[comp_name] = [p['product_name'] for p in prods if p['product_name']]
-        
-        
-        for c in companies:
-            comp = c['company']
-            c['country'] = company_countries.get(comp, 'N/A')
-            c['top_products'] = company_products.get(comp, [])
-            c['yoy_growth'] = None  
-            c['total_value'] = float(c['total_value']) if c['total_value'] else 0
-        
-    else:
-        
-        
-        country_data = (
-            base_qs.filter(**{f'{company_field}__in': company_names})
-            .values(company=F(company_field), country_name=F('country'))
-            .annotate(country_volume=Sum('qty_mt'))
-            .order_by(f'-country_volume')
-        )
-        company_countries = {}
-        for row in country_data:
-            comp = row['company']
-            if comp not in company_countries:
-                company_countries[comp] = row['country_name']
-        
-        
-        product_data = (
-            base_qs.filter(**{f'{company_field}__in': company_names})
-            .values(company=F(company_field), product_name=F('product_item__name'))
-            .annotate(product_volume=Sum('qty_mt'))
-            .order_by('-product_volume')
+    base_sql, base_params = (
+        base_qs.filter(**{f'{company_field}__in': company_names})
+        .order_by()
+        .values('qty_mt', 'reporting_date', 'product_item_id',
+                company=F(company_field), country=F(counterparty_country_field(direction)))
+        .query.sql_with_params()
+    )
+
+    current_year = datetime.now().year
+    this_year, next_year, prev_year = (date(y, 1, 1) for y in (current_year, current_year + 1, current_year - 1))
+    item_table = connection.ops.quote_name(ProductItem._meta.db_table)
+    sql = f"""
+        WITH base AS ({base_sql}),
+        yoy AS (
+            SELECT company,
+                   SUM(qty_mt) FILTER (WHERE reporting_date >= %s AND reporting_date < %s) AS current_volume,
+                   SUM(qty_mt) FILTER (WHERE reporting_date >= %s AND reporting_date < %s) AS previous_volume
+            FROM base
+            GROUP BY company
+        ),
+        ranked AS (
+            SELECT 'country' AS kind, company, country AS label,
+                   ROW_NUMBER() OVER (PARTITION BY company ORDER BY SUM(qty_mt) DESC) AS rn
+            FROM base
+            GROUP BY company, country
+            UNION ALL
+            SELECT 'product' AS kind, base.company, item.name AS label,
+                   ROW_NUMBER() OVER (PARTITION BY base.company ORDER BY SUM(base.qty_mt) DESC) AS rn
+            FROM base
+            JOIN {item_table} item ON item.id = base.product_item_id
+            GROUP BY base.company, item.name
         )
-        company_products = defaultdict(list)
-        for row in product_data:
-            comp = row['company']
-            if len(company_products[comp]) < 3 and row['product_name']:
-                company_products[comp].append(row['product_name'])
-        
-        
-        current_year = datetime.now().year
-        prev_year = current_year - 1
-        
-        current_year_volume = dict(
-            base_qs.filter(**{f'{company_field}__in': company_names})
-            .annotate(year=ExtractYear('reporting_date'))
-            .filter(year=current_year)
-            .values(company=F(company_field))
-            .annotate(volume=Sum('qty_mt'))
-            .values_list('company', 'volume')
+        SELECT yoy.company, yoy.current_volume, yoy.previous_volume, ranked.kind, ranked.label
+        FROM yoy
+        LEFT JOIN ranked ON ranked.company = yoy.company
+            AND ((ranked.kind = 'country' AND ranked.rn = 1) OR (ranked.kind = 'product' AND ranked.rn <= 3))
+        ORDER BY yoy.company, ranked.kind, ranked.rn
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, list(base_params) + [this_year, next_year, prev_year, this_year])
+        rows = cursor.fetchall()
+
+    company_countries = {}
+    company_products = defaultdict(list)
+    yearly_volume = {}
+    for company, current_volume, previous_volume, kind, label in rows:
+        yearly_volume[company] = (current_volume or 0, previous_volume or 0)
+        if kind == 'country':
+            company_countries[company] = label
+        elif kind == 'product':
+            company_products[company].append(label)
+
+    for c in companies:
+        comp = c['company']
+        c['country'] = company_countries.get(comp, 'N/A')
+        c['top_products'] = company_products.get(comp, [])
+
+        curr, prev = yearly_volume.get(comp, (0, 0))
+        if prev > 0:
+            c['yoy_growth'] = round(((curr - prev) / prev) * 100, 2)
+        else:
+            c['yoy_growth'] = None
+
+        c['total_value'] = float(c['total_value']) if c['total_value'] else 0
+        c['total_volume'] = float(c['total_volume']) if c['total_volume'] else 0
+        c['avg_price'] = float(c['avg_price']) if c['avg_price'] else 0
+
+    return companies
+
+
+# -------------------------
+# direction='both' (raw SQL: the ORM cannot group over a UNION)
+# -------------------------
+
+BOTH_SIDE_COLUMNS = (
+    'buyer', 'seller', 'origin_country', 'destination_country',
+    'qty_mt', 'usd', 'reporting_date', 'product_item_id',
+)
+
+_to_date = DateField().to_python
+
+
+def _both_sides_cte(base_qs):
+    """
+    SQL + params for ``WITH base AS (...), sides AS (...)``: every filtered
+    transaction once as (buyer, seller) and once as (seller, buyer), with the
+    counterparty's country on each side. Placeholder names are dropped.
+    """
+    base_sql, base_params = base_qs.order_by().values(*BOTH_SIDE_COLUMNS).query.sql_with_params()
+    sql = f"""
+        WITH base AS ({base_sql}),
+        sides AS (
+            SELECT buyer AS company, seller AS partner, origin_country AS country,
+                   qty_mt, usd, reporting_date, product_item_id
+            FROM base
+            UNION ALL
+            SELECT seller, buyer, destination_country,
+                   qty_mt, usd, reporting_date, product_item_id
+            FROM base
+        ),
+        named AS (
+            SELECT * FROM sides
+            WHERE company IS NOT NULL AND company <> '' AND LOWER(company) <> 'unknown'
         )
-        
-        prev_year_volume = dict(
-            base_qs.filter(**{f'{company_field}__in': company_names})
-            .annotate(year=ExtractYear('reporting_date'))
-            .filter(year=prev_year)
-            .values(company=F(company_field))
-            .annotate(volume=Sum('qty_mt'))
-            .values_list('company', 'volume')
+    """
+    return sql, list(base_params)
+
+
+def _both_direction_companies(base_qs, search_query=None, limit=100, sort='volume', after=None):
+    """
+    Per-company totals over both trade sides, ordered by the ``sort`` metric
+    (largest first) and company name, starting after the decoded cursor ``after``.
+    Values are returned as the database gives them; _enrich_both_direction
+    converts them for JSON.
+    """
+    metric = EXPLORER_SORTS[sort]
+    cte, params = _both_sides_cte(base_qs)
+    where = ''
+    if search_query:
+        escaped = search_query.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        where = "WHERE LOWER(company) LIKE %s ESCAPE '\\'"
+        params.append(f'%{escaped}%')
+
+    keyset = ''
+    if after is not None:
+        value, company = after
+        # Decimal parameters are bound as text on some backends; compare as numbers.
+        placeholder = 'CAST(%s AS NUMERIC)' if isinstance(value, Decimal) else '%s'
+        keyset = f"WHERE {metric} < {placeholder} OR ({metric} = {placeholder} AND company > %s)"
+        params.extend([value, value, company])
+    params.append(limit)
+
+    sql = f"""
+        {cte},
+        totals AS (
+            SELECT company,
+                   COALESCE(SUM(qty_mt), 0) AS total_volume,
+                   COALESCE(SUM(usd), 0) AS total_value,
+                   COUNT(DISTINCT partner) AS active_partners,
+                   COUNT(*) AS transaction_count,
+                   MIN(reporting_date) AS first_trade,
+                   MAX(reporting_date) AS last_trade
+            FROM named
+            {where}
+            GROUP BY company
         )
-        
-        
-        for c in companies:
-            comp = c['company']
-            c['country'] = company_countries.get(comp, 'N/A')
-            c['top_products'] = company_products.get(comp, [])
-            
-            
-            curr = current_year_volume.get(comp, 0) or 0
-            prev = prev_year_volume.get(comp, 0) or 0
-            if prev > 0:
-                c['yoy_growth'] = round(((curr - prev) / prev) * 100, 2)
-            else:
-                c['yoy_growth'] = None
-            
-            
-            c['total_value'] = float(c['total_value']) if c['total_value'] else 0
-    
+        SELECT company, total_volume, total_value, active_partners,
+               transaction_count, first_trade, last_trade
+        FROM totals
+        {keyset}
+        ORDER BY {metric} DESC, company
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'company': company,
+            'total_volume': volume,
+            'total_value': value,
+            'active_partners': partners,
+            'transaction_count': tx_count,
+            'first_trade': _to_date(first_trade),
+            'last_trade': _to_date(last_trade),
+        }
+        for company, volume, value, partners, tx_count, first_trade, last_trade in rows
+    ]
+
+
+def _enrich_both_direction(base_qs, companies):
+    """
+    Adds the main counterparty country and top 3 products to ``companies``
+    (in place) with one windowed query over both trade sides, and converts
+    the totals to floats.
+    """
+    if not companies:
+        return companies
+
+    for c in companies:
+        volume, value = float(c['total_volume']), float(c['total_value'])
+        c['total_volume'] = volume
+        c['total_value'] = value
+        c['avg_price'] = value / volume if volume > 0 else 0
+
+    cte, params = _both_sides_cte(base_qs)
+    names = [c['company'] for c in companies]
+    placeholders = ', '.join(['%s'] * len(names))
+    item_table = connection.ops.quote_name(ProductItem._meta.db_table)
+    sql = f"""
+        {cte},
+        picked AS (SELECT * FROM named WHERE company IN ({placeholders}))
+        SELECT kind, company, label, rn FROM (
+            SELECT 'country' AS kind, company, country AS label,
+                   ROW_NUMBER() OVER (PARTITION BY company ORDER BY SUM(qty_mt) DESC) AS rn
+            FROM picked
+            GROUP BY company, country
+            UNION ALL
+            SELECT 'product' AS kind, picked.company, item.name AS label,
+                   ROW_NUMBER() OVER (PARTITION BY picked.company ORDER BY SUM(picked.qty_mt) DESC) AS rn
+            FROM picked
+            LEFT JOIN {item_table} item ON item.id = picked.product_item_id
+            GROUP BY picked.company, item.name
+        ) ranked
+        WHERE (kind = 'country' AND rn = 1) OR (kind = 'product' AND rn <= 3)
+        ORDER BY company, kind, rn
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + names)
+        rows = cursor.fetchall()
+
+    company_countries = {}
+    company_products = defaultdict(list)
+    for kind, company, label, _ in rows:
+        if kind == 'country':
+            company_countries[company] = label
+        elif label:
+            company_products[company].append(label)
+
+    for c in companies:
+        comp = c['company']
+        c['country'] = company_countries.get(comp, 'N/A')
+        c['top_products'] = company_products.get(comp, [])
+        c['yoy_growth'] = None
     return companies
 
+
+def get_explorer_page(
+    direction='import',
+    date_from=None,
+    date_to=None,
+    country=None,
+    product_category_id=None,
+    product_subcategory_id=None,
+    product_item_id=None,
+    search_query=None,
+    sort='volume',
+    cursor=None,
+    limit=100
+):
+    """
+    One page of the Explorer table: ``(companies, next_cursor)``.
+
+    Keyset pagination on (sort metric, company): ``cursor`` is the
+    ``next_cursor`` of the previous page (None for the first page), and
+    ``next_cursor`` is None on the last page. Only the page's companies are
+    enriched, so the cost of a page does not grow with how deep it is.
+    Raises ValueError for an unknown sort key or an invalid cursor.
+    """
+    if sort not in EXPLORER_SORTS:
+        raise ValueError(f"sort must be one of {', '.join(EXPLORER_SORTS)}")
+    after = decode_explorer_cursor(cursor, sort) if cursor else None
+
+    base_qs = get_explorer_base_queryset(
+        direction=direction,
+        date_from=date_from,
+        date_to=date_to,
+        country=country,
+        product_category_id=product_category_id,
+        product_subcategory_id=product_subcategory_id,
+        product_item_id=product_item_id,
+    )
+
+    # One extra row tells whether there is a next page.
+    if direction == 'both':
+        rows = _both_direction_companies(base_qs, search_query, limit + 1, sort, after)
+    else:
+        rows = list(_company_totals(base_qs, direction, search_query, sort, after)[:limit + 1])
+
+    next_cursor = encode_explorer_cursor(rows[limit - 1], sort) if len(rows) > limit else None
+    companies = rows[:limit]
+
+    if direction == 'both':
+        _enrich_both_direction(base_qs, companies)
+    else:
+        _enrich_companies(base_qs, companies, direction)
+
+    return companies, next_cursor
+
+
+def get_explorer_companies(
+    direction='import',
+    date_from=None,
+    date_to=None,
+    country=None,
+    product_category_id=None,
+    product_subcategory_id=None,
+    product_item_id=None,
+    search_query=None,
+    limit=100,
+    sort='volume',
+    cursor=None,
+):
+    """
+    Returns list of companies for Explorer page table.
+    Direction determines company role: import → buyer, export → seller, both → all unique.
+    Enhanced to include: country, top products, YoY growth, transaction count, total value.
+    See get_explorer_page for ``sort`` / ``cursor``.
+    """
+    companies, _ = get_explorer_page(
+        direction=direction,
+        date_from=date_from,
+        date_to=date_to,
+        country=country,
+        product_category_id=product_category_id,
+        product_subcategory_id=product_subcategory_id,
+        product_item_id=product_item_id,
+        search_query=search_query,
+        sort=sort,
+        cursor=cursor,
+        limit=limit,
+    )
+    return companies
+
+
+def iter_explorer_companies(
+    direction='import',
+    date_from=None,
+    date_to=None,
+    country=None,
+    product_category_id=None,
+    product_subcategory_id=None,
+    product_item_id=None,
+    search_query=None,
+    chunk_size=2000,
+):
+    """
+    Yields every Explorer row (no limit) for exports. The grouped query is
+    read through a server-side cursor and enriched ``chunk_size`` companies at
+    a time, so memory does not grow with the number of companies.
+
+    direction='both' groups a UNION ALL of both sides, so it is read page by
+    page through get_explorer_page's keyset cursor instead.
+    """
+    if direction == 'both':
+        cursor = None
+        while True:
+            companies, cursor = get_explorer_page(
+                direction=direction,
+                date_from=date_from,
+                date_to=date_to,
+                country=country,
+                product_category_id=product_category_id,
+                product_subcategory_id=product_subcategory_id,
+                product_item_id=product_item_id,
+                search_query=search_query,
+                cursor=cursor,
+                limit=chunk_size,
+            )
+            yield from companies
+            if cursor is None:
+                break
+        return
+
+    base_qs = get_explorer_base_queryset(
+        direction=direction,
+        date_from=date_from,
+        date_to=date_to,
+        country=country,
+        product_category_id=product_category_id,
+        product_subcategory_id=product_subcategory_id,
+        product_item_id=product_item_id,
+    )
+    chunk = []
+    for row in _company_totals(base_qs, direction, search_query).iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield from _enrich_companies(base_qs, chunk, direction)
+            chunk = []
+    if chunk:
+        yield from _enrich_companies(base_qs, chunk, direction)
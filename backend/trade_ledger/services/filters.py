@@ -1,6 +1,23 @@
 from django.db import models
 from trade_data.models import Transaction
 
+
+def counterparty_country_field(direction):
+    """
+    Transaction column holding the trading partner's country: suppliers ship
+    from origin_country to an importer, buyers receive at destination_country
+    from an exporter.
+    """
+    return 'destination_country' if direction == 'export' else 'origin_country'
+
+
+def country_filter_q(country, direction=None):
+    """Q matching ``country`` on the counterparty side, or either side without a direction."""
+    if direction in ('import', 'export'):
+        return models.Q(**{counterparty_country_field(direction): country})
+    return models.Q(origin_country=country) | models.Q(destination_country=country)
+
+
 def apply_transaction_filters(
     qs,
     direction=None,           
@@ -35,14 +52,14 @@ def apply_transaction_filters(
 
     
     if country:
-        qs = qs.filter(country=country)
+        qs = qs.filter(country_filter_q(country, direction))
 
     
     if product_item_id:
         qs = qs.filter(product_item_id=product_item_id)
     elif product_subcategory_id:
-        qs = qs.filter(product_item__sub_category_id=product_subcategory_id)
+        qs = qs.filter(sub_category_id=product_subcategory_id)
     elif product_category_id:
-        qs = qs.filter(product_item__sub_category__category_id=product_category_id)
+        qs = qs.filter(category_id=product_category_id)
 
     return qs
\ No newline at end of file
@@ -1,77 +1,42 @@
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from trade_data.models import CompanyEmbedding, ProductEmbedding
+from trade_ledger.services.embedding_store import get_company_embedding_store, get_company_name_index
 
 def get_company_embedding(company_name):
-    """Get embedding vector for a company. Uses fuzzy matching if exact match fails."""
-    
-    try:
-        emb = CompanyEmbedding.objects.get(company_name=company_name)
-        return np.array(emb.embedding), company_name
-    except CompanyEmbedding.DoesNotExist:
-        pass
-    
-    
-    try:
-        emb = CompanyEmbedding.objects.get(company_name__iexact=company_name)
-        return np.array(emb.embedding), emb.company_name
-    except CompanyEmbedding.DoesNotExist:
-        pass
-    
-    
-    query_lower = company_name.lower()
-    all_embeddings = CompanyEmbedding.objects.all()
-    
-    for emb in all_embeddings:
-        emb_name_lower = emb.company_name.lower()
-        
-        if query_lower in emb_name_lower or emb_name_lower in query_lower:
-            return np.array(emb.embedding), emb.company_name
-        
-        query_words = query_lower.split()
-        emb_words = emb_name_lower.split()
-        if query_words and emb_words and query_words[0] == emb_words[0]:
-            return np.array(emb.embedding), emb.company_name
-    
-    return None, None
+    """Get embedding vector for a company. Uses the fuzzy name index if exact match fails."""
+    matched_name = get_company_name_index().resolve(company_name)
+    if matched_name is None:
+        return None, None
+    
+    emb = CompanyEmbedding.objects.filter(company_name=matched_name).only('vector', 'vector_dtype').first()
+    if emb is None:
+        return None, None
+    return emb.as_array(), matched_name
+
+def find_company_candidates(company_name, limit=5):
+    """Ranked "did you mean" candidates for a company name."""
+    return [
+        {"company_name": name, "similarity": round(similarity, 4)}
+        for name, similarity, _ in get_company_name_index().search(company_name, limit=limit)
+    ]
 
 def get_similar_companies(company_name, top_k=4):
     """Get top-k similar companies by cosine similarity."""
-    target_vec, matched_name = get_company_embedding(company_name)
-    if target_vec is None:
-        return []
-    
-    target_dim = len(target_vec)
-    
-    
-    all_embeddings = list(CompanyEmbedding.objects.exclude(company_name=matched_name))
-    
-    
-    valid_companies = []
-    names = []
-    vectors = []
-    
-    for c in all_embeddings:
-        if isinstance(c.embedding, list) and len(c.embedding) == target_dim:
-            valid_companies.append(c)
-            names.append(c.company_name)
-            vectors.append(c.embedding)
-    
-    if not vectors:
-        return []
-    
-    vectors = np.array(vectors)
-    similarities = cosine_similarity([target_vec], vectors)[0]
-    top_indices = np.argsort(similarities)[-top_k:][::-1]
+    store = get_company_embedding_store()
+    if company_name in store:
+        target_vec, matched_name = store.vector(company_name), company_name
+    else:
+        target_vec, matched_name = get_company_embedding(company_name)
+        if target_vec is None:
+            return []
 
     return [
         {
-            "company_name": names[i],
-            "similarity": float(similarities[i]),
-            "segment_tag": valid_companies[i].cluster_tag,
+            "company_name": name,
+            "similarity": similarity,
+            "segment_tag": tag,
             "total_volume_mt": None
         }
-        for i in top_indices
+        for name, similarity, tag in store.nearest(target_vec, top_k, exclude=[matched_name])
     ]
 
 def get_product_clusters():
@@ -10,10 +10,9 @@ Implements 5 methods:
 """
 
 import networkx as nx
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from collections import defaultdict
-from trade_data.models import Transaction, CompanyEmbedding
+from trade_data.models import Transaction
+from trade_ledger.services.embedding_store import get_company_embedding_store
 from django.db.models import Count
 
 
@@ -75,53 +74,31 @@ def get_all_sellers():
 def predict_sellers_node2vec(buyer_name, top_k=10):
     """
     Find potential sellers for a buyer using Node2Vec embeddings.
-    Uses pre-computed embeddings from CompanyEmbedding model.
+    Uses pre-computed embeddings from the shared company embedding store.
     """
-    results = []
-    
     try:
-        
-        buyer_emb = CompanyEmbedding.objects.filter(company_name=buyer_name).first()
-        if not buyer_emb:
+        store = get_company_embedding_store()
+        if buyer_name not in store:
             return {"error": "Buyer not found in embeddings", "results": []}
         
-        buyer_vector = np.array(buyer_emb.embedding).reshape(1, -1)
-        
-        
-        seller_names = set(Transaction.objects.values_list('seller', flat=True).distinct())
-        
-        
-        existing_partners = set(
+        seller_names = Transaction.objects.values_list('seller', flat=True).distinct()
+        existing_partners = (
             Transaction.objects.filter(buyer=buyer_name)
             .values_list('seller', flat=True).distinct()
         )
         
-        seller_embeddings = CompanyEmbedding.objects.filter(company_name__in=seller_names)
-        
-        for seller_emb in seller_embeddings:
-            if seller_emb.company_name in existing_partners:
-                continue  
-            
-            seller_vector = np.array(seller_emb.embedding).reshape(1, -1)
-            similarity = cosine_similarity(buyer_vector, seller_vector)[0][0]
-            
-            results.append({
-                "seller": seller_emb.company_name,
-                "raw_score": float(similarity),
+        neighbours = store.nearest(
+            buyer_name, top_k, exclude=set(existing_partners), candidates=seller_names
+        )
+        return {"results": [
+            {
+                "seller": name,
                 "method": "node2vec",
-                "segment_tag": seller_emb.cluster_tag
-            })
-        
-        
-        results.sort(key=lambda x: x['raw_score'], reverse=True)
-        top_results = results[:top_k]
-        
-        
-        for r in top_results:
-            r['score'] = scale_confidence(r['raw_score'], max_val=1.0)
-            del r['raw_score']
-        
-        return {"results": top_results}
+                "segment_tag": tag,
+                "score": scale_confidence(similarity, max_val=1.0),
+            }
+            for name, similarity, tag in neighbours
+        ]}
     
     except Exception as e:
         return {"error": str(e), "results": []}
@@ -129,48 +106,29 @@ def predict_sellers_node2vec(buyer_name, top_k=10):
 
 def predict_buyers_node2vec(seller_name, top_k=10):
     """Find potential buyers for a seller using Node2Vec embeddings."""
-    results = []
-    
     try:
-        seller_emb = CompanyEmbedding.objects.filter(company_name=seller_name).first()
-        if not seller_emb:
+        store = get_company_embedding_store()
+        if seller_name not in store:
             return {"error": "Seller not found in embeddings", "results": []}
         
-        seller_vector = np.array(seller_emb.embedding).reshape(1, -1)
-        
-        buyer_names = set(Transaction.objects.values_list('buyer', flat=True).distinct())
-        
-        existing_partners = set(
+        buyer_names = Transaction.objects.values_list('buyer', flat=True).distinct()
+        existing_partners = (
             Transaction.objects.filter(seller=seller_name)
             .values_list('buyer', flat=True).distinct()
         )
         
-        buyer_embeddings = CompanyEmbedding.objects.filter(company_name__in=buyer_names)
-        
-        for buyer_emb in buyer_embeddings:
-            if buyer_emb.company_name in existing_partners:
-                continue
-            
-            buyer_vector = np.array(buyer_emb.embedding).reshape(1, -1)
-            similarity = cosine_similarity(seller_vector, buyer_vector)[0][0]
-            
-            results.append({
-                "buyer": buyer_emb.company_name,
-                "raw_score": float(similarity),
+        neighbours = store.nearest(
+            seller_name, top_k, exclude=set(existing_partners), candidates=buyer_names
+        )
+        return {"results": [
+            {
+                "buyer": name,
                 "method": "node2vec",
-                "segment_tag": buyer_emb.cluster_tag
-            })
-        
-        
-        results.sort(key=lambda x: x['raw_score'], reverse=True)
-        top_results = results[:top_k]
-        
-        
-        for r in top_results:
-            r['score'] = scale_confidence(r['raw_score'], max_val=1.0)
-            del r['raw_score']
-        
-        return {"results": top_results}
+                "segment_tag": tag,
+                "score": scale_confidence(similarity, max_val=1.0),
+            }
+            for name, similarity, tag in neighbours
+        ]}
     
     except Exception as e:
         return {"error": str(e), "results": []}
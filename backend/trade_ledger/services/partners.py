@@ -1,7 +1,10 @@
-from django.db.models import Sum, Avg, Count, F
+from django.db import connection
+from django.db.models import Sum, Avg, Count, F, Value
 from trade_data.models import Transaction
-from django.db.models.functions import TruncMonth, TruncQuarter
-from .filters import apply_transaction_filters
+from django.db.models.functions import Coalesce
+from .aggregates import company_month_aggregates
+from .filters import apply_transaction_filters, counterparty_country_field
+from .trends import bucket_start, period_bucket
 
 def get_top_partners(company_name, direction='import', limit=10, **filters):
     qs = Transaction.objects.all()
@@ -10,7 +13,7 @@ def get_top_partners(company_name, direction='import', limit=10, **filters):
     counterparty = 'seller' if direction == 'import' else 'buyer'
 
     return (
-        qs.values('country', partner=F(counterparty))
+        qs.values(country=F(counterparty_country_field(direction)), partner=F(counterparty))
         .annotate(
             total_volume=Sum('qty_mt'),
             avg_price=Avg('usd_per_mt'),
@@ -19,37 +22,83 @@ def get_top_partners(company_name, direction='import', limit=10, **filters):
     )
 
 def get_trade_volume_by_country(company_name, direction='import', **filters):
+    agg = company_month_aggregates(direction=direction, company_name=company_name, **filters)
+    if agg is not None:
+        return (
+            agg.values('country')
+            .annotate(total_volume=Sum('total_qty_mt'))
+            .order_by('-total_volume')
+        )
+
     qs = Transaction.objects.all()
     qs = apply_transaction_filters(qs, direction=direction, company_name=company_name, **filters)
 
     return (
-        qs.values('country')
+        qs.values(country=F(counterparty_country_field(direction)))
         .annotate(total_volume=Sum('qty_mt'))
         .order_by('-total_volume')
     )
 
 def get_partner_trends(company_name, direction='import', top_n=5, **filters):
-    
-    filters.pop('limit', None)
-    top_partners = get_top_partners(company_name, direction, limit=top_n, **filters)
-    partner_names = [p['partner'] for p in top_partners]
-    if not partner_names:
-        return []
+    """
+    Monthly volume of the company's ``top_n`` partners as a columnar payload:
+    ``{'months': [...], 'series': [{'partner', 'total_volume', 'volume': [...]}]}``
+    with one volume per month (0 for months without trades), partners
+    largest first.
 
+    One query: RANK() over each partner's total volume picks the top
+    partners, then their trades are summed per calendar month. The month
+    bucket is cast back to an integer (EXTRACT is numeric on PostgreSQL).
+    """
+    filters.pop('limit', None)
     counterparty = 'seller' if direction == 'import' else 'buyer'
 
-    qs = Transaction.objects.filter(**{f"{counterparty}__in": partner_names})
+    qs = Transaction.objects.all()
     qs = apply_transaction_filters(qs, direction=direction, company_name=company_name, **filters)
-
-    return (
-    qs.annotate(month=TruncMonth('reporting_date'))
-    .values('month')
-    .annotate(
-        partner=F(counterparty),
-        vol=Sum('qty_mt')
+    base_sql, base_params = (
+        qs.order_by()
+        .values('qty_mt', bucket=period_bucket('reporting_date', 'month'),
+                partner=Coalesce(F(counterparty), Value('Unknown')))
+        .query.sql_with_params()
     )
-    .order_by('partner', 'month')
-)
+    sql = f"""
+        WITH base AS ({base_sql}),
+        ranked AS (
+            SELECT partner, SUM(qty_mt) AS total_volume,
+                   RANK() OVER (ORDER BY SUM(qty_mt) DESC, partner) AS partner_rank
+            FROM base
+            GROUP BY partner
+        )
+        SELECT ranked.partner_rank, ranked.partner, ranked.total_volume,
+               CAST(base.bucket AS INTEGER), SUM(base.qty_mt)
+        FROM base
+        JOIN ranked ON ranked.partner = base.partner
+        WHERE ranked.partner_rank <= %s
+        GROUP BY ranked.partner_rank, ranked.partner, ranked.total_volume, base.bucket
+        ORDER BY ranked.partner_rank, base.bucket
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, list(base_params) + [top_n])
+        rows = cursor.fetchall()
+
+    if not rows:
+        return {'months': [], 'series': []}
+
+    first = min(row[3] for row in rows)
+    last = max(row[3] for row in rows)
+    series = {}
+    for _, partner, total_volume, bucket, volume in rows:
+        entry = series.setdefault(partner, {
+            'partner': partner,
+            'total_volume': float(total_volume or 0),
+            'volume': [0.0] * (last - first + 1),
+        })
+        entry['volume'][bucket - first] = float(volume or 0)
+
+    return {
+        'months': [bucket_start(bucket, 'month') for bucket in range(first, last + 1)],
+        'series': list(series.values()),
+    }
 
 def get_product_mix_per_partner(company_name, partner_name, direction='import', **filters):
     qs = Transaction.objects.all()
@@ -1,60 +1,132 @@
 from django.db import models
 from django.db.models import Sum, Avg, F
-from trade_data.models import Transaction, ProductEmbedding
+from trade_data.models import Transaction, ProductCoTrade, ProductEmbedding, ProductItem
+from trade_data.vectors import load_vectors
+from .aggregates import AGG_AVG_PRICE, company_month_aggregates
+from .co_trade import live_neighbours
 from .filters import apply_transaction_filters
+from utils.data_version import per_data_version
+from collections import namedtuple
 from datetime import date, timedelta
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
+
+def _yoy_windows(end_date=None):
+    """(prior_start, t12_start, end_date): trailing 12 months vs the 12 months before."""
+    end_date = end_date or date.today()
+    start_date_t12 = end_date - timedelta(days=365)
+    start_date_prior = start_date_t12 - timedelta(days=365)
+    return start_date_prior, start_date_t12, end_date
+
+
+def get_product_yoy_growth(company_names, direction='import', product_item_ids=None, end_date=None):
+    """
+    Year-over-Year volume growth (trailing 12 months vs prior 12 months) for
+    every product of every company in ``company_names``, in one grouped query
+    with conditional sums (two for direction='both', one per trade side).
+
+    Returns {(company_name, product_item_id): growth % or None}; pairs
+    without trades in the prior window map to None or are absent.
+    """
+    if isinstance(company_names, str):
+        company_names = [company_names]
+    start_date_prior, start_date_t12, end_date = _yoy_windows(end_date)
+
+    qs = Transaction.objects.filter(
+        product_item__isnull=False,
+        reporting_date__range=[start_date_prior, end_date],
+    )
+    if product_item_ids is not None:
+        qs = qs.filter(product_item_id__in=list(product_item_ids))
+
+    if direction in ('import', 'export'):
+        sides = [('buyer' if direction == 'import' else 'seller', qs)]
+    else:
+        # Either side; a self-trade counts once, as in apply_transaction_filters.
+        sides = [('buyer', qs), ('seller', qs.exclude(buyer=F('seller')))]
+
+    volumes = {}
+    for company_field, side_qs in sides:
+        rows = (
+            side_qs.filter(**{f'{company_field}__in': list(company_names)})
+            .values('product_item_id', company=F(company_field))
+            .annotate(
+                vol_t12=Sum('qty_mt', filter=models.Q(reporting_date__range=[start_date_t12, end_date])),
+                vol_prior=Sum('qty_mt', filter=models.Q(reporting_date__range=[start_date_prior, start_date_t12])),
+            )
+            .order_by()
+        )
+        for r in rows:
+            key = (r['company'], r['product_item_id'])
+            t12, prior = volumes.get(key, (0, 0))
+            volumes[key] = (t12 + (r['vol_t12'] or 0), prior + (r['vol_prior'] or 0))
+
+    return {
+        key: round(((vol_t12 - vol_prior) / vol_prior) * 100, 2) if vol_prior else None
+        for key, (vol_t12, vol_prior) in volumes.items()
+    }
+
 
 def get_yoy_growth_for_product(company_name, product_item_id, direction='import'):
     """
     Computes Year-over-Year growth (Trailing 12 Months vs Prior 12 Months).
+    Use get_product_yoy_growth for more than one product.
     """
-    end_date = date.today()
-    start_date_t12 = end_date - timedelta(days=365)
-    start_date_prior = start_date_t12 - timedelta(days=365)
-    
-    qs = Transaction.objects.filter(product_item_id=product_item_id)
-    qs = apply_transaction_filters(qs, direction=direction, company_name=company_name)
-    
-    
-    vol_t12 = qs.filter(reporting_date__range=[start_date_t12, end_date]).aggregate(v=Sum('qty_mt'))['v'] or 0
-    
-    
-    vol_prior = qs.filter(reporting_date__range=[start_date_prior, start_date_t12]).aggregate(v=Sum('qty_mt'))['v'] or 0
-    
-    if vol_prior == 0:
-        return None
-        
-    return round(((vol_t12 - vol_prior) / vol_prior) * 100, 2)
+    growth = get_product_yoy_growth([company_name], direction, product_item_ids=[product_item_id])
+    return growth.get((company_name, product_item_id))
 
 def get_company_product_performance(company_name, direction='import', **filters):
-    qs = Transaction.objects.all()
-    qs = apply_transaction_filters(qs, direction=direction, company_name=company_name, **filters)
-
-    results = (
-        qs.filter(product_item__isnull=False)
-        .values(
-            product_id=F('product_item__id'),
-            product_name=F('product_item__name'),
-            subcat=F('product_item__sub_category__name'),
+    agg = company_month_aggregates(direction=direction, company_name=company_name, **filters)
+    if agg is not None:
+        results = (
+            agg.filter(product_item__isnull=False)
+            .values(
+                product_id=F('product_item_id'),
+                product_name=F('product_item__name'),
+                subcat=F('sub_category__name'),
+            )
+            .annotate(
+                volume=Sum('total_qty_mt'),
+                avg_price=AGG_AVG_PRICE,
+            )
+            .order_by('-volume')
         )
-        .annotate(
-            volume=Sum('qty_mt'),
-            avg_price=Avg('usd_per_mt'),
+    else:
+        qs = Transaction.objects.all()
+        qs = apply_transaction_filters(qs, direction=direction, company_name=company_name, **filters)
+
+        results = (
+            qs.filter(product_item__isnull=False)
+            .values(
+                product_id=F('product_item__id'),
+                product_name=F('product_item__name'),
+                subcat=F('product_item__sub_category__name'),
+            )
+            .annotate(
+                volume=Sum('qty_mt'),
+                avg_price=Avg('usd_per_mt'),
+            )
+            .order_by('-volume')
         )
-        .order_by('-volume')
-    )
     
     
-    enriched_results = []
-    for r in results:
-        r['yoy_growth'] = get_yoy_growth_for_product(company_name, r['product_id'], direction)
-        enriched_results.append(r)
-        
+    enriched_results = list(results)
+    yoy_growth = get_product_yoy_growth([company_name], direction, [r['product_id'] for r in enriched_results])
+    for r in enriched_results:
+        r['yoy_growth'] = yoy_growth.get((company_name, r['product_id']))
+
     return enriched_results
 
 def get_avg_price_trend_monthly(company_name, product_item_id, direction='import', **filters):
+    agg = company_month_aggregates(direction=direction, company_name=company_name, **filters)
+    if agg is not None:
+        return (
+            agg.filter(product_item_id=product_item_id)
+            .values('month')
+            .annotate(avg_price=AGG_AVG_PRICE)
+            .order_by('month')
+        )
+
     qs = Transaction.objects.filter(product_item_id=product_item_id)
     qs = apply_transaction_filters(qs, direction=direction, company_name=company_name, **filters)
 
@@ -66,142 +138,127 @@ def get_avg_price_trend_monthly(company_name, product_item_id, direction='import
     )
 
 def get_volume_share(company_name, direction='import', **filters):
-    qs = Transaction.objects.all()
-    qs = apply_transaction_filters(qs, direction=direction, company_name=company_name, **filters)
-
     from django.db.models import ExpressionWrapper, DecimalField
     from decimal import Decimal
 
-    total_vol = qs.aggregate(v=Sum('qty_mt'))['v'] or Decimal('1.0')
+    agg = company_month_aggregates(direction=direction, company_name=company_name, **filters)
+    if agg is not None:
+        qs, volume_field = agg, 'total_qty_mt'
+    else:
+        qs = Transaction.objects.all()
+        qs = apply_transaction_filters(qs, direction=direction, company_name=company_name, **filters)
+        volume_field = 'qty_mt'
+
+    total_vol = qs.aggregate(v=Sum(volume_field))['v'] or Decimal('1.0')
 
     return (
         qs.filter(product_item__isnull=False)
         .values(product_name=F('product_item__name'))
         .annotate(
-            volume=Sum('qty_mt'),
+            volume=Sum(volume_field),
             share_pct=ExpressionWrapper(
-                (Sum('qty_mt') / total_vol) * 100,
+                (Sum(volume_field) / total_vol) * 100,
                 output_field=models.DecimalField(max_digits=10, decimal_places=2)
             )
         )
         .order_by('-volume')
     )
 
-def get_portfolio_similarity(company_name, top_k=4):
+PortfolioVectors = namedtuple('PortfolioVectors', ['vectors', 'index', 'companies', 'volumes'])
+
+
+@per_data_version
+def portfolio_vectors():
     """
-    Computes company similarity based on product portfolio (weighted average of product embeddings).
+    Portfolio vector of every company: its company x product volume row (both
+    trade sides, products with an embedding) times the product embedding
+    matrix, i.e. the volume-weighted sum of its products' embeddings,
+    normalized to unit length. Built with one sparse product per data version.
+
+    Returns PortfolioVectors(vectors float32 [companies x dim], index
+    {company: row}, companies by row, embedded volume by row).
     """
-    
-    
-    target_txs = Transaction.objects.filter(
-        models.Q(buyer=company_name) | models.Q(seller=company_name)
-    ).values('product_item').annotate(vol=Sum('qty_mt')).filter(product_item__isnull=False)
-    
-    target_profile = {x['product_item']: float(x['vol']) for x in target_txs}
-    if not target_profile:
-        return []
+    products, embedding_matrix = load_vectors(ProductEmbedding.objects.all(), 'product_item_id')
+    if not products:
+        return PortfolioVectors(np.zeros((0, 0), dtype=np.float32), {}, [], np.zeros(0))
+    product_col = {pid: col for col, (pid,) in enumerate(products)}
+    embedding_matrix = embedding_matrix.astype(np.float64)
 
-    
-    product_embeddings = {
-        pe.product_item_id: np.array(pe.embedding) 
-        for pe in ProductEmbedding.objects.all()
-    }
-    
-    
-    def compute_weighted_vector(profile_dict):
-        total_weight = 0
-        weighted_sum = None
-        for pid, vol in profile_dict.items():
-            if pid in product_embeddings:
-                if weighted_sum is None:
-                    weighted_sum = np.zeros_like(product_embeddings[pid])
-                weighted_sum += product_embeddings[pid] * vol
-                total_weight += vol
-        
-        if total_weight == 0 or weighted_sum is None:
-            return None
-        return weighted_sum / total_weight
-
-    target_vector = compute_weighted_vector(target_profile)
-    if target_vector is None:
+    company_row, rows, cols, volumes = {}, [], [], []
+    embedded = Transaction.objects.filter(product_item_id__in=list(product_col))
+    for side in ('buyer', 'seller'):
+        grouped = (
+            embedded.exclude(**{f'{side}__in': ['', 'Unknown']}).filter(**{f'{side}__isnull': False})
+            .values_list(side, 'product_item_id')
+            .annotate(vol=Sum('qty_mt'))
+            .order_by()
+        )
+        for company, pid, vol in grouped.iterator():
+            rows.append(company_row.setdefault(company, len(company_row)))
+            cols.append(product_col[pid])
+            volumes.append(float(vol or 0))
+
+    volume_matrix = sparse.csr_matrix(
+        (np.asarray(volumes), (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))),
+        shape=(len(company_row), len(product_col)),
+    )  # duplicate (company, product) entries from both sides are summed
+    vectors = volume_matrix @ embedding_matrix
+    norms = np.linalg.norm(vectors, axis=1)
+    keep = np.flatnonzero(norms > 0)
+
+    companies = list(company_row)
+    return PortfolioVectors(
+        vectors=np.ascontiguousarray(vectors[keep] / norms[keep, None], dtype=np.float32),
+        index={companies[i]: row for row, i in enumerate(keep)},
+        companies=[companies[i] for i in keep],
+        volumes=np.asarray(volume_matrix.sum(axis=1)).ravel()[keep],
+    )
+
+
+def get_portfolio_similarity(company_name, top_k=4):
+    """
+    Computes company similarity based on product portfolio (weighted average of
+    product embeddings): cosine similarity of the precomputed portfolio
+    vectors, top ``top_k`` by one matrix-vector product and argpartition.
+    """
+    store = portfolio_vectors()
+    row = store.index.get(company_name)
+    k = min(top_k, len(store.companies) - 1)
+    if row is None or k <= 0:
         return []
 
-    
-    
-    
-    
-    
-    all_txs = Transaction.objects.exclude(
-        models.Q(buyer=company_name) | models.Q(seller=company_name)
-    ).values('buyer', 'seller', 'product_item').annotate(vol=Sum('qty_mt'))
-    
-    company_profiles = {}
-    for tx in all_txs:
-        
-        
-        
-        
-        
-        
-        b = tx['buyer']
-        s = tx['seller']
-        pid = tx['product_item']
-        vol = float(tx['vol'])
-        
-        if pid not in product_embeddings:
-            continue
-            
-        if b != 'Unknown':
-            if b not in company_profiles: company_profiles[b] = {}
-            company_profiles[b][pid] = company_profiles[b].get(pid, 0) + vol
-            
-        if s != 'Unknown':
-            if s not in company_profiles: company_profiles[s] = {}
-            company_profiles[s][pid] = company_profiles[s].get(pid, 0) + vol
-
-    scores = []
-    
-    for other_company, profile in company_profiles.items():
-        vec = compute_weighted_vector(profile)
-        if vec is not None:
-             sim = cosine_similarity([target_vector], [vec])[0][0]
-             total_vol = sum(profile.values())
-             scores.append({
-                 'company': other_company,
-                 'similarity': sim,
-                 'total_volume': total_vol
-             })
-    
-    
-    scores.sort(key=lambda x: x['similarity'], reverse=True)
-    return scores[:top_k]
+    scores = store.vectors @ store.vectors[row]
+    scores[row] = -np.inf
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [
+        {
+            'company': store.companies[i],
+            'similarity': float(scores[i]),
+            'total_volume': float(store.volumes[i]),
+        }
+        for i in top
+    ]
 
 def get_co_traded_products(product_item_id, top_k=5):
     """
     Finds products that are frequently traded alongside the target product.
-    Logic: Companies that trade X also trade Y.
+    Logic: Companies that trade X also trade Y. ``frequency`` is the number of
+    companies trading both, read from the precomputed ProductCoTrade top-k
+    (refresh_co_trade_matrix), or computed from the ledger for a product
+    without a stored list yet.
     """
-    
-    companies = set(
-        Transaction.objects.filter(product_item_id=product_item_id)
-        .values_list('buyer', flat=True)
-    ) | set(
-        Transaction.objects.filter(product_item_id=product_item_id)
-        .values_list('seller', flat=True)
-    )
-    
-    
-    co_traded = (
-        Transaction.objects.filter(
-            models.Q(buyer__in=companies) | models.Q(seller__in=companies)
-        )
-        .exclude(product_item_id=product_item_id)
-        .values(name=F('product_item__name'))
-        .annotate(frequency=models.Count('id'))
-        .order_by('-frequency')[:top_k]
+    stored = list(
+        ProductCoTrade.objects.filter(product_item_id=product_item_id, rank__lte=top_k)
+        .order_by('rank')
+        .values(name=F('neighbour__name'), frequency=F('companies'))
     )
-    
-    return list(co_traded)
+    if stored:
+        return stored
+
+    neighbours = live_neighbours(product_item_id, top_k)
+    names = dict(ProductItem.objects.filter(pk__in=[pk for pk, _ in neighbours]).values_list('pk', 'name'))
+    return [{'name': names.get(pk), 'frequency': companies} for pk, companies in neighbours]
 
 def get_product_clusters(company_name, direction='import'):
     """
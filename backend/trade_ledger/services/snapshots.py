@@ -0,0 +1,270 @@
+"""
+Columnar (Parquet) snapshots of the trade ledger for offline jobs.
+
+Snapshots are written by the ``export_ledger_parquet`` management command as a
+Hive-style partitioned dataset:
+
+    <LEDGER_SNAPSHOT_DIR>/trade_type=IMPORT/month=2025-01/part-0.parquet
+
+Each row is one ``Transaction`` with its product hierarchy already resolved, so
+graph building, LTR dataset building and analysis scripts can read the ledger
+without hitting the primary database.
+
+The manifest records the row count of every partition. Incremental exports
+rewrite partitions with rows ingested since the last export, plus any whose
+count in the ledger no longer matches (rows deleted or moved to another
+month or trade type), so the snapshot never keeps rows the ledger dropped.
+"""
+
+import json
+import os
+from datetime import date
+
+from django.conf import settings
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+
+from trade_data.models import Transaction
+
+
+MANIFEST_NAME = '_manifest.json'
+
+# (output column, ORM lookup, arrow type name)
+SNAPSHOT_COLUMNS = [
+    ('id', 'id', 'int64'),
+    ('reporting_date', 'reporting_date', 'date32'),
+    ('trade_type', 'trade_type', 'string'),
+    ('hs_code', 'hs_code', 'string'),
+    ('buyer', 'buyer', 'string'),
+    ('seller', 'seller', 'string'),
+    ('buyer_entity_id', 'buyer_entity_id', 'int64'),
+    ('seller_entity_id', 'seller_entity_id', 'int64'),
+    ('shipping_agent', 'shipping_agent', 'string'),
+    ('origin_country', 'origin_country', 'string'),
+    ('destination_country', 'destination_country', 'string'),
+    ('qty_kg', 'qty_kg', 'float64'),
+    ('qty_mt', 'qty_mt', 'float64'),
+    ('usd_per_kg', 'usd_per_kg', 'float64'),
+    ('usd_per_mt', 'usd_per_mt', 'float64'),
+    ('pkr', 'pkr', 'float64'),
+    ('usd', 'usd', 'float64'),
+    ('product_item_id', 'product_item_id', 'int64'),
+    ('product_item_name', 'product_item__name', 'string'),
+    ('sub_category_id', 'sub_category_id', 'int64'),
+    ('sub_category_name', 'sub_category__name', 'string'),
+    ('category_id', 'category_id', 'int64'),
+    ('category_name', 'category__name', 'string'),
+    ('product_id', 'category__product_id', 'int64'),
+    ('product_name', 'category__product__name', 'string'),
+    ('ingested_at', 'ingested_at', 'timestamp'),
+]
+
+FLOAT_COLUMNS = {name for name, _, kind in SNAPSHOT_COLUMNS if kind == 'float64'}
+
+# Encoded in the directory layout rather than stored in the files.
+PARTITION_COLUMNS = {'trade_type'}
+
+
+def get_snapshot_root(root=None):
+    return str(root or getattr(settings, 'LEDGER_SNAPSHOT_DIR', os.path.join(settings.BASE_DIR, 'ledger_snapshots')))
+
+
+def partition_dir(root, trade_type, month):
+    """Directory for one (trade_type, month) partition. ``month`` is a date."""
+    return os.path.join(root, f"trade_type={trade_type}", f"month={month:%Y-%m}")
+
+
+def partition_key(trade_type, month):
+    """Manifest key of one partition, e.g. ``'IMPORT/2025-01'``."""
+    return f"{trade_type}/{month:%Y-%m}"
+
+
+def ledger_partition_counts():
+    """``{(trade_type, month): rows}`` of the ledger from one grouped query."""
+    return {
+        (row['trade_type'], row['month']): row['rows']
+        for row in Transaction.objects.order_by()
+        .annotate(month=TruncMonth('reporting_date'))
+        .values('trade_type', 'month')
+        .annotate(rows=Count('id'))
+    }
+
+
+def snapshot_schema():
+    import pyarrow as pa
+
+    types = {
+        'int64': pa.int64(),
+        'date32': pa.date32(),
+        'string': pa.string(),
+        'float64': pa.float64(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([
+        (name, types[kind]) for name, _, kind in SNAPSHOT_COLUMNS
+        if name not in PARTITION_COLUMNS
+    ])
+
+
+def snapshot_queryset(trade_type, month_start, month_end):
+    """Rows of one partition, with the product hierarchy flattened into columns."""
+    columns = [(name, lookup) for name, lookup, _ in SNAPSHOT_COLUMNS if name not in PARTITION_COLUMNS]
+    lookups = {name: F(lookup) for name, lookup in columns if name != lookup}
+    plain = [name for name, lookup in columns if name == lookup]
+    return (
+        Transaction.objects.filter(
+            trade_type=trade_type,
+            reporting_date__gte=month_start,
+            reporting_date__lt=month_end,
+        )
+        .order_by()
+        .values(*plain, **lookups)
+    )
+
+
+def rows_to_batch(rows, schema):
+    """Converts a list of ``values()`` dicts into an Arrow record batch."""
+    import pyarrow as pa
+
+    columns = {}
+    for field in schema:
+        values = [row[field.name] for row in rows]
+        if field.name in FLOAT_COLUMNS:
+            values = [float(v) if v is not None else None for v in values]
+        columns[field.name] = pa.array(values, type=field.type)
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def write_partition(root, trade_type, month_start, month_end, chunk_size=50000):
+    """
+    Rewrites one partition from the database, streaming rows through a
+    server-side cursor so memory stays bounded by ``chunk_size``.
+    Returns the number of rows written.
+    """
+    import pyarrow.parquet as pq
+
+    schema = snapshot_schema()
+    target_dir = partition_dir(root, trade_type, month_start)
+    os.makedirs(target_dir, exist_ok=True)
+    target = os.path.join(target_dir, 'part-0.parquet')
+    # Dot-prefixed so dataset readers skip a partition that is mid-write.
+    tmp_path = os.path.join(target_dir, '.part-0.parquet.tmp')
+
+    written = 0
+    buffer = []
+    with pq.ParquetWriter(tmp_path, schema, compression='zstd') as writer:
+        for row in snapshot_queryset(trade_type, month_start, month_end).iterator(chunk_size=chunk_size):
+            buffer.append(row)
+            if len(buffer) >= chunk_size:
+                writer.write_batch(rows_to_batch(buffer, schema))
+                written += len(buffer)
+                buffer = []
+        if buffer:
+            writer.write_batch(rows_to_batch(buffer, schema))
+            written += len(buffer)
+
+    if written:
+        os.replace(tmp_path, target)
+    else:
+        os.remove(tmp_path)
+        if os.path.exists(target):
+            os.remove(target)
+    return written
+
+
+def read_manifest(root):
+    path = os.path.join(root, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'watermark': None, 'partitions': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_manifest(root, manifest):
+    path = os.path.join(root, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def snapshot_exists(root=None):
+    return os.path.exists(os.path.join(get_snapshot_root(root), MANIFEST_NAME))
+
+
+def read_ledger_snapshot(columns=None, trade_type=None, date_from=None, date_to=None, root=None):
+    """
+    Reads the Parquet snapshot into a DataFrame, pruning partitions by
+    trade type and month. Returns ``None`` when no snapshot has been exported.
+    """
+    import pandas as pd
+
+    root = get_snapshot_root(root)
+    if not snapshot_exists(root):
+        return None
+
+    filters = []
+    if trade_type:
+        filters.append(('trade_type', '=', trade_type))
+    if date_from:
+        filters.append(('month', '>=', f"{date_from:%Y-%m}"))
+    if date_to:
+        filters.append(('month', '<=', f"{date_to:%Y-%m}"))
+
+    read_columns = list(columns) if columns else None
+    if read_columns and (date_from or date_to) and 'reporting_date' not in read_columns:
+        read_columns.append('reporting_date')
+
+    df = pd.read_parquet(root, engine='pyarrow', columns=read_columns, filters=filters or None)
+
+    # Month partitions cover whole months; trim to the exact dates requested.
+    if date_from or date_to:
+        dates = pd.to_datetime(df['reporting_date'])
+        mask = pd.Series(True, index=df.index)
+        if date_from:
+            mask &= dates >= pd.Timestamp(date_from)
+        if date_to:
+            mask &= dates <= pd.Timestamp(date_to)
+        df = df[mask]
+        if columns and 'reporting_date' not in columns:
+            df = df.drop(columns=['reporting_date'])
+    for column in ('trade_type', 'month'):
+        if column in df.columns and str(df[column].dtype) == 'category':
+            df[column] = df[column].astype(str)
+    return df.reset_index(drop=True)
+
+
+def load_ledger_frame(columns, trade_type=None, date_from=None, date_to=None, prefer_snapshot=True):
+    """
+    Returns ledger rows as a DataFrame, from the Parquet snapshot when one
+    exists and from the ORM otherwise. ``columns`` are snapshot column names.
+    """
+    import pandas as pd
+
+    if prefer_snapshot:
+        df = read_ledger_snapshot(columns, trade_type=trade_type, date_from=date_from, date_to=date_to)
+        if df is not None:
+            return df
+
+    lookup_map = {name: lookup for name, lookup, _ in SNAPSHOT_COLUMNS}
+    qs = Transaction.objects.all().order_by()
+    if trade_type:
+        qs = qs.filter(trade_type=trade_type)
+    if date_from:
+        qs = qs.filter(reporting_date__gte=date_from)
+    if date_to:
+        qs = qs.filter(reporting_date__lte=date_to)
+
+    plain = [c for c in columns if lookup_map[c] == c]
+    renamed = {c: F(lookup_map[c]) for c in columns if lookup_map[c] != c}
+    df = pd.DataFrame(list(qs.values(*plain, **renamed)), columns=list(columns))
+    for column in FLOAT_COLUMNS.intersection(df.columns):
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    return df
+
+
+def month_bounds(month):
+    """(first day, first day of next month) for the month containing ``month``."""
+    start = date(month.year, month.month, 1)
+    end = date(start.year + (start.month // 12), start.month % 12 + 1, 1)
+    return start, end
@@ -1,90 +1,189 @@
-from django.db import models
-from django.db.models import Sum, Avg
-from django.db.models.functions import TruncMonth, TruncQuarter
+from django.db import connection
+from django.db.models import Count, ExpressionWrapper, F, IntegerField, Sum, Value
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractQuarter, ExtractYear
 from trade_data.models import Transaction
+from .aggregates import company_month_aggregates
 from .filters import apply_transaction_filters
-from datetime import date, timedelta
-
-def get_volume_price_monthly(company_name, direction='import', **filters):
-    qs = Transaction.objects.all()
-    qs = apply_transaction_filters(qs, direction=direction, company_name=company_name, **filters)
-
-    data = list(
-        qs.annotate(month=TruncMonth('reporting_date'))
-        .values('month')
-        .annotate(
-            volume=Sum('qty_mt'),
-            avg_price=Avg('usd_per_mt')
-        )
-        .order_by('month')
-    )
-    
-    
-    
-    lookup = {}
-    for x in data:
-        
-        d = x['month']
-        lookup[(d.year, d.month)] = x
-        
-    for x in data:
-        d = x['month']
-        prev_key = (d.year - 1, d.month)
-        
-        
-        x['product_name'] = 'All Products' 
-        x['yoy_volume_growth'] = None
-        x['yoy_price_growth'] = None
-        
-        if prev_key in lookup:
-            prev = lookup[prev_key]
-            
-            
-            cur_vol = float(x['volume'] or 0)
-            prev_vol = float(prev['volume'] or 0)
-            if prev_vol > 0:
-                x['yoy_volume_growth'] = round(((cur_vol - prev_vol) / prev_vol) * 100, 2)
-                
-            
-            cur_price = float(x['avg_price'] or 0)
-            prev_price = float(prev['avg_price'] or 0)
-            if prev_price > 0:
-                x['yoy_price_growth'] = round(((cur_price - prev_price) / prev_price) * 100, 2)
-                
-    return data
-
-def get_yoy_growth_by_quarter(company_name, direction='import', **filters):
-    qs = Transaction.objects.all()
-    qs = apply_transaction_filters(qs, direction=direction, company_name=company_name, **filters)
-
-    data = list(
-        qs.annotate(quarter=TruncQuarter('reporting_date'))
-        .values('quarter')
-        .annotate(vol=Sum('qty_mt'))
-        .order_by('quarter')
+from datetime import date
+
+
+TREND_BREAKDOWNS = ('product', 'partner')
+
+# period -> (buckets per year, extract function giving the bucket within the year)
+PERIODS = {
+    'month': (12, ExtractMonth),
+    'quarter': (4, ExtractQuarter),
+}
+
+
+def period_bucket(date_field, period):
+    """Consecutive integer per calendar month/quarter: year * per_year + index within the year."""
+    per_year, extract = PERIODS[period]
+    return ExpressionWrapper(
+        ExtractYear(date_field) * per_year + extract(date_field) - 1,
+        output_field=IntegerField(),
     )
-    
-    
-    lookup = {}
-    for x in data:
-        d = x['quarter']
-        
-        lookup[(d.year, d.month)] = x
-        
-    for x in data:
-        d = x['quarter']
-        prev_key = (d.year - 1, d.month)
-        
-        x['yoy_growth'] = None
-        
-        x['year'] = d.year
-        x['quarter'] = (d.month - 1) // 3 + 1
-        
-        if prev_key in lookup:
-            prev = lookup[prev_key]
-            cur_vol = float(x['vol'] or 0)
-            prev_vol = float(prev['vol'] or 0)
-            if prev_vol > 0:
-                x['yoy_growth'] = round(((cur_vol - prev_vol) / prev_vol) * 100, 2)
-                
-    return data
+
+
+def _bucket_of(day, period):
+    per_year = PERIODS[period][0]
+    index = day.month - 1 if period == 'month' else (day.month - 1) // 3
+    return day.year * per_year + index
+
+
+def bucket_start(bucket, period):
+    per_year = PERIODS[period][0]
+    months_per_bucket = 12 // per_year
+    return date(bucket // per_year, (bucket % per_year) * months_per_bucket + 1, 1)
+
+
+def _growth(current, previous):
+    current, previous = float(current or 0), float(previous or 0)
+    if previous > 0:
+        return round(((current - previous) / previous) * 100, 2)
+    return None
+
+
+def _series_key(breakdown, direction):
+    if breakdown == 'product':
+        return Coalesce(F('product_item__name'), Value('Unassigned'))
+    if breakdown == 'partner':
+        return Coalesce(F('buyer' if direction == 'export' else 'seller'), Value('Unknown'))
+    return Value('')
+
+
+def get_trend_series(company_name, direction='import', period='month', breakdown=None, **filters):
+    """
+    Continuous volume / average price series for a company in one query.
+
+    Trades are grouped into integer calendar buckets (monthly aggregates when
+    they can answer the filters, raw transactions otherwise). A recursive
+    calendar CTE then fills every bucket between the first and last one, or
+    between the date filters, for each series ('' without ``breakdown``,
+    product name or partner otherwise). LAG() over that calendar gives the
+    previous bucket and the same bucket a year earlier.
+
+    Returns dicts ordered by series and period: key, period_start, volume,
+    avg_price, prev_volume, prev_price, year_ago_volume, year_ago_price.
+    Empty buckets have volume 0 and avg_price None.
+    """
+    if breakdown not in (None,) + TREND_BREAKDOWNS:
+        raise ValueError(f"breakdown must be one of {', '.join(TREND_BREAKDOWNS)}")
+    per_year = PERIODS[period][0]
+
+    agg = None
+    if breakdown != 'partner':  # monthly aggregates have no partner column
+        agg = company_month_aggregates(direction=direction, company_name=company_name, **filters)
+    if agg is not None:
+        grouped = (
+            agg.annotate(bucket=period_bucket('month', period), series_key=_series_key(breakdown, direction))
+            .values('bucket', 'series_key')
+            .annotate(volume=Sum('total_qty_mt'), price_total=Sum('price_sum'), price_n=Sum('price_count'))
+        )
+    else:
+        qs = Transaction.objects.all()
+        qs = apply_transaction_filters(qs, direction=direction, company_name=company_name, **filters)
+        grouped = (
+            qs.annotate(bucket=period_bucket('reporting_date', period), series_key=_series_key(breakdown, direction))
+            .values('bucket', 'series_key')
+            .annotate(volume=Sum('qty_mt'), price_total=Sum('usd_per_mt'), price_n=Count('usd_per_mt'))
+        )
+    grouped_sql, grouped_params = grouped.order_by().query.sql_with_params()
+
+    date_from, date_to = filters.get('date_from'), filters.get('date_to')
+    sql = f"""
+        WITH RECURSIVE grouped AS ({grouped_sql}),
+        bounds AS (
+            SELECT COALESCE(%s, MIN(bucket)) AS lo, COALESCE(%s, MAX(bucket)) AS hi FROM grouped
+        ),
+        calendar(bucket) AS (
+            SELECT CAST(lo AS INTEGER) FROM bounds WHERE lo IS NOT NULL
+            UNION ALL
+            SELECT CAST(calendar.bucket + 1 AS INTEGER) FROM calendar, bounds WHERE calendar.bucket < bounds.hi
+        ),
+        series AS (
+            SELECT calendar.bucket, keys.series_key,
+                   COALESCE(grouped.volume, 0) AS volume,
+                   CAST(grouped.price_total AS FLOAT) / NULLIF(grouped.price_n, 0) AS avg_price
+            FROM calendar
+            CROSS JOIN (SELECT DISTINCT series_key FROM grouped) keys
+            LEFT JOIN grouped ON grouped.bucket = calendar.bucket AND grouped.series_key = keys.series_key
+        )
+        SELECT bucket, series_key, volume, avg_price,
+               LAG(volume, 1) OVER w, LAG(avg_price, 1) OVER w,
+               LAG(volume, {per_year}) OVER w, LAG(avg_price, {per_year}) OVER w
+        FROM series
+        WINDOW w AS (PARTITION BY series_key ORDER BY bucket)
+        ORDER BY series_key, bucket
+    """
+    params = list(grouped_params) + [
+        _bucket_of(date_from, period) if date_from else None,
+        _bucket_of(date_to, period) if date_to else None,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'key': key,
+            'period_start': bucket_start(bucket, period),
+            'volume': volume,
+            'avg_price': avg_price,
+            'prev_volume': prev_volume,
+            'prev_price': prev_price,
+            'year_ago_volume': year_ago_volume,
+            'year_ago_price': year_ago_price,
+        }
+        for bucket, key, volume, avg_price, prev_volume, prev_price, year_ago_volume, year_ago_price in rows
+    ]
+
+
+def _breakdown_fields(row, breakdown):
+    if breakdown == 'product':
+        return {'product_name': row['key']}
+    if breakdown == 'partner':
+        return {'product_name': 'All Products', 'partner': row['key']}
+    return {'product_name': 'All Products'}
+
+
+def get_volume_price_monthly(company_name, direction='import', breakdown=None, **filters):
+    """
+    Monthly volume and average price with YoY and MoM growth (%), one row per
+    calendar month including months without trades. ``breakdown`` =
+    'product' / 'partner' gives one series per product / partner.
+    """
+    series = get_trend_series(company_name, direction, 'month', breakdown, **filters)
+    return [
+        {
+            'month': row['period_start'],
+            'volume': row['volume'],
+            'avg_price': row['avg_price'],
+            **_breakdown_fields(row, breakdown),
+            'yoy_volume_growth': _growth(row['volume'], row['year_ago_volume']),
+            'yoy_price_growth': _growth(row['avg_price'], row['year_ago_price']),
+            'mom_volume_growth': _growth(row['volume'], row['prev_volume']),
+            'mom_price_growth': _growth(row['avg_price'], row['prev_price']),
+        }
+        for row in series
+    ]
+
+
+def get_yoy_growth_by_quarter(company_name, direction='import', breakdown=None, **filters):
+    """
+    Quarterly volume with YoY and quarter-over-quarter growth (%), one row
+    per calendar quarter including quarters without trades.
+    """
+    series = get_trend_series(company_name, direction, 'quarter', breakdown, **filters)
+    rows = []
+    for row in series:
+        start = row['period_start']
+        rows.append({
+            'vol': row['volume'],
+            'year': start.year,
+            'quarter': (start.month - 1) // 3 + 1,
+            **({} if breakdown is None else _breakdown_fields(row, breakdown)),
+            'yoy_growth': _growth(row['volume'], row['year_ago_volume']),
+            'qoq_growth': _growth(row['volume'], row['prev_volume']),
+        })
+    return rows
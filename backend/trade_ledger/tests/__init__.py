@@ -5,4 +5,24 @@ Contains:
 - test_views.py - Trade Ledger API tests
 - test_link_prediction.py - Link prediction algorithm tests (GNN accuracy)
 - test_ai_accuracy.py - AI/ML prediction accuracy and realism tests
+- test_snapshots.py - Parquet ledger snapshot tests
+- test_partitioning.py - Transaction partitioning and pruning tests
+- test_filters.py - Denormalized product key filter tests
+- test_entities.py - Buyer/seller entity resolution tests
+- test_entity_resolution.py - MinHash LSH name clustering tests
+- test_aggregates.py - Monthly ledger aggregate tests
+- test_data_version.py - Ledger data version / cache key tests
+- test_response_cache.py - Versioned API response cache tests
+- test_conditional.py - ETag / 304 conditional GET tests
+- test_fast_json.py - Fast JSON encoding tests and payload benchmark
+- test_exports.py - Streaming CSV/XLSX explorer export tests
+- test_explorer.py - Explorer company aggregation tests
+- test_company_overview.py - Consolidated company overview metrics tests
+- test_products.py - Product performance, batch YoY and portfolio similarity tests
+- test_compare.py - Batched multi-company comparison tests
+- test_trends.py - Gap-filled trend series tests
+- test_partners.py - Columnar partner trend tests
+- test_co_trade.py - Sparse product co-trade matrix tests
+- test_embedding_store.py - Shared company embedding matrix and name index tests
+- test_vectors.py - Binary embedding vector storage tests
 """
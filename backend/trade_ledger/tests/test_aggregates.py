@@ -0,0 +1,186 @@
+"""
+Tests for the maintained monthly ledger aggregates.
+
+Tests cover:
+- Month alignment and counterparty country helpers
+- refresh_month row grain and measures
+- Company services returning the same answers from aggregates and raw rows
+- Aggregates going stale after key backfills and deletions
+- The freshness check running once per data version
+"""
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trade_data.models import (
+    AggCompanyMonthProduct,
+    AggProductMonthCountry,
+    Product,
+    ProductCategory,
+    ProductItem,
+    ProductSubCategory,
+    Transaction,
+)
+from trade_ledger.services.aggregates import (
+    aggregates_are_current,
+    company_month_aggregates,
+    is_month_aligned,
+    refresh_month,
+)
+from trade_ledger.services.filters import counterparty_country_field
+from trade_ledger.services.partners import get_trade_volume_by_country
+from trade_ledger.services.trends import get_volume_price_monthly
+from utils.data_version import bump_data_version
+
+
+class TestHelpers:
+    """Pure helpers that do not need the database."""
+
+    def test_is_month_aligned(self):
+        assert is_month_aligned(None, None)
+        assert is_month_aligned(date(2025, 1, 1), date(2025, 2, 28))
+        assert not is_month_aligned(date(2025, 1, 2), None)
+        assert not is_month_aligned(None, date(2025, 2, 27))
+
+    def test_counterparty_country_field(self):
+        assert counterparty_country_field('import') == 'origin_country'
+        assert counterparty_country_field('export') == 'destination_country'
+
+
+@pytest.mark.django_db
+class TestLedgerAggregates:
+    """Refresh and read-back of AggCompanyMonthProduct."""
+
+    @pytest.fixture
+    def ledger(self, create_transaction):
+        create_transaction(
+            seller='Seller A', reporting_date=date(2025, 1, 5), origin_country='Brazil', qty_mt='10', usd_per_mt='400',
+        )
+        create_transaction(
+            seller='Seller B', reporting_date=date(2025, 1, 20), origin_country='Brazil', qty_mt='30', usd_per_mt='500',
+        )
+        create_transaction(
+            seller='Seller C', reporting_date=date(2025, 1, 25), origin_country='India', qty_mt='5', usd_per_mt=None,
+        )
+        create_transaction(
+            seller='Seller A', reporting_date=date(2025, 2, 3), origin_country='Brazil', qty_mt='20', usd_per_mt='450',
+        )
+
+    def test_refresh_month_groups_by_company_and_country(self, ledger):
+        refresh_month(date(2025, 1, 1))
+
+        row = AggCompanyMonthProduct.objects.get(month=date(2025, 1, 1), direction='import', country='Brazil')
+        assert row.company == 'Acme Foods'
+        assert row.total_qty_mt == Decimal('40')
+        assert row.price_sum == Decimal('900')
+        assert row.price_count == 2
+        assert row.transaction_count == 2
+        assert AggCompanyMonthProduct.objects.filter(direction='export', month=date(2025, 1, 1)).count() == 3
+        assert AggProductMonthCountry.objects.filter(month=date(2025, 1, 1)).count() == 2
+
+    def test_aggregates_unused_until_refreshed(self, ledger):
+        assert company_month_aggregates(direction='import', company_name='Acme Foods') is None
+
+    def test_services_match_raw_rows(self, ledger):
+        raw_trend = get_volume_price_monthly('Acme Foods', direction='import')
+        raw_countries = list(get_trade_volume_by_country('Acme Foods', direction='import'))
+
+        call_command('refresh_ledger_aggregates')
+
+        assert company_month_aggregates(direction='import', company_name='Acme Foods') is not None
+        agg_trend = get_volume_price_monthly('Acme Foods', direction='import')
+        agg_countries = list(get_trade_volume_by_country('Acme Foods', direction='import'))
+
+        assert [(r['month'], r['volume']) for r in agg_trend] == [(r['month'], r['volume']) for r in raw_trend]
+        assert [round(r['avg_price'], 4) for r in agg_trend] == [round(r['avg_price'], 4) for r in raw_trend]
+        assert agg_countries == raw_countries
+
+    def test_partial_month_range_falls_back_to_raw(self, ledger):
+        call_command('refresh_ledger_aggregates')
+
+        assert company_month_aggregates(
+            direction='import', company_name='Acme Foods', date_from=date(2025, 1, 10)
+        ) is None
+
+    def test_new_ingestion_makes_aggregates_stale(self, ledger, create_transaction):
+        call_command('refresh_ledger_aggregates')
+        create_transaction(
+            seller='Seller D', reporting_date=date(2025, 2, 10), origin_country='Thailand', qty_mt='1',
+            usd_per_mt='300',
+        )
+
+        assert company_month_aggregates(direction='import', company_name='Acme Foods') is None
+
+        call_command('refresh_ledger_aggregates')
+        countries = {r['country'] for r in get_trade_volume_by_country('Acme Foods', direction='import')}
+        assert 'Thailand' in countries
+
+    def test_deleted_rows_make_aggregates_stale(self, ledger):
+        call_command('refresh_ledger_aggregates')
+        Transaction.objects.filter(seller='Seller B').delete()
+
+        assert not aggregates_are_current()
+
+        call_command('refresh_ledger_aggregates', stdout=StringIO())
+        assert aggregates_are_current()
+        countries = {r['country']: r['total_volume'] for r in get_trade_volume_by_country('Acme Foods', direction='import')}
+        assert countries['Brazil'] == Decimal('30')
+
+    def test_freshness_is_checked_once_per_data_version(self, ledger):
+        call_command('refresh_ledger_aggregates')
+        assert aggregates_are_current()
+        with CaptureQueriesContext(connection) as ctx:
+            assert aggregates_are_current()
+            company_month_aggregates(direction='import', company_name='Acme Foods')
+        assert len(ctx) == 0
+
+        # Deleting commands bump the version, which re-runs the check.
+        Transaction.objects.filter(seller='Seller B').delete()
+        assert aggregates_are_current()
+        bump_data_version('test')
+        assert not aggregates_are_current()
+
+
+@pytest.mark.django_db
+class TestBackfilledKeys:
+    """Product key backfills after a refresh invalidate the copied keys."""
+
+    @pytest.fixture
+    def item(self):
+        product = Product.objects.create(name='Sugar', hs_code='17')
+        category = ProductCategory.objects.create(product=product, name='Cane Sugar', hs_code='17.01')
+        sub_category = ProductSubCategory.objects.create(category=category, name='Raw', hs_code='17.01.1')
+        return ProductItem.objects.create(sub_category=sub_category, name='Raw Cane Sugar')
+
+    def test_category_filter_after_backfill(self, item, create_transaction):
+        create_transaction(
+            seller='Seller A', reporting_date=date(2025, 1, 5), origin_country='Brazil', qty_mt='10', usd_per_mt='400',
+            product_item=item,
+        )
+        create_transaction(
+            seller='Seller B', reporting_date=date(2025, 2, 3), origin_country='India', qty_mt='20', usd_per_mt='450',
+            product_item=item,
+        )
+        # Rows loaded before the denormalized keys existed.
+        Transaction.objects.update(sub_category=None, category=None)
+        call_command('refresh_ledger_aggregates')
+        category_id = item.sub_category.category_id
+
+        call_command('backfill_transaction_product_keys', stdout=StringIO())
+        assert not aggregates_are_current()
+        raw = get_trade_volume_by_country('Acme Foods', direction='import', product_category_id=category_id)
+        assert {r['country'] for r in raw} == {'Brazil', 'India'}
+
+        call_command('refresh_ledger_aggregates', stdout=StringIO())
+        assert aggregates_are_current()
+        assert company_month_aggregates(
+            direction='import', company_name='Acme Foods', product_category_id=category_id
+        ).count() == 2
+        agg = get_trade_volume_by_country('Acme Foods', direction='import', product_category_id=category_id)
+        assert list(agg) == list(raw)
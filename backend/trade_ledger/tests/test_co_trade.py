@@ -0,0 +1,121 @@
+"""
+Tests for the precomputed product co-trade matrix.
+
+Tests cover:
+- Company x product incidence and A^T.A top-k neighbours
+- Full and incremental refresh through the management command
+- Deleted rows forcing a full refresh
+- get_co_traded_products as a single lookup, live before the first refresh
+"""
+
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trade_data.models import Product, ProductCategory, ProductCoTrade, ProductItem, ProductSubCategory, Transaction
+from trade_ledger.services.co_trade import build_incidence, live_neighbours, refresh_co_trade, top_neighbours
+from trade_ledger.services.products import get_co_traded_products
+
+
+@pytest.fixture
+def items(db):
+    product = Product.objects.create(name='Sugar', hs_code='17')
+    category = ProductCategory.objects.create(product=product, name='Cane Sugar', hs_code='17.01')
+    sub_category = ProductSubCategory.objects.create(category=category, name='Raw', hs_code='17.01.1')
+    return {
+        name: ProductItem.objects.create(sub_category=sub_category, name=name)
+        for name in ('Raw Sugar', 'Refined Sugar', 'Molasses', 'Icing Sugar')
+    }
+
+
+@pytest.fixture
+def ledger(items, create_transaction):
+    # Raw Sugar is traded by Acme, Bolan, Mill X and Mill Y.
+    create_transaction(
+        buyer='Acme Foods', seller='Mill X', reporting_date=date(2025, 1, 5), product_item=items['Raw Sugar'],
+    )
+    create_transaction(
+        buyer='Bolan Mills', seller='Mill Y', reporting_date=date(2025, 1, 5), product_item=items['Raw Sugar'],
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Mill Z', reporting_date=date(2025, 1, 5), product_item=items['Refined Sugar'],
+    )
+    create_transaction(
+        buyer='Bolan Mills', seller='Mill Z', reporting_date=date(2025, 1, 5), product_item=items['Refined Sugar'],
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Mill Z', reporting_date=date(2025, 1, 5), product_item=items['Refined Sugar'],
+    )  # duplicate pair
+    create_transaction(
+        buyer='Bolan Mills', seller='Mill Q', reporting_date=date(2025, 1, 5), product_item=items['Molasses'],
+    )
+    create_transaction(
+        buyer='Other Buyer', seller='Mill Q', reporting_date=date(2025, 1, 5), product_item=items['Icing Sugar'],
+    )
+    return items
+
+
+@pytest.mark.django_db
+class TestCoTradeMatrix:
+    """Sparse incidence, top-k rows and the stored neighbour lists."""
+
+    def test_incidence(self, ledger):
+        matrix, company_index, products = build_incidence()
+        assert matrix.shape == (len(company_index), 4)
+        # Distinct (company, product) pairs on both sides.
+        assert matrix.nnz == 11
+        assert matrix.max() == 1
+
+    def test_top_neighbours(self, ledger):
+        matrix, _, products = build_incidence()
+        rows = dict(top_neighbours(matrix, products, list(range(len(products))), top_k=2))
+        raw = ledger['Raw Sugar'].pk
+        assert rows[raw] == [(ledger['Refined Sugar'].pk, 2), (ledger['Molasses'].pk, 1)]
+        assert rows[ledger['Icing Sugar'].pk] == [(ledger['Molasses'].pk, 1)]
+
+    def test_lookup_is_one_query(self, ledger):
+        call_command('refresh_co_trade_matrix')
+        with CaptureQueriesContext(connection) as ctx:
+            neighbours = get_co_traded_products(ledger['Raw Sugar'].pk, top_k=5)
+        assert len(ctx) == 1
+        assert neighbours == [{'name': 'Refined Sugar', 'frequency': 2}, {'name': 'Molasses', 'frequency': 1}]
+        assert get_co_traded_products(ledger['Raw Sugar'].pk, top_k=1) == [{'name': 'Refined Sugar', 'frequency': 2}]
+
+    def test_live_fallback_before_refresh(self, ledger):
+        raw = ledger['Raw Sugar'].pk
+        matrix, _, products = build_incidence()
+        assert live_neighbours(raw) == dict(top_neighbours(matrix, products, list(range(len(products)))))[raw]
+        expected = [{'name': 'Refined Sugar', 'frequency': 2}, {'name': 'Molasses', 'frequency': 1}]
+        assert get_co_traded_products(raw) == expected
+
+        call_command('refresh_co_trade_matrix')
+        assert get_co_traded_products(raw) == expected
+
+    def test_incremental_refresh(self, ledger, create_transaction):
+        assert refresh_co_trade() == 4
+        assert refresh_co_trade() == 0
+
+        # Other Buyer now also trades Raw Sugar: rows of Raw Sugar and Icing Sugar change, Molasses does not.
+        create_transaction(
+            buyer='Other Buyer', seller='Mill X', reporting_date=date(2025, 1, 5), product_item=ledger['Raw Sugar'],
+        )
+        assert refresh_co_trade() == 2
+        icing = get_co_traded_products(ledger['Icing Sugar'].pk)
+        assert {'name': 'Raw Sugar', 'frequency': 1} in icing
+        assert refresh_co_trade(full=True) == 4
+
+    def test_full_refresh_drops_products_without_trades(self, ledger):
+        refresh_co_trade()
+        Transaction.objects.filter(product_item=ledger['Icing Sugar']).delete()
+        refresh_co_trade(full=True)
+        assert not ProductCoTrade.objects.filter(product_item=ledger['Icing Sugar']).exists()
+
+    def test_deleted_rows_force_full_refresh(self, ledger):
+        refresh_co_trade()
+        # Bolan's Molasses trade was the only link between Molasses and Raw Sugar.
+        Transaction.objects.filter(buyer='Bolan Mills', product_item=ledger['Molasses']).delete()
+        assert refresh_co_trade() == 3
+        assert get_co_traded_products(ledger['Raw Sugar'].pk) == [{'name': 'Refined Sugar', 'frequency': 2}]
@@ -0,0 +1,117 @@
+"""
+Tests for the consolidated company overview metrics.
+
+Tests cover:
+- Totals, partners, MoM growth, top products and countries from the two queries
+- Filters applied to the metrics but not to the whole-history country distribution
+- Same answers from monthly aggregates and raw transactions
+- Query count of get_company_overview_metrics
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trade_data.models import Product, ProductCategory, ProductItem, ProductSubCategory
+from trade_ledger.services.company import get_company_overview_metrics, get_mom_growth_for_company, mom_windows
+
+
+@pytest.fixture
+def ledger(create_transaction):
+    product = Product.objects.create(name='Sugar', hs_code='17')
+    category = ProductCategory.objects.create(product=product, name='Cane Sugar', hs_code='17.01')
+    sub_category = ProductSubCategory.objects.create(category=category, name='Raw', hs_code='17.01.1')
+    items = {
+        name: ProductItem.objects.create(sub_category=sub_category, name=name)
+        for name in ('Raw Sugar', 'Refined Sugar', 'Molasses')
+    }
+    last_start, _, prior_start, _ = mom_windows()
+    create_transaction(
+        buyer='Acme Foods', seller='Seller A', reporting_date=last_start + timedelta(days=4), origin_country='Brazil',
+        qty_mt='30', usd_per_mt='400', product_item=items['Raw Sugar'],
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller B', reporting_date=last_start + timedelta(days=9), origin_country='India',
+        qty_mt='10', usd_per_mt='450', product_item=items['Refined Sugar'],
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller A', reporting_date=prior_start + timedelta(days=2), origin_country='Brazil',
+        qty_mt='20', usd_per_mt='410', product_item=items['Molasses'],
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller C', reporting_date=date(2020, 3, 1), origin_country='Thailand', qty_mt='50',
+        usd_per_mt='300',
+    )
+    create_transaction(
+        buyer='Other Buyer', seller='Acme Foods', reporting_date=last_start, origin_country='Brazil', qty_mt='99',
+        usd_per_mt='100',
+    )
+    return last_start
+
+
+@pytest.mark.django_db
+class TestCompanyOverviewMetrics:
+    """get_company_overview_metrics on raw transactions and monthly aggregates."""
+
+    def test_unfiltered(self, ledger):
+        metrics = get_company_overview_metrics('Acme Foods', direction='import')
+        assert metrics['total_volume_mt'] == 110.0
+        assert metrics['est_revenue_usd'] == 39700.0
+        assert metrics['active_partners'] == 3
+        assert float(metrics['mom_growth_pct']) == 100.0
+        assert float(metrics['mom_growth_pct']) == float(get_mom_growth_for_company('Acme Foods', 'import'))
+        assert [(p['name'], p['share_pct'], p['subcat'], p['cat']) for p in metrics['top_products']] == [
+            ('Raw Sugar', 27.3, 'Raw', 'Cane Sugar'),
+            ('Molasses', 18.2, 'Raw', 'Cane Sugar'),
+            ('Refined Sugar', 9.1, 'Raw', 'Cane Sugar'),
+        ]
+        assert [(c['country'], float(c['vol'])) for c in metrics['top_countries']] == [
+            ('Brazil', 50.0), ('Thailand', 50.0), ('India', 10.0),
+        ]
+        assert metrics['country_distribution'][0] == {'name': 'Brazil', 'volume': 50.0, 'value': 20200.0}
+
+    def test_filters_scope_metrics_not_distribution(self, ledger):
+        metrics = get_company_overview_metrics('Acme Foods', direction='import', date_from=ledger)
+        assert metrics['total_volume_mt'] == 40.0
+        assert metrics['active_partners'] == 2
+        # MoM compares whole months regardless of the date filter.
+        assert float(metrics['mom_growth_pct']) == 100.0
+        assert [p['name'] for p in metrics['top_products']] == ['Raw Sugar', 'Refined Sugar']
+        assert [c['country'] for c in metrics['top_countries']] == ['Brazil', 'India']
+        assert [c['name'] for c in metrics['country_distribution']] == ['Brazil', 'Thailand', 'India']
+
+    def test_country_filter(self, ledger):
+        metrics = get_company_overview_metrics('Acme Foods', direction='import', country='India')
+        assert metrics['total_volume_mt'] == 10.0
+        assert [c['country'] for c in metrics['top_countries']] == ['India']
+
+    @pytest.mark.parametrize('filters', [{}, {'date_from': 'last_start'}, {'country': 'Brazil'}])
+    def test_aggregates_match_raw_rows(self, ledger, filters):
+        filters = {k: ledger if v == 'last_start' else v for k, v in filters.items()}
+        raw = get_company_overview_metrics('Acme Foods', direction='import', **filters)
+        call_command('refresh_ledger_aggregates')
+        agg = get_company_overview_metrics('Acme Foods', direction='import', **filters)
+
+        def normalized(metrics):
+            return {
+                **metrics,
+                'top_products': [{**p, 'vol': float(p['vol'])} for p in metrics['top_products']],
+                'top_countries': [{**c, 'vol': float(c['vol'])} for c in metrics['top_countries']],
+            }
+
+        assert normalized(agg) == normalized(raw)
+
+    def test_two_ledger_queries(self, ledger):
+        with CaptureQueriesContext(connection) as ctx:
+            get_company_overview_metrics('Acme Foods', direction='import', date_from=ledger, country='Brazil')
+        ledger_queries = [q for q in ctx.captured_queries if 'aggregaterefreshstate' not in q['sql'].lower()]
+        assert len(ledger_queries) == 2
+
+    def test_unknown_company(self, ledger):
+        metrics = get_company_overview_metrics('Nobody', direction='import')
+        assert metrics['total_volume_mt'] == 0.0
+        assert metrics['mom_growth_pct'] is None
+        assert metrics['top_products'] == metrics['top_countries'] == metrics['country_distribution'] == []
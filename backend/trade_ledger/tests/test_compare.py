@@ -0,0 +1,104 @@
+"""
+Tests for the multi-company comparison engine.
+
+Tests cover:
+- Ledger metrics, HHI partner diversity and MoM growth per company
+- Filters, direction="both" and companies without trades
+- Constant query count whatever the number of companies
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trade_data.models import CompanyEmbedding
+from trade_ledger.services.company import mom_windows
+from trade_ledger.services.compare import get_company_comparison_metrics
+
+
+@pytest.fixture
+def ledger(create_transaction):
+    last_start, _, prior_start, _ = mom_windows()
+    create_transaction(
+        buyer='Acme Foods', seller='Seller A', reporting_date=last_start + timedelta(days=1), origin_country='Brazil',
+        qty_mt='30', usd_per_mt='400',
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller B', reporting_date=last_start + timedelta(days=2), origin_country='India',
+        qty_mt='10', usd_per_mt='500',
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller A', reporting_date=prior_start + timedelta(days=3), origin_country='Brazil',
+        qty_mt='20', usd_per_mt='400',
+    )
+    create_transaction(
+        buyer='Bolan Mills', seller='Acme Foods', reporting_date=date(2020, 1, 1), origin_country='Brazil', qty_mt='8',
+        usd_per_mt='300',
+    )
+    CompanyEmbedding.objects.create(company_name='Acme Foods', embedding=[0.1, 0.2], pagerank=0.5, degree=3)
+    return last_start
+
+
+@pytest.mark.django_db
+class TestCompanyComparison:
+    """get_company_comparison_metrics over several companies at once."""
+
+    def test_metrics(self, ledger):
+        metrics = get_company_comparison_metrics(['Acme Foods', 'Bolan Mills', 'Nobody'], direction='import')
+        assert list(metrics) == ['Acme Foods', 'Bolan Mills', 'Nobody']
+
+        acme = metrics['Acme Foods']
+        assert acme['trade_volume'] == 60.0
+        assert acme['estimated_revenue'] == 25000.0
+        assert acme['total_partners'] == 2
+        assert acme['total_products'] == 0
+        # Seller A 50 MT, Seller B 10 MT of 60: 1 - (25/36 + 1/36).
+        assert acme['partner_diversity_score'] == pytest.approx(10 / 36)
+        assert float(acme['mom_growth_pct']) == 100.0
+        # Prices 400, 500, 400.
+        assert acme['price_volatility'] == pytest.approx(47.1404, rel=1e-4)
+        _, _, prior_start, _ = mom_windows()
+        assert acme['active_since'] == (prior_start + timedelta(days=3)).isoformat()
+        assert acme['pagerank'] == 0.5
+        assert acme['network_degree'] == 3
+
+        bolan = metrics['Bolan Mills']
+        assert bolan['trade_volume'] == 8.0
+        assert bolan['partner_diversity_score'] == 0.0
+        assert bolan['mom_growth_pct'] is None
+        assert bolan['active_since'] == '2020-01-01'
+
+        assert metrics['Nobody'] == {
+            'trade_volume': 0.0,
+            'estimated_revenue': 0.0,
+            'total_partners': 0,
+            'total_products': 0,
+            'partner_diversity_score': 0.0,
+            'mom_growth_pct': None,
+            'price_volatility': 0,
+            'active_since': None,
+            'pagerank': 0.0,
+            'network_degree': 0,
+        }
+
+    def test_filters_keep_mom_windows(self, ledger):
+        metrics = get_company_comparison_metrics(['Acme Foods', 'Bolan Mills'], direction='import', country='India')
+        assert metrics['Acme Foods']['trade_volume'] == 10.0
+        assert metrics['Acme Foods']['total_partners'] == 1
+        assert float(metrics['Acme Foods']['mom_growth_pct']) == 100.0
+        assert metrics['Bolan Mills']['trade_volume'] == 0.0
+
+    def test_both_directions(self, ledger):
+        metrics = get_company_comparison_metrics(['Acme Foods', 'Bolan Mills'], direction='both')
+        assert metrics['Acme Foods']['trade_volume'] == 68.0
+        assert metrics['Acme Foods']['total_partners'] == 3
+        assert metrics['Bolan Mills']['trade_volume'] == 8.0
+
+    def test_query_count_does_not_grow(self, ledger):
+        names = ['Acme Foods', 'Bolan Mills'] + [f'Company {i}' for i in range(48)]
+        with CaptureQueriesContext(connection) as ctx:
+            metrics = get_company_comparison_metrics(names, direction='import')
+        assert len(metrics) == 50
+        assert len(ctx) == 2
@@ -0,0 +1,62 @@
+"""
+Tests for conditional GET on the analytics endpoints.
+
+Tests cover:
+- ETag / Last-Modified headers derived from the data version
+- 304 Not Modified for a matching If-None-Match
+- New validators after a data version bump
+- Authenticated Trade Lens endpoints
+"""
+
+import pytest
+from rest_framework.test import APIClient
+
+from trade_lens.models import TradeLensProduct
+from utils.data_version import bump_data_version
+
+
+@pytest.mark.django_db
+class TestLedgerConditionalGet:
+    """trade_ledger function views."""
+
+    url = '/api/product-clusters/'
+
+    def test_etag_and_not_modified(self, api_client):
+        bump_data_version('test')
+        response = api_client.get(self.url)
+        assert response.status_code == 200
+        assert response.has_header('ETag')
+        assert response.has_header('Last-Modified')
+
+        repeat = api_client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert repeat.status_code == 304
+        assert repeat.content == b''
+
+    def test_etag_depends_on_query_string(self, api_client):
+        first = api_client.get(self.url)
+        other = api_client.get(self.url + '?x=1', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert other.status_code == 200
+        assert other['ETag'] != first['ETag']
+
+    def test_bump_changes_etag(self, api_client):
+        first = api_client.get(self.url)
+        bump_data_version('test')
+        second = api_client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert second.status_code == 200
+        assert second['ETag'] != first['ETag']
+
+
+@pytest.mark.django_db
+class TestTradeLensConditionalGet:
+    """DRF viewset actions keep authentication ahead of the 304 check."""
+
+    def test_not_modified_for_authenticated_user(self, authenticated_client):
+        product = TradeLensProduct.objects.create(name='Sugar', hs_code='1701', category='Sweeteners')
+        url = f'/api/trade-lens/products/{product.pk}/overview/'
+
+        response = authenticated_client.get(url)
+        assert response.status_code == 200
+        etag = response['ETag']
+
+        assert authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        assert APIClient().get(url, HTTP_IF_NONE_MATCH=etag).status_code in (401, 403)
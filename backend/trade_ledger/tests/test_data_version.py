@@ -0,0 +1,87 @@
+"""
+Tests for the global ledger data version.
+
+Tests cover:
+- Version initialisation and monotonic bumps
+- Recovery after the cache is cleared
+- Versioned cache keys changing after a bump
+- Load commands bumping the version (ingestion only once its rows are committed)
+"""
+
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from trade_data.models import Transaction
+from utils.data_version import (
+    bump_data_version,
+    get_data_version,
+    get_data_version_info,
+    versioned_cache_key,
+)
+
+
+class TestDataVersion:
+    """Counter behaviour on the configured cache backend."""
+
+    def test_bump_increases_version(self):
+        before = get_data_version()
+        assert get_data_version() == before
+        assert bump_data_version('test') > before
+        assert get_data_version() > before
+
+    def test_bump_records_timestamp(self):
+        assert get_data_version_info()[1] is None
+        bump_data_version()
+        version, bumped_at = get_data_version_info()
+        assert version == get_data_version()
+        assert bumped_at is not None
+
+    def test_version_stays_monotonic_after_cache_clear(self):
+        bump_data_version()
+        bumped = get_data_version()
+        cache.clear()
+        assert bump_data_version() > bumped
+
+    def test_versioned_cache_key(self):
+        key = versioned_cache_key('explorer', 'import', None)
+        assert key == versioned_cache_key('explorer', 'import', None)
+        assert key != versioned_cache_key('explorer', 'export', None)
+        bump_data_version()
+        assert key != versioned_cache_key('explorer', 'import', None)
+
+
+@pytest.mark.django_db
+class TestCommandsBumpVersion:
+    """Commands that change ledger data invalidate versioned keys."""
+
+    def test_refresh_ledger_aggregates_bumps(self):
+        Transaction.objects.create(
+            source_file='test.csv', tx_reference='T', reporting_date='2025-01-05',
+            trade_type='IMPORT', hs_code='17.01', buyer='Acme Foods', seller='Seller A',
+            shipping_agent='Agent', origin_country='Brazil', destination_country='Pakistan',
+            qty_mt=10, usd_per_mt=400, usd=4000,
+        )
+        before = get_data_version()
+        call_command('refresh_ledger_aggregates')
+        assert get_data_version() > before
+
+    def test_ingest_trade_bumps_after_commit(self, tmp_path, django_capture_on_commit_callbacks):
+        csv_file = tmp_path / 'imports.csv'
+        csv_file.write_text(
+            'Date,HS Code,Category,Sub-Category,Item Description,Buyer,Seller,Shipping Agents,'
+            'Country,Qty KG,Qty MT,USD/KG,USD/MT,PKR,USD\n'
+            '2025-01-05,17.01.1000,Cane,Raw,Raw sugar,Acme Foods,Seller A,Agent,Brazil,'
+            '10000,10,0.4,400,1120000,4000\n'
+        )
+        before = get_data_version()
+        with django_capture_on_commit_callbacks() as callbacks:
+            call_command('ingest_trade', file=str(csv_file), stdout=StringIO())
+            # Still inside the test transaction: rows not committed, version unchanged.
+            assert get_data_version() == before
+        assert Transaction.objects.count() == 1
+        assert len(callbacks) == 1
+        callbacks[0]()
+        assert get_data_version() > before
@@ -0,0 +1,172 @@
+"""
+Tests for the shared company embedding store.
+
+Tests cover:
+- Unit-normalized contiguous matrix, name index and cluster tags
+- Top-k cosine neighbours with candidate and exclusion sets
+- Rows of a minority embedding dimension being left out
+- Similar companies and Node2Vec link prediction served from the store
+- Rebuild after a data version bump
+- Indexed fuzzy company name lookup with ranked "did you mean" candidates
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trade_data.models import CompanyEmbedding
+from trade_ledger.services.embedding_store import (
+    CompanyEmbeddingStore,
+    CompanyNameIndex,
+    get_company_embedding_store,
+    get_company_name_index,
+)
+from trade_ledger.services.gnn import find_company_candidates, get_company_embedding, get_similar_companies
+from trade_ledger.services.link_prediction import predict_buyers_node2vec, predict_sellers_node2vec
+from utils.data_version import bump_data_version
+
+
+@pytest.fixture
+def embeddings(db):
+    for name, vector, tag in (
+        ('Acme Foods', [1.0, 0.0], 'sugar'),
+        ('Bolan Mills', [2.0, 0.1], 'sugar'),
+        ('Crescent', [0.0, 3.0], 'textile'),
+        ('Delta', [1.0, 1.0], 'mixed'),
+        ('Legacy', [1.0, 0.0, 0.0], 'old'),
+    ):
+        CompanyEmbedding.objects.create(company_name=name, embedding=vector, cluster_tag=tag)
+    get_company_embedding_store.cache_clear()
+    get_company_name_index.cache_clear()
+
+
+class TestCompanyEmbeddingStore:
+    """Matrix layout and nearest-neighbour selection."""
+
+    def _store(self):
+        return CompanyEmbeddingStore(
+            ['A', 'B', 'C', 'Z'],
+            [[3.0, 4.0], [1.0, 0.0], [0.0, 2.0], [0.0, 0.0]],
+            ['x', 'y', 'z', None],
+        )
+
+    def test_rows_are_unit_float32(self):
+        store = self._store()
+        assert store.vectors.dtype == np.float32
+        assert store.vectors.flags['C_CONTIGUOUS']
+        assert np.linalg.norm(store.vectors[:3], axis=1) == pytest.approx([1.0, 1.0, 1.0])
+        assert store.vector('A') == pytest.approx([0.6, 0.8])
+        assert not store.vector('Z').any()
+        assert store.vector('missing') is None
+        assert store.tag('B') == 'y'
+
+    def test_nearest(self):
+        store = self._store()
+        result = store.nearest('A', top_k=2)
+        assert [name for name, _, _ in result] == ['A', 'C']
+        assert result[1][1] == pytest.approx(0.8)
+        assert result[1][2] == 'z'
+
+    def test_candidates_and_exclusions(self):
+        store = self._store()
+        result = store.nearest([1.0, 0.0], top_k=5, exclude={'B'}, candidates=['B', 'C', 'unknown'])
+        assert [name for name, _, _ in result] == ['C']
+        assert store.nearest([1.0, 0.0], top_k=0) == []
+        assert store.nearest([1.0, 0.0, 0.0]) == []
+
+
+@pytest.mark.django_db
+class TestSharedStore:
+    """Store built from CompanyEmbedding rows and its callers."""
+
+    def test_minority_dimension_is_skipped(self, embeddings):
+        store = get_company_embedding_store()
+        assert store.dim == 2
+        assert 'Legacy' not in store
+        assert len(store) == 4
+
+    def test_similar_companies(self, embeddings):
+        similar = get_similar_companies('acme foods', top_k=2)
+        assert [s['company_name'] for s in similar] == ['Bolan Mills', 'Delta']
+        assert similar[0]['segment_tag'] == 'sugar'
+        assert similar[1]['similarity'] == pytest.approx(2 ** -0.5, rel=1e-5)
+        assert similar[0]['total_volume_mt'] is None
+
+    def test_node2vec_excludes_existing_partners(self, embeddings, create_transaction):
+        create_transaction(buyer='Acme Foods', seller='Bolan Mills', reporting_date=date(2024, 1, 10), usd_per_mt='100')
+        create_transaction(buyer='Other', seller='Crescent', reporting_date=date(2024, 1, 10), usd_per_mt='100')
+        create_transaction(buyer='Other', seller='Delta', reporting_date=date(2024, 1, 10), usd_per_mt='100')
+        get_company_embedding_store.cache_clear()
+
+        sellers = predict_sellers_node2vec('Acme Foods', top_k=5)['results']
+        assert [r['seller'] for r in sellers] == ['Delta', 'Crescent']
+        assert sellers[0]['method'] == 'node2vec'
+        assert sellers[0]['score'] <= 0.95
+        assert predict_buyers_node2vec('Delta')['results'][0]['buyer'] == 'Acme Foods'
+        assert predict_sellers_node2vec('Nobody')['error']
+
+    def test_rebuilt_after_data_version_bump(self, embeddings):
+        store = get_company_embedding_store()
+        assert get_company_embedding_store() is store
+        CompanyEmbedding.objects.create(company_name='Eagle', embedding=[0.5, 0.5])
+        bump_data_version('test')
+        assert 'Eagle' in get_company_embedding_store()
+
+
+class TestCompanyNameIndex:
+    """Fuzzy name resolution from names alone."""
+
+    def _index(self):
+        return CompanyNameIndex(['Acme Foods (Pvt) Ltd', 'Bolan Mills', 'Bolan Sugar', 'Crescent Textile'])
+
+    def test_exact_and_normalized(self):
+        index = self._index()
+        assert index.search('Bolan Mills') == [('Bolan Mills', 1.0, True)]
+        assert index.resolve('  acme foods (pvt.) ltd. ') == 'Acme Foods (Pvt) Ltd'
+
+    def test_substring_and_first_word(self):
+        index = self._index()
+        assert index.resolve('crescent') == 'Crescent Textile'
+        assert index.resolve('Acme Foods Pvt Ltd Karachi') == 'Acme Foods (Pvt) Ltd'
+        assert index.resolve('Zeta Traders') is None
+        assert index.resolve('Acme Foods') == 'Acme Foods (Pvt) Ltd'
+        # Both Bolan companies share the first word; the closer spelling wins.
+        assert [name for name, _, _ in index.search('Bolan Mill')] == ['Bolan Mills', 'Bolan Sugar']
+
+    def test_did_you_mean(self):
+        index = self._index()
+        assert index.resolve('Cresent Textiles') is None
+        candidates = index.search('Cresent Textiles')
+        assert candidates[0][0] == 'Crescent Textile'
+        assert candidates[0][1] >= 0.3
+        assert index.search('zzz') == []
+        assert index.search('') == []
+
+
+@pytest.mark.django_db
+class TestCompanyNameLookup:
+    """get_company_embedding and "did you mean" through the shared index."""
+
+    def test_index_query_skips_embeddings(self, embeddings):
+        with CaptureQueriesContext(connection) as ctx:
+            get_company_name_index()
+        assert len(ctx.captured_queries) == 1
+        assert '."embedding"' not in ctx.captured_queries[0]['sql'].split('FROM')[0]
+
+    def test_get_company_embedding(self, embeddings):
+        vector, name = get_company_embedding('BOLAN')
+        assert name == 'Bolan Mills'
+        assert list(vector) == pytest.approx([2.0, 0.1])
+        assert get_company_embedding('Nobody') == (None, None)
+
+    def test_candidates(self, embeddings):
+        assert find_company_candidates('Cresent')[0]['company_name'] == 'Crescent'
+
+    def test_similar_api_did_you_mean(self, embeddings, api_client):
+        response = api_client.get('/api/company/Bolam%20Mils/similar/')
+        data = response.json()
+        assert data['similar_companies'] == []
+        assert data['did_you_mean'][0]['company_name'] == 'Bolan Mills'
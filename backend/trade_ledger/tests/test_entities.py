@@ -0,0 +1,112 @@
+"""
+Tests for buyer/seller entity resolution.
+
+Tests cover:
+- Company name normalization and placeholder handling
+- EntityResolver caching and role flags
+- Entity keys filled on Transaction save and re-resolved after renames
+"""
+
+from datetime import date
+
+import pytest
+
+from trade_data.entities import EntityResolver, normalize_entity_name
+from trade_data.models import TradeEntity, Transaction
+
+
+class TestNormalizeEntityName:
+    """Pure normalization rules."""
+
+    def test_case_punctuation_and_whitespace(self):
+        assert normalize_entity_name('  Acme Foods (Pvt.) Ltd. ') == 'ACME FOODS (PVT) LTD'
+        assert normalize_entity_name('acme  foods (pvt) ltd') == 'ACME FOODS (PVT) LTD'
+
+    @pytest.mark.parametrize('name', [None, '', '  ', 'Unknown', 'unknown', 'N/A', 'nan'])
+    def test_placeholders_normalize_to_empty(self, name):
+        assert normalize_entity_name(name) == ''
+
+
+@pytest.mark.django_db
+class TestEntityResolver:
+    """Resolution to TradeEntity ids."""
+
+    def test_variants_share_one_entity(self):
+        resolver = EntityResolver()
+        first = resolver.resolve('Acme Foods Ltd.', 'buyer', 'Pakistan')
+        second = resolver.resolve('ACME FOODS LTD', 'buyer', 'Pakistan')
+
+        assert first == second
+        assert TradeEntity.objects.count() == 1
+
+    def test_placeholder_resolves_to_none(self):
+        assert EntityResolver().resolve('Unknown', 'seller') is None
+        assert TradeEntity.objects.count() == 0
+
+    def test_role_flags_accumulate(self):
+        resolver = EntityResolver()
+        entity_id = resolver.resolve('Acme Foods', 'buyer', 'Pakistan')
+        resolver.resolve('Acme Foods', 'seller', 'Pakistan')
+
+        entity = TradeEntity.objects.get(pk=entity_id)
+        assert entity.is_buyer and entity.is_seller
+
+    def test_save_fills_entity_keys(self):
+        tx = Transaction.objects.create(
+            source_file='test.csv',
+            tx_reference='T-1',
+            reporting_date=date(2025, 1, 10),
+            hs_code='17.01',
+            buyer='Acme Foods',
+            seller='Unknown',
+            shipping_agent='Agent',
+            origin_country='Brazil',
+            destination_country='Pakistan',
+        )
+
+        assert tx.buyer_entity.normalized_name == 'ACME FOODS'
+        assert tx.buyer_entity.country == 'Pakistan'
+        assert tx.seller_entity_id is None
+
+    def test_renamed_party_is_re_resolved(self):
+        tx = Transaction.objects.create(
+            source_file='test.csv',
+            tx_reference='T-1',
+            reporting_date=date(2025, 1, 10),
+            hs_code='17.01',
+            buyer='Acme Fods',
+            seller='Seller A',
+            shipping_agent='Agent',
+            origin_country='Brazil',
+            destination_country='Pakistan',
+        )
+        typo_entity = tx.buyer_entity_id
+        seller_entity = tx.seller_entity_id
+
+        loaded = Transaction.objects.get(pk=tx.pk)
+        loaded.buyer = 'Acme Foods'
+        loaded.save()
+        loaded.refresh_from_db()
+        assert loaded.buyer_entity_id != typo_entity
+        assert loaded.buyer_entity.normalized_name == 'ACME FOODS'
+        assert loaded.seller_entity_id == seller_entity
+
+        loaded.seller = 'Seller B'
+        loaded.save(update_fields=['seller'])
+        assert Transaction.objects.get(pk=tx.pk).seller_entity.normalized_name == 'SELLER B'
+
+    def test_reassigned_entity_key_is_kept(self):
+        tx = Transaction.objects.create(
+            source_file='test.csv',
+            tx_reference='T-1',
+            reporting_date=date(2025, 1, 10),
+            hs_code='17.01',
+            buyer='Acme Foods',
+            seller='Seller A',
+            shipping_agent='Agent',
+        )
+        loaded = Transaction.objects.get(pk=tx.pk)
+        loaded.buyer = 'Acme Foods Karachi'
+        loaded.buyer_entity_id = tx.seller_entity_id
+        loaded.save()
+        assert Transaction.objects.get(pk=tx.pk).buyer_entity_id == tx.seller_entity_id
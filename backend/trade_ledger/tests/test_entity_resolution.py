@@ -0,0 +1,69 @@
+"""
+Tests for MinHash LSH clustering of counterparty name variants.
+
+Tests cover:
+- Resolution keys and shingling
+- LSH candidate generation and clustering of variants
+"""
+
+import numpy as np
+
+from trade_data.entity_resolution import (
+    MinHasher,
+    cluster_names,
+    jaccard,
+    lsh_candidate_pairs,
+    resolution_key,
+    shingles,
+)
+
+
+class TestResolutionKey:
+    """Normalization applied before blocking."""
+
+    def test_drops_legal_forms_and_spacing(self):
+        assert resolution_key('ABC SUGAR MILLS (PVT) LTD') == 'ABCSUGARMILLS'
+        assert resolution_key('A B C SUGAR MILLS') == 'ABCSUGARMILLS'
+
+    def test_legal_form_only_name_is_kept(self):
+        assert resolution_key('PVT LTD') == 'PVTLTD'
+
+
+class TestMinHash:
+    """Signatures approximate Jaccard similarity."""
+
+    def test_identical_sets_have_identical_signatures(self):
+        hasher = MinHasher(num_perm=32)
+        s = shingles('ABCSUGARMILLS')
+        assert np.array_equal(hasher.signature(s), hasher.signature(set(s)))
+
+    def test_signature_agreement_tracks_jaccard(self):
+        hasher = MinHasher(num_perm=256)
+        a, b = shingles('ALFALAHSUGARMILLS'), shingles('ALFALAHSUGARMILL')
+        agreement = np.mean(hasher.signature(a) == hasher.signature(b))
+        assert abs(agreement - jaccard(a, b)) < 0.15
+
+    def test_candidate_pairs_only_within_buckets(self):
+        signatures = np.array([[1, 2, 3, 4], [1, 2, 9, 9], [7, 7, 7, 7]])
+        assert lsh_candidate_pairs(signatures, bands=2) == {(0, 1)}
+
+
+class TestClusterNames:
+    """End-to-end clustering of entity names."""
+
+    def test_variants_cluster_and_distinct_names_do_not(self):
+        names = [
+            (1, 'ABC SUGAR MILLS (PVT) LTD'),
+            (2, 'A B C SUGAR MILLS'),
+            (3, 'ABC SUGAR MILLS LIMITED'),
+            (4, 'FAUJI FERTILIZER COMPANY'),
+            (5, 'ENGRO FOODS'),
+        ]
+        clusters, stats = cluster_names(names)
+
+        assert [sorted(c) for c in clusters] == [[1, 2, 3]]
+        assert stats['entities_after'] == 3
+
+    def test_empty_input(self):
+        clusters, stats = cluster_names([])
+        assert clusters == [] and stats['entities_after'] == 0
@@ -0,0 +1,221 @@
+"""
+Tests for the Explorer company aggregation.
+
+Tests cover:
+- direction="both" totals from the UNION ALL of buyer and seller sides
+- Main counterparty country and top products from the windowed query
+- Search filtering with LIKE wildcards in the search text
+- Single-direction country / top products / YoY enrichment query
+- Keyset pagination: every sort key, ties, cursors and the API response
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from trade_data.models import Product, ProductCategory, ProductItem, ProductSubCategory
+from trade_ledger.services.explorer import (
+    EXPLORER_SORTS,
+    encode_explorer_cursor,
+    get_explorer_companies,
+    get_explorer_page,
+)
+
+
+@pytest.fixture
+def items(db):
+    product = Product.objects.create(name='Sugar', hs_code='17')
+    category = ProductCategory.objects.create(product=product, name='Cane Sugar', hs_code='17.01')
+    sub_category = ProductSubCategory.objects.create(category=category, name='Raw', hs_code='17.01.1')
+    return {
+        name: ProductItem.objects.create(sub_category=sub_category, name=name)
+        for name in ('Raw Sugar', 'Refined Sugar', 'Molasses', 'Icing Sugar')
+    }
+
+
+@pytest.fixture
+def ledger(items, create_transaction):
+    create_transaction(
+        buyer='Acme Foods', seller='Bolan Mills', reporting_date=date(2025, 1, 5), origin_country='Brazil',
+        destination_country='Pakistan', qty_mt='30', usd_per_mt='400', product_item=items['Raw Sugar'],
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Crescent 100%', reporting_date=date(2024, 6, 1), origin_country='India',
+        destination_country='Pakistan', qty_mt='10', usd_per_mt='450', product_item=items['Refined Sugar'],
+    )
+    create_transaction(
+        buyer='Bolan Mills', seller='Acme Foods', reporting_date=date(2025, 1, 5), origin_country='Pakistan',
+        destination_country='UAE', qty_mt='20', usd_per_mt='410', product_item=items['Molasses'],
+    )
+    create_transaction(
+        buyer='Unknown', seller='Acme Foods', reporting_date=date(2025, 1, 5), origin_country='Pakistan',
+        destination_country='UAE', qty_mt='5', usd_per_mt='410', product_item=items['Icing Sugar'],
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Bolan Mills', reporting_date=date(2025, 1, 5), origin_country='Brazil',
+        destination_country='Pakistan', qty_mt='1', usd_per_mt='400',
+    )
+
+
+@pytest.mark.django_db
+class TestBothDirection:
+    """direction='both' aggregation."""
+
+    def test_totals(self, ledger):
+        companies = get_explorer_companies(direction='both')
+        assert [c['company'] for c in companies] == ['Acme Foods', 'Bolan Mills', 'Crescent 100%']
+
+        acme = companies[0]
+        assert acme['total_volume'] == 66.0
+        assert acme['transaction_count'] == 5
+        # Bolan Mills, Crescent 100% and the "Unknown" buyer.
+        assert acme['active_partners'] == 3
+        assert acme['avg_price'] == pytest.approx(acme['total_value'] / 66.0)
+        assert acme['first_trade'] == date(2024, 6, 1)
+        assert acme['last_trade'] == date(2025, 1, 5)
+        assert acme['yoy_growth'] is None
+
+    def test_country_and_top_products(self, ledger):
+        acme, bolan, _ = get_explorer_companies(direction='both')
+        # Brazil (31 MT bought) beats UAE (25 MT sold).
+        assert acme['country'] == 'Brazil'
+        assert acme['top_products'] == ['Raw Sugar', 'Molasses', 'Refined Sugar']
+        assert bolan['country'] == 'Pakistan'
+
+    def test_search_and_limit(self, ledger):
+        assert [c['company'] for c in get_explorer_companies(direction='both', search_query='100%')] == ['Crescent 100%']
+        assert [c['company'] for c in get_explorer_companies(direction='both', search_query='mills')] == ['Bolan Mills']
+        assert len(get_explorer_companies(direction='both', limit=2)) == 2
+
+
+@pytest.mark.django_db
+class TestSingleDirectionEnrichment:
+    """Country, top products and YoY growth for direction='import'/'export'."""
+
+    @pytest.fixture
+    def yearly(self, items, create_transaction):
+        this_year = date.today().year
+        create_transaction(
+            buyer='Acme Foods', seller='Bolan Mills', reporting_date=date(this_year, 1, 1), origin_country='Brazil',
+            destination_country='Pakistan', qty_mt='30', usd_per_mt='400', product_item=items['Raw Sugar'],
+        )
+        create_transaction(
+            buyer='Acme Foods', seller='Seller B', reporting_date=date(this_year, 1, 2), origin_country='India',
+            destination_country='Pakistan', qty_mt='10', usd_per_mt='450', product_item=items['Refined Sugar'],
+        )
+        create_transaction(
+            buyer='Acme Foods', seller='Seller C', reporting_date=date(this_year - 1, 6, 1), origin_country='India',
+            destination_country='Pakistan', qty_mt='25', usd_per_mt='450', product_item=items['Molasses'],
+        )
+        create_transaction(
+            buyer='Acme Foods', seller='Seller D', reporting_date=date(this_year - 1, 12, 31),
+            origin_country='Thailand', destination_country='Pakistan', qty_mt='4', usd_per_mt='420',
+            product_item=items['Icing Sugar'],
+        )
+        create_transaction(
+            buyer='Acme Foods', seller='Seller E', reporting_date=date(this_year - 3, 3, 1), origin_country='Thailand',
+            destination_country='Pakistan', qty_mt='50', usd_per_mt='420',
+        )
+        create_transaction(
+            buyer='Zed Traders', seller='Seller A', reporting_date=date(this_year, 2, 1), origin_country='Brazil',
+            destination_country='Pakistan', qty_mt='3', usd_per_mt='400', product_item=items['Raw Sugar'],
+        )
+        create_transaction(
+            buyer='Bolan Mills', seller='Acme Foods', reporting_date=date(this_year, 2, 1), origin_country='Pakistan',
+            destination_country='UAE', qty_mt='7', usd_per_mt='410', product_item=items['Molasses'],
+        )
+
+    def test_import_rows(self, yearly):
+        acme, _, zed = get_explorer_companies(direction='import')
+        assert acme['company'] == 'Acme Foods'
+        # Thailand 54 MT, India 35 MT, Brazil 30 MT.
+        assert acme['country'] == 'Thailand'
+        # Rows without a product item do not take a top-3 slot.
+        assert acme['top_products'] == ['Raw Sugar', 'Molasses', 'Refined Sugar']
+        # 40 MT this year against 29 MT last year.
+        assert float(acme['yoy_growth']) == pytest.approx(37.93)
+        assert zed['country'] == 'Brazil'
+        assert zed['top_products'] == ['Raw Sugar']
+        assert zed['yoy_growth'] is None
+
+    def test_export_rows(self, yearly):
+        companies = get_explorer_companies(direction='export')
+        acme = next(c for c in companies if c['company'] == 'Acme Foods')
+        assert acme['country'] == 'UAE'
+        assert acme['top_products'] == ['Molasses']
+        assert acme['yoy_growth'] is None
+
+    def test_company_without_matching_rows(self, yearly):
+        assert get_explorer_companies(direction='import', search_query='nobody') == []
+
+
+def _all_pages(direction, sort, limit):
+    names, cursor = [], None
+    while True:
+        page, cursor = get_explorer_page(direction=direction, sort=sort, cursor=cursor, limit=limit)
+        names.extend(c['company'] for c in page)
+        if cursor is None:
+            return names
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """(sort metric, company) cursors over both query paths."""
+
+    @pytest.fixture
+    def tied(self, ledger, create_transaction):
+        # Same volume as each other, so only the company name orders them.
+        create_transaction(
+            buyer='Delta Sugar', seller='Seller A', reporting_date=date(2025, 2, 1), origin_country='Brazil',
+            destination_country='Pakistan', qty_mt='8', usd_per_mt='400',
+        )
+        create_transaction(
+            buyer='Echo Sugar', seller='Seller B', reporting_date=date(2025, 2, 1), origin_country='Brazil',
+            destination_country='Pakistan', qty_mt='8', usd_per_mt='400',
+        )
+
+    @pytest.mark.parametrize('direction', ['import', 'export', 'both'])
+    @pytest.mark.parametrize('sort', list(EXPLORER_SORTS))
+    def test_pages_cover_the_full_list(self, tied, direction, sort):
+        full = [c['company'] for c in get_explorer_companies(direction=direction, sort=sort, limit=100)]
+        assert len(full) == len(set(full)) > 2
+        assert _all_pages(direction, sort, limit=1) == full
+        assert _all_pages(direction, sort, limit=2) == full
+
+    def test_sort_orders(self, tied):
+        by_volume = [c['company'] for c in get_explorer_companies(direction='import', sort='volume')]
+        assert by_volume[:4] == ['Acme Foods', 'Bolan Mills', 'Delta Sugar', 'Echo Sugar']
+        by_last_trade = [c['company'] for c in get_explorer_companies(direction='import', sort='last_trade')]
+        assert by_last_trade[:2] == ['Delta Sugar', 'Echo Sugar']
+
+    def test_only_the_page_is_enriched(self, tied):
+        page, cursor = get_explorer_page(direction='import', limit=1)
+        assert [c['company'] for c in page] == ['Acme Foods']
+        assert page[0]['country'] == 'Brazil'
+        assert isinstance(page[0]['total_volume'], float)
+        assert cursor is not None
+
+    def test_last_page_has_no_cursor(self, tied):
+        _, cursor = get_explorer_page(direction='import', limit=100)
+        assert cursor is None
+
+    def test_invalid_cursor_and_sort(self, tied):
+        cursor = encode_explorer_cursor({'company': 'Acme Foods', 'total_volume': Decimal('41')}, 'volume')
+        with pytest.raises(ValueError):
+            get_explorer_page(sort='partners', cursor=cursor)
+        with pytest.raises(ValueError):
+            get_explorer_page(cursor='not-a-cursor')
+        with pytest.raises(ValueError):
+            get_explorer_page(sort='name')
+
+    def test_api(self, api_client, tied):
+        first = api_client.get('/api/explorer/', {'sort': 'value', 'limit': 2}).json()
+        assert first['sort'] == 'value'
+        assert len(first['results']) == 2
+        second = api_client.get('/api/explorer/',
+                            {'sort': 'value', 'limit': 2, 'cursor': first['next_cursor']}).json()
+        names = [c['company'] for c in first['results'] + second['results']]
+        assert len(set(names)) == 4
+        bad = api_client.get('/api/explorer/', {'cursor': first['next_cursor'], 'sort': 'partners'})
+        assert bad.status_code == 400
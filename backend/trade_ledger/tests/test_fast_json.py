@@ -0,0 +1,103 @@
+"""
+Tests for the fast JSON encoder and renderer.
+
+Tests cover:
+- Decimal, date, set and numpy values
+- Same decoded payload on the orjson and stdlib paths
+- FastJsonResponse / FastJSONRenderer behaviour
+- Benchmark on a 5000-row explorer payload (marked slow)
+"""
+
+import json
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from django.core.serializers.json import DjangoJSONEncoder
+
+from utils import fast_json
+from utils.fast_json import FastJSONEncoder, FastJSONRenderer, FastJsonResponse, dumps
+
+
+def explorer_rows(n=5000):
+    """Rows shaped like get_explorer_companies output before float conversion."""
+    start = date(2023, 1, 1)
+    return [
+        {
+            'company': f'Company {i} (Pvt) Ltd',
+            'total_volume': Decimal(f'{i * 12.5:.4f}'),
+            'avg_price': Decimal(f'{400 + i % 97}.125000'),
+            'total_value': float(i * 5000),
+            'active_partners': i % 40,
+            'transaction_count': i % 300,
+            'first_trade': start + timedelta(days=i % 365),
+            'last_trade': start + timedelta(days=365 + i % 365),
+            'country': 'Brazil',
+            'top_products': ['Raw Sugar', 'Refined Sugar', 'Molasses'],
+            'yoy_growth': None if i % 3 else round(i / 7, 2),
+            'segment_tag': 'Bulk Importers',
+        }
+        for i in range(n)
+    ]
+
+
+class TestDumps:
+    """Encoding rules shared by both paths."""
+
+    def test_native_types(self):
+        payload = {
+            'price': Decimal('412.50'),
+            'day': date(2025, 1, 31),
+            'tags': {'a'},
+            'score': np.float32(0.5),
+            'ids': np.arange(3),
+            1: 'int key',
+        }
+        assert json.loads(dumps(payload)) == {
+            'price': 412.5, 'day': '2025-01-31', 'tags': ['a'], 'score': 0.5, 'ids': [0, 1, 2], '1': 'int key',
+        }
+
+    def test_matches_stdlib_fallback(self):
+        rows = explorer_rows(50)
+        fallback = json.dumps(rows, cls=FastJSONEncoder)
+        assert json.loads(dumps(rows)) == json.loads(fallback)
+
+    def test_response(self):
+        response = FastJsonResponse({'results': explorer_rows(2)})
+        assert response['Content-Type'] == 'application/json'
+        assert json.loads(response.content)['results'][0]['avg_price'] == 400.125
+        with pytest.raises(TypeError):
+            FastJsonResponse([1, 2])
+
+    def test_renderer(self):
+        renderer = FastJSONRenderer()
+        assert renderer.render(None) == b''
+        assert json.loads(renderer.render({'price': Decimal('1.5')})) == {'price': 1.5}
+        indented = renderer.render({'a': 1}, 'application/json; indent=2')
+        assert indented.startswith(b'{\n')
+
+
+@pytest.mark.slow
+class TestExplorerPayloadBenchmark:
+    """Serialization time of a 5000-row explorer response."""
+
+    def _best_of(self, fn, repeat=5):
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    def test_benchmark_5000_rows(self, record_property):
+        payload = {'results': explorer_rows(5000)}
+
+        stdlib = self._best_of(lambda: json.dumps(payload, cls=DjangoJSONEncoder).encode('utf-8'))
+        fast = self._best_of(lambda: dumps(payload))
+        record_property('stdlib_ms', round(stdlib * 1000, 1))
+        record_property('fast_json_ms', round(fast * 1000, 1))
+
+        if fast_json.orjson:
+            assert fast < stdlib, f"fast_json {fast * 1000:.1f} ms vs stdlib {stdlib * 1000:.1f} ms"
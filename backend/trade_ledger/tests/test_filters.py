@@ -0,0 +1,111 @@
+"""
+Tests for Transaction filtering on the denormalized product keys.
+
+Tests cover:
+- sub_category/category filled from product_item on save, only when it changed
+- apply_transaction_filters by sub-category and category
+- Data migration filling the keys on rows loaded before they existed
+"""
+
+import importlib
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trade_data.models import Product, ProductCategory, ProductItem, ProductSubCategory, Transaction
+from trade_ledger.services.filters import apply_transaction_filters
+
+
+@pytest.fixture
+def product_tree(db):
+    product = Product.objects.create(name='Sugar', hs_code='17')
+    category = ProductCategory.objects.create(product=product, name='Cane Sugar', hs_code='17.01')
+    other_category = ProductCategory.objects.create(product=product, name='Glucose', hs_code='17.02')
+    sub_category = ProductSubCategory.objects.create(category=category, name='Raw', hs_code='17.01.1')
+    other_sub_category = ProductSubCategory.objects.create(category=other_category, name='Dextrose', hs_code='17.02.1')
+    return {
+        'category': category,
+        'sub_category': sub_category,
+        'item': ProductItem.objects.create(sub_category=sub_category, name='Raw Cane Sugar'),
+        'other_item': ProductItem.objects.create(sub_category=other_sub_category, name='Dextrose Monohydrate'),
+    }
+
+
+@pytest.mark.django_db
+class TestProductKeys:
+    """Denormalized sub_category/category keys on Transaction."""
+
+    def test_save_fills_keys_from_product_item(self, product_tree, create_transaction):
+        tx = create_transaction(
+            buyer='Buyer A', seller='Seller X', reporting_date=date(2025, 1, 10), product_item=product_tree['item'],
+            hs_code='17.01.1',
+        )
+        tx.refresh_from_db()
+
+        assert tx.sub_category_id == product_tree['sub_category'].id
+        assert tx.category_id == product_tree['category'].id
+
+    def test_save_clears_keys_without_product_item(self, product_tree, create_transaction):
+        tx = create_transaction(
+            buyer='Buyer A', seller='Seller X', reporting_date=date(2025, 1, 10), product_item=product_tree['item'],
+            hs_code='17.01.1',
+        )
+        tx.product_item = None
+        tx.save()
+        tx.refresh_from_db()
+
+        assert tx.sub_category_id is None
+        assert tx.category_id is None
+
+    def test_resave_looks_up_only_a_changed_product_item(self, product_tree, create_transaction):
+        create_transaction(
+            buyer='Buyer A', seller='Seller X', reporting_date=date(2025, 1, 10), product_item=product_tree['item'],
+            hs_code='17.01.1',
+        )
+        tx = Transaction.objects.get()
+        with CaptureQueriesContext(connection) as ctx:
+            tx.save()
+        assert not any('trade_data_productitem' in query['sql'] for query in ctx.captured_queries)
+
+        tx.product_item = product_tree['other_item']
+        tx.save(update_fields=['product_item'])
+        tx.refresh_from_db()
+        assert tx.category_id == product_tree['other_item'].sub_category.category_id
+
+    def test_filters_use_denormalized_keys(self, product_tree, create_transaction):
+        create_transaction(
+            buyer='Buyer A', seller='Seller X', reporting_date=date(2025, 1, 10), product_item=product_tree['item'],
+            hs_code='17.01.1',
+        )
+        create_transaction(
+            buyer='Buyer B', seller='Seller X', reporting_date=date(2025, 1, 10),
+            product_item=product_tree['other_item'], hs_code='17.01.1',
+        )
+
+        by_sub = apply_transaction_filters(Transaction.objects.all(), product_subcategory_id=product_tree['sub_category'].id)
+        by_category = apply_transaction_filters(Transaction.objects.all(), product_category_id=product_tree['category'].id)
+
+        assert list(by_sub.values_list('buyer', flat=True)) == ['Buyer A']
+        assert list(by_category.values_list('buyer', flat=True)) == ['Buyer A']
+        assert 'trade_data_productitem' not in str(by_category.query)
+
+    def test_migration_backfills_missing_keys(self, product_tree, create_transaction):
+        create_transaction(
+            buyer='Buyer A', seller='Seller X', reporting_date=date(2025, 1, 10), product_item=product_tree['item'],
+            hs_code='17.01.1',
+        )
+        create_transaction(
+            buyer='Buyer B', seller='Seller X', reporting_date=date(2025, 1, 10),
+            product_item=product_tree['other_item'], hs_code='17.01.1',
+        )
+        Transaction.objects.update(sub_category=None, category=None)
+
+        migration = importlib.import_module('trade_data.migrations.0019_backfill_transaction_product_keys')
+        migration.backfill_product_keys(apps, SimpleNamespace(connection=connection))
+
+        by_category = apply_transaction_filters(Transaction.objects.all(), product_category_id=product_tree['category'].id)
+        assert list(by_category.values_list('buyer', flat=True)) == ['Buyer A']
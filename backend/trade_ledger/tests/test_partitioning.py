@@ -0,0 +1,113 @@
+"""
+Tests for reporting_date partitioning of the Transaction table.
+
+Tests cover:
+- Period and partition naming helpers
+- Partition bound parsing
+- Partition pruning of the supplier search and Explorer queries (PostgreSQL only)
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+
+from trade_data.partitioning import (
+    TABLE,
+    add_periods,
+    convert_to_partitioned,
+    iter_periods,
+    next_period,
+    parse_bounds,
+    partition_name,
+    period_start,
+)
+
+
+class TestPartitionHelpers:
+    """Pure helpers that do not need the database."""
+
+    def test_period_start(self):
+        assert period_start(date(2025, 3, 17), 'month') == date(2025, 3, 1)
+        assert period_start(date(2025, 3, 17), 'year') == date(2025, 1, 1)
+
+    def test_next_period_wraps_year(self):
+        assert next_period(date(2024, 12, 1), 'month') == date(2025, 1, 1)
+        assert next_period(date(2024, 1, 1), 'year') == date(2025, 1, 1)
+        assert add_periods(date(2024, 11, 1), 3, 'month') == date(2025, 2, 1)
+
+    def test_iter_periods_is_inclusive(self):
+        periods = list(iter_periods(date(2024, 11, 20), date(2025, 1, 5), 'month'))
+        assert periods == [date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1)]
+
+    def test_partition_name(self):
+        assert partition_name(date(2025, 1, 1), 'month') == f"{TABLE}_p2025_01"
+        assert partition_name(date(2025, 1, 1), 'year') == f"{TABLE}_p2025"
+
+    def test_parse_bounds(self):
+        expr = "FOR VALUES FROM ('2025-01-01') TO ('2025-02-01')"
+        assert parse_bounds(expr) == (date(2025, 1, 1), date(2025, 2, 1))
+        assert parse_bounds('DEFAULT') is None
+
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='Declarative partitioning requires PostgreSQL'
+)
+
+
+def _scanned_partitions(queryset):
+    """Partition tables named in the query's EXPLAIN output."""
+    return {
+        token.strip('(),') for token in queryset.explain().split()
+        if token.startswith(f"{TABLE}_p")
+    }
+
+
+@postgres_only
+@pytest.mark.django_db
+class TestPartitionPruning:
+    """Ledger queries only touch the partitions their filters select."""
+
+    @pytest.fixture
+    def partitioned_ledger(self):
+        from trade_data.models import Transaction
+
+        for month in (2, 3, 4):
+            for trade_type, origin, destination in (('IMPORT', 'China', 'Pakistan'), ('EXPORT', 'Pakistan', 'UAE')):
+                Transaction.objects.create(
+                    reporting_date=date(2024, month, 10),
+                    trade_type=trade_type,
+                    buyer=f'Buyer {month}',
+                    seller=f'Seller {month}',
+                    origin_country=origin,
+                    destination_country=destination,
+                    qty_mt=Decimal('10'),
+                    usd_per_mt=Decimal('500'),
+                )
+        convert_to_partitioned(granularity='month', by_trade_type=True)
+
+    def test_supplier_search_prunes_by_month_and_trade_type(self, partitioned_ledger):
+        from search.services.aggregation import SupplierAggregator
+
+        queryset, _, _ = SupplierAggregator().build_queryset(
+            [1],
+            intent='BUY',
+            scope='WORLDWIDE',
+            time_filter={'start_date': date(2024, 3, 1), 'end_date': date(2024, 3, 31)},
+        )
+        scanned = _scanned_partitions(queryset)
+
+        assert any(name.startswith(f"{TABLE}_p2024_03_import") for name in scanned)
+        assert not any('p2024_02' in name or 'p2024_04' in name for name in scanned)
+        assert not any(name.endswith('_export') for name in scanned)
+
+    def test_explorer_base_queryset_prunes_by_date(self, partitioned_ledger):
+        from trade_ledger.services.explorer import get_explorer_base_queryset
+
+        queryset = get_explorer_base_queryset(date_from=date(2024, 4, 1), date_to=date(2024, 4, 30))
+        scanned = _scanned_partitions(queryset)
+
+        assert scanned
+        assert all('p2024_04' in name for name in scanned)
+        assert queryset.count() == 2
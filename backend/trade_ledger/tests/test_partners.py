@@ -0,0 +1,67 @@
+"""
+Tests for the company partner services.
+
+Tests cover:
+- Columnar partner trends: top-N selection, month axis, gap filling
+- Filters and the partners API payload
+"""
+
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trade_ledger.services.partners import get_partner_trends
+
+
+@pytest.fixture
+def ledger(create_transaction):
+    create_transaction(
+        buyer='Acme Foods', seller='Seller A', reporting_date=date(2025, 1, 5), origin_country='Brazil', qty_mt='10',
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller A', reporting_date=date(2025, 1, 25), origin_country='Brazil', qty_mt='5',
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller A', reporting_date=date(2025, 4, 2), origin_country='Brazil', qty_mt='20',
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller B', reporting_date=date(2025, 2, 2), origin_country='India', qty_mt='30',
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller C', reporting_date=date(2025, 3, 3), origin_country='Brazil', qty_mt='2',
+    )
+    create_transaction(
+        buyer='Other Buyer', seller='Acme Foods', reporting_date=date(2025, 3, 3), origin_country='Brazil', qty_mt='99',
+    )
+
+
+@pytest.mark.django_db
+class TestPartnerTrends:
+    """get_partner_trends."""
+
+    def test_columnar_payload(self, ledger):
+        with CaptureQueriesContext(connection) as ctx:
+            trends = get_partner_trends('Acme Foods', direction='import', top_n=2)
+        assert len(ctx) == 1
+        assert trends['months'] == [date(2025, m, 1) for m in range(1, 5)]
+        assert trends['series'] == [
+            {'partner': 'Seller A', 'total_volume': 35.0, 'volume': [15.0, 0.0, 0.0, 20.0]},
+            {'partner': 'Seller B', 'total_volume': 30.0, 'volume': [0.0, 30.0, 0.0, 0.0]},
+        ]
+
+    def test_filters(self, ledger):
+        trends = get_partner_trends('Acme Foods', direction='import', country='India')
+        assert trends['months'] == [date(2025, 2, 1)]
+        assert [s['partner'] for s in trends['series']] == ['Seller B']
+
+    def test_export_direction_and_empty(self, ledger):
+        trends = get_partner_trends('Acme Foods', direction='export')
+        assert [s['partner'] for s in trends['series']] == ['Other Buyer']
+        assert get_partner_trends('Nobody') == {'months': [], 'series': []}
+
+    def test_api(self, api_client, ledger):
+        payload = api_client.get('/api/company/Acme Foods/partners/').json()['partner_trends']
+        assert payload['months'] == ['2025-01-01', '2025-02-01', '2025-03-01', '2025-04-01']
+        assert [s['partner'] for s in payload['series']] == ['Seller A', 'Seller B', 'Seller C']
@@ -0,0 +1,143 @@
+"""
+Tests for the company product services.
+
+Tests cover:
+- Batch trailing-12-month YoY growth per (company, product)
+- Product performance rows carrying YoY growth from one grouped query
+- Portfolio similarity from precomputed portfolio vectors
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trade_data.models import Product, ProductCategory, ProductEmbedding, ProductItem, ProductSubCategory
+from trade_ledger.services.products import (
+    get_company_product_performance,
+    get_portfolio_similarity,
+    get_product_yoy_growth,
+    get_yoy_growth_for_product,
+    portfolio_vectors,
+)
+from utils.data_version import bump_data_version
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def items(db):
+    product = Product.objects.create(name='Sugar', hs_code='17')
+    category = ProductCategory.objects.create(product=product, name='Cane Sugar', hs_code='17.01')
+    sub_category = ProductSubCategory.objects.create(category=category, name='Raw', hs_code='17.01.1')
+    return [ProductItem.objects.create(sub_category=sub_category, name=f'Item {i}') for i in range(3)]
+
+
+@pytest.fixture
+def ledger(items, create_transaction):
+    raw, refined, molasses = items
+    create_transaction(
+        buyer='Acme Foods', seller='Seller A', reporting_date=TODAY - timedelta(days=10), qty_mt='30', product_item=raw,
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller A', reporting_date=TODAY - timedelta(days=400), qty_mt='20',
+        product_item=raw,
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller B', reporting_date=TODAY - timedelta(days=20), qty_mt='10',
+        product_item=refined,
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller B', reporting_date=TODAY - timedelta(days=500), qty_mt='5',
+        product_item=molasses,
+    )
+    create_transaction(
+        buyer='Acme Foods', seller='Seller B', reporting_date=TODAY - timedelta(days=900), qty_mt='99',
+        product_item=molasses,
+    )  # older than both windows
+    create_transaction(
+        buyer='Bolan Mills', seller='Acme Foods', reporting_date=TODAY - timedelta(days=30), qty_mt='8',
+        product_item=raw,
+    )
+    create_transaction(
+        buyer='Bolan Mills', seller='Acme Foods', reporting_date=TODAY - timedelta(days=450), qty_mt='4',
+        product_item=raw,
+    )
+    return items
+
+
+@pytest.mark.django_db
+class TestProductYoyGrowth:
+    """get_product_yoy_growth against the single-product function."""
+
+    def test_batch_values(self, ledger):
+        raw, refined, molasses = ledger
+        growth = get_product_yoy_growth(['Acme Foods', 'Bolan Mills'], direction='import')
+        assert float(growth[('Acme Foods', raw.pk)]) == 50.0
+        assert growth[('Acme Foods', refined.pk)] is None
+        assert float(growth[('Acme Foods', molasses.pk)]) == -100.0
+        assert float(growth[('Bolan Mills', raw.pk)]) == 100.0
+
+    def test_matches_single_product(self, ledger):
+        growth = get_product_yoy_growth('Acme Foods', direction='both')
+        for item in ledger:
+            assert growth.get(('Acme Foods', item.pk)) == get_yoy_growth_for_product('Acme Foods', item.pk, 'both')
+        # Sold 8 MT vs 4 MT of raw sugar, bought 30 vs 20.
+        assert float(growth[('Acme Foods', ledger[0].pk)]) == pytest.approx(58.33)
+
+    def test_product_performance_uses_one_yoy_query(self, ledger):
+        with CaptureQueriesContext(connection) as ctx:
+            rows = get_company_product_performance('Acme Foods', direction='import')
+        assert len(ctx) <= 3
+        assert [float(r['yoy_growth']) if r['yoy_growth'] is not None else None for r in rows] == [
+            -100.0, 50.0, None,
+        ]
+
+
+@pytest.mark.django_db
+class TestPortfolioSimilarity:
+    """Portfolio vectors from the sparse volume x embedding product."""
+
+    @pytest.fixture
+    def portfolios(self, items, create_transaction):
+        raw, refined, molasses = items
+        for item, vector in ((raw, [1.0, 0.0]), (refined, [0.0, 1.0]), (molasses, [1.0, 1.0])):
+            ProductEmbedding.objects.create(product_item=item, embedding=vector)
+        create_transaction(
+            buyer='Acme Foods', seller='Seller A', reporting_date=TODAY - timedelta(days=10), qty_mt='30',
+            product_item=raw,
+        )
+        create_transaction(
+            buyer='Bolan Mills', seller='Seller B', reporting_date=TODAY - timedelta(days=10), qty_mt='10',
+            product_item=raw,
+        )
+        create_transaction(
+            buyer='Crescent', seller='Seller C', reporting_date=TODAY - timedelta(days=10), qty_mt='5',
+            product_item=refined,
+        )
+        create_transaction(
+            buyer='Delta', seller='Unknown', reporting_date=TODAY - timedelta(days=10), qty_mt='5',
+            product_item=molasses,
+        )
+        portfolio_vectors.cache_clear()
+        return items
+
+    def test_top_k(self, portfolios):
+        similar = get_portfolio_similarity('Acme Foods', top_k=4)
+        # Bolan Mills and both raw sugar sellers have the same portfolio as Acme.
+        assert {s['company'] for s in similar[:3]} == {'Bolan Mills', 'Seller A', 'Seller B'}
+        assert [s['similarity'] for s in similar[:3]] == pytest.approx([1.0, 1.0, 1.0])
+        assert similar[3]['company'] == 'Delta'
+        assert similar[3]['similarity'] == pytest.approx(2 ** -0.5, rel=1e-5)
+        assert next(s for s in similar if s['company'] == 'Bolan Mills')['total_volume'] == 10.0
+        assert 'Unknown' not in portfolio_vectors().index
+
+    def test_unknown_company(self, portfolios):
+        assert get_portfolio_similarity('Nobody') == []
+
+    def test_rebuilt_after_data_version_bump(self, portfolios):
+        store = portfolio_vectors()
+        assert portfolio_vectors() is store
+        bump_data_version('test')
+        assert portfolio_vectors() is not store
@@ -0,0 +1,134 @@
+"""
+Tests for the trade ledger response cache.
+
+Tests cover:
+- Canonical query parameters (ordering, blanks, defaults, dates, ints)
+- Hits, invalidation by the data version, non-200 responses
+- Stale-while-revalidate with the single-flight lock
+- Hit/recompute statistics
+"""
+
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import RequestFactory
+
+from trade_ledger import response_cache
+from trade_ledger.response_cache import (
+    FILTER_PARAMS,
+    cached_json,
+    canonical_params,
+    get_cache_stats,
+    parse_date,
+)
+from utils.data_version import bump_data_version
+
+factory = RequestFactory()
+calls = []
+
+
+@cached_json('test_view', params=FILTER_PARAMS, defaults={'direction': 'import'}, timeout=60, stale_ttl=600)
+def counting_view(request, company_name):
+    calls.append(company_name)
+    if company_name == 'missing':
+        return JsonResponse({'error': 'not found'}, status=404)
+    return JsonResponse({'company': company_name, 'calls': len(calls)})
+
+
+def _get(query='', company='Acme'):
+    return counting_view(factory.get(f'/company/{company}/{query}'), company_name=company)
+
+
+class TestCanonicalParams:
+    """Equivalent requests map to the same key parts."""
+
+    def test_ordering_blanks_and_defaults(self):
+        a = canonical_params({'country': 'Brazil', 'direction': 'import', 'date_from': ''}, FILTER_PARAMS,
+                             {'direction': 'import'})
+        b = canonical_params({'country': ' Brazil ', 'cache_buster': '1'}, FILTER_PARAMS,
+                             {'direction': 'import'})
+        assert a == b == (('country', 'Brazil'), ('direction', 'import'))
+
+    def test_blank_param_does_not_take_the_default(self):
+        # The view reads '' (both sides) for ?direction=, not the 'import' default.
+        blank = canonical_params({'direction': ' '}, FILTER_PARAMS, {'direction': 'import'})
+        assert blank == (('direction', ''),)
+        assert blank != canonical_params({'direction': 'import'}, FILTER_PARAMS, {'direction': 'import'})
+
+    def test_dates_and_ints(self):
+        a = canonical_params({'date_from': '2025/01/01', 'product_item_id': '007'}, FILTER_PARAMS)
+        b = canonical_params({'date_from': '2025-01-01T00:00:00', 'product_item_id': '7'}, FILTER_PARAMS)
+        assert a == b == (('date_from', '2025-01-01'), ('product_item_id', 7))
+
+    def test_unparseable_date_is_dropped(self):
+        assert canonical_params({'date_from': 'yesterday'}, FILTER_PARAMS) == ()
+        assert parse_date('yesterday') is None
+        assert parse_date('20250131').isoformat() == '2025-01-31'
+
+
+class TestCachedJson:
+    """Decorator behaviour on the LocMem cache."""
+
+    def setup_method(self):
+        calls.clear()
+
+    def test_hit_for_equivalent_request(self):
+        first = _get('?country=Brazil&direction=import')
+        second = _get('?date_from=&country=Brazil')
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT'
+        assert second.content == first.content
+        assert calls == ['Acme']
+
+        blank = _get('?direction=&country=Brazil')
+        assert blank['X-Cache'] == 'MISS'
+        assert calls == ['Acme', 'Acme']
+
+    def test_path_kwargs_are_part_of_the_key(self):
+        _get(company='Acme')
+        _get(company='Other')
+        assert calls == ['Acme', 'Other']
+
+    def test_positional_args_are_part_of_the_key(self):
+        alpha = counting_view(factory.get('/company/Alpha/'), 'Alpha')
+        beta = counting_view(factory.get('/company/Beta/'), 'Beta')
+        assert alpha['X-Cache'] == beta['X-Cache'] == 'MISS'
+        assert b'Beta' in beta.content
+        assert calls == ['Alpha', 'Beta']
+
+    def test_data_version_bump_invalidates(self):
+        _get()
+        bump_data_version('test')
+        assert _get()['X-Cache'] == 'MISS'
+        assert len(calls) == 2
+
+    def test_errors_are_not_cached(self):
+        _get(company='missing')
+        assert _get(company='missing').status_code == 404
+        assert calls == ['missing', 'missing']
+
+    def test_stale_entry_served_while_locked(self, monkeypatch):
+        first = _get()
+        clock = response_cache.time.time() + 120
+        monkeypatch.setattr(response_cache.time, 'time', lambda: clock)
+
+        # Another worker holds the recompute lock: serve the stale copy.
+        add = cache.add
+        monkeypatch.setattr(cache, 'add', lambda key, *a, **kw: False if key.endswith(':lock') else add(key, *a, **kw))
+        stale = _get()
+        assert stale['X-Cache'] == 'STALE'
+        assert stale.content == first.content
+        assert len(calls) == 1
+
+        # Lock released: the next request recomputes.
+        monkeypatch.setattr(cache, 'add', add)
+        assert _get()['X-Cache'] == 'MISS'
+        assert len(calls) == 2
+
+    def test_stats(self):
+        _get()
+        _get()
+        row = get_cache_stats()['views']['test_view']
+        assert row['hits'] == 1
+        assert row['misses'] == 1
+        assert row['recomputes'] == 1
+        assert row['hit_ratio'] == 0.5
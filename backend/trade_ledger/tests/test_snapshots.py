@@ -0,0 +1,120 @@
+"""
+Tests for the Parquet ledger snapshot helpers.
+
+Tests cover:
+- Arrow batch conversion of ORM rows
+- Partition layout and manifest round-trip
+- Partition pruning and exact date trimming on read
+- Incremental exports dropping deleted and moved rows
+"""
+
+import os
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+from trade_data.models import Transaction
+from trade_ledger.services.snapshots import (
+    month_bounds,
+    partition_dir,
+    read_ledger_snapshot,
+    read_manifest,
+    rows_to_batch,
+    snapshot_schema,
+    write_manifest,
+)
+
+
+def _row(tx_id, reporting_date, buyer='Buyer A', qty_mt=Decimal('10.5')):
+    row = {field.name: None for field in snapshot_schema()}
+    row.update({
+        'id': tx_id,
+        'reporting_date': reporting_date,
+        'buyer': buyer,
+        'seller': 'Seller X',
+        'qty_mt': qty_mt,
+        'usd': Decimal('1000.00'),
+        'product_item_id': 7,
+        'product_item_name': 'Dextrose',
+        'ingested_at': datetime(2025, 1, 1, tzinfo=timezone.utc),
+    })
+    return row
+
+
+def _write(root, trade_type, month, rows):
+    schema = snapshot_schema()
+    target = partition_dir(str(root), trade_type, month)
+    os.makedirs(target, exist_ok=True)
+    pq.write_table(pa.Table.from_batches([rows_to_batch(rows, schema)]), os.path.join(target, 'part-0.parquet'))
+
+
+class TestSnapshotHelpers:
+    """Pure helpers that do not need the database."""
+
+    def test_month_bounds_wraps_year(self):
+        assert month_bounds(date(2024, 12, 17)) == (date(2024, 12, 1), date(2025, 1, 1))
+
+    def test_rows_to_batch_converts_decimals(self):
+        batch = rows_to_batch([_row(1, date(2025, 1, 5))], snapshot_schema())
+        assert batch.num_rows == 1
+        assert batch.column('qty_mt').to_pylist() == [10.5]
+        assert 'trade_type' not in batch.schema.names
+
+    def test_manifest_round_trip(self, tmp_path):
+        assert read_manifest(str(tmp_path)) == {'watermark': None, 'partitions': {}}
+        write_manifest(str(tmp_path), {'watermark': '2025-01-01T00:00:00+00:00', 'partitions': {'IMPORT/2025-01': {'rows': 1}}})
+        assert read_manifest(str(tmp_path))['partitions']['IMPORT/2025-01']['rows'] == 1
+
+
+class TestReadLedgerSnapshot:
+    """Reading partitioned snapshots back into pandas."""
+
+    def test_missing_snapshot_returns_none(self, tmp_path):
+        assert read_ledger_snapshot(root=str(tmp_path)) is None
+
+    def test_prunes_by_trade_type_and_dates(self, tmp_path):
+        _write(tmp_path, 'IMPORT', date(2025, 1, 1), [_row(1, date(2025, 1, 5)), _row(2, date(2025, 1, 25))])
+        _write(tmp_path, 'IMPORT', date(2025, 2, 1), [_row(3, date(2025, 2, 3))])
+        _write(tmp_path, 'EXPORT', date(2025, 1, 1), [_row(4, date(2025, 1, 9))])
+        write_manifest(str(tmp_path), {'watermark': None, 'partitions': {}})
+
+        df = read_ledger_snapshot(
+            columns=['id', 'buyer', 'trade_type'],
+            trade_type='IMPORT',
+            date_from=date(2025, 1, 10),
+            date_to=date(2025, 2, 28),
+            root=str(tmp_path),
+        )
+
+        assert sorted(df['id'].tolist()) == [2, 3]
+        assert set(df['trade_type']) == {'IMPORT'}
+        assert list(df.columns) == ['id', 'buyer', 'trade_type']
+
+
+@pytest.mark.django_db
+class TestIncrementalExport:
+    """export_ledger_parquet keeps the snapshot in step with the ledger."""
+
+    def test_deleted_and_moved_rows_leave_the_snapshot(self, tmp_path, create_transaction):
+        create_transaction(buyer='Acme Foods', reporting_date=date(2025, 1, 5))
+        create_transaction(buyer='Bolan Mills', reporting_date=date(2025, 1, 20))
+        create_transaction(buyer='Crescent', reporting_date=date(2025, 2, 3))
+        call_command('export_ledger_parquet', output=str(tmp_path), stdout=StringIO())
+
+        # Neither change stamps a newer ingested_at.
+        Transaction.objects.filter(buyer='Acme Foods').delete()
+        Transaction.objects.filter(buyer='Bolan Mills').update(reporting_date=date(2025, 3, 1))
+        call_command('export_ledger_parquet', output=str(tmp_path), stdout=StringIO())
+
+        df = read_ledger_snapshot(columns=['buyer', 'reporting_date'], root=str(tmp_path))
+        assert sorted(zip(df['buyer'], df['reporting_date'])) == [
+            ('Bolan Mills', date(2025, 3, 1)),
+            ('Crescent', date(2025, 2, 3)),
+        ]
+        assert set(read_manifest(str(tmp_path))['partitions']) == {'IMPORT/2025-02', 'IMPORT/2025-03'}
@@ -0,0 +1,113 @@
+"""
+Tests for the company trend series.
+
+Tests cover:
+- Gap-filled monthly and quarterly series from one query
+- YoY / MoM / QoQ growth from LAG over the calendar
+- Product and partner breakdowns, date filter bounds
+- Monthly aggregates and raw transactions giving the same series
+"""
+
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trade_data.models import Product, ProductCategory, ProductItem, ProductSubCategory
+from trade_ledger.services.trends import get_trend_series, get_volume_price_monthly, get_yoy_growth_by_quarter
+
+
+@pytest.fixture
+def ledger(create_transaction):
+    product = Product.objects.create(name='Sugar', hs_code='17')
+    category = ProductCategory.objects.create(product=product, name='Cane Sugar', hs_code='17.01')
+    sub_category = ProductSubCategory.objects.create(category=category, name='Raw', hs_code='17.01.1')
+    raw = ProductItem.objects.create(sub_category=sub_category, name='Raw Sugar')
+    create_transaction(
+        seller='Seller A', reporting_date=date(2024, 1, 10), qty_mt='10', usd_per_mt='400', product_item=raw,
+    )
+    create_transaction(seller='Seller B', reporting_date=date(2024, 3, 5), qty_mt='20', usd_per_mt='500')
+    create_transaction(
+        seller='Seller A', reporting_date=date(2025, 1, 20), qty_mt='15', usd_per_mt='440', product_item=raw,
+    )
+    create_transaction(
+        seller='Seller A', reporting_date=date(2025, 2, 2), qty_mt='30', usd_per_mt='450', product_item=raw,
+    )
+
+
+@pytest.mark.django_db
+class TestMonthlySeries:
+    """get_volume_price_monthly."""
+
+    def test_gaps_are_filled(self, ledger):
+        with CaptureQueriesContext(connection) as ctx:
+            rows = get_volume_price_monthly('Acme Foods', direction='import')
+        ledger_queries = [q for q in ctx.captured_queries if 'aggregaterefreshstate' not in q['sql'].lower()]
+        assert len(ledger_queries) == 1
+
+        assert [r['month'] for r in rows] == [date(2024, m, 1) for m in range(1, 13)] + [date(2025, 1, 1), date(2025, 2, 1)]
+        assert [float(r['volume']) for r in rows][:4] == [10.0, 0.0, 20.0, 0.0]
+        assert rows[1]['avg_price'] is None
+        assert {r['product_name'] for r in rows} == {'All Products'}
+
+    def test_growth(self, ledger):
+        rows = {r['month']: r for r in get_volume_price_monthly('Acme Foods', direction='import')}
+        jan = rows[date(2025, 1, 1)]
+        assert jan['yoy_volume_growth'] == 50.0
+        assert jan['yoy_price_growth'] == 10.0
+        # December had no trades.
+        assert jan['mom_volume_growth'] is None
+        feb = rows[date(2025, 2, 1)]
+        assert feb['mom_volume_growth'] == 100.0
+        assert feb['yoy_volume_growth'] is None
+        assert rows[date(2024, 3, 1)]['yoy_volume_growth'] is None
+
+    def test_date_filters_bound_the_calendar(self, ledger):
+        rows = get_volume_price_monthly('Acme Foods', direction='import',
+                                        date_from=date(2024, 12, 1), date_to=date(2025, 4, 30))
+        assert [r['month'] for r in rows] == [date(2024, 12, 1)] + [date(2025, m, 1) for m in range(1, 5)]
+        assert float(rows[-1]['volume']) == 0.0
+
+    def test_breakdowns(self, ledger):
+        by_product = get_volume_price_monthly('Acme Foods', direction='import', breakdown='product')
+        assert {r['product_name'] for r in by_product} == {'Raw Sugar', 'Unassigned'}
+        assert len(by_product) == 2 * 14
+        raw_jan = next(r for r in by_product if r['product_name'] == 'Raw Sugar' and r['month'] == date(2025, 1, 1))
+        assert raw_jan['yoy_volume_growth'] == 50.0
+
+        by_partner = get_volume_price_monthly('Acme Foods', direction='import', breakdown='partner')
+        assert {r['partner'] for r in by_partner} == {'Seller A', 'Seller B'}
+
+        with pytest.raises(ValueError):
+            get_trend_series('Acme Foods', breakdown='country')
+
+    def test_no_trades(self, ledger):
+        assert get_volume_price_monthly('Nobody', direction='import') == []
+        assert get_volume_price_monthly('Nobody', direction='import', date_from=date(2025, 1, 1)) == []
+
+    def test_aggregates_match_raw_rows(self, ledger):
+        raw = get_volume_price_monthly('Acme Foods', direction='import', breakdown='product')
+        call_command('refresh_ledger_aggregates')
+        agg = get_volume_price_monthly('Acme Foods', direction='import', breakdown='product')
+        assert [(r['month'], float(r['volume']), r['yoy_volume_growth']) for r in agg] == \
+            [(r['month'], float(r['volume']), r['yoy_volume_growth']) for r in raw]
+
+
+@pytest.mark.django_db
+class TestQuarterlySeries:
+    """get_yoy_growth_by_quarter."""
+
+    def test_quarters(self, ledger):
+        rows = get_yoy_growth_by_quarter('Acme Foods', direction='import')
+        assert [(r['year'], r['quarter']) for r in rows] == [(2024, q) for q in range(1, 5)] + [(2025, 1)]
+        assert [float(r['vol']) for r in rows] == [30.0, 0.0, 0.0, 0.0, 45.0]
+        assert rows[-1]['yoy_growth'] == 50.0
+        assert rows[-1]['qoq_growth'] is None
+
+    def test_api(self, api_client, ledger):
+        response = api_client.get('/api/company/Acme Foods/trends/', {'breakdown': 'partner'})
+        assert response.status_code == 200
+        assert {r['partner'] for r in response.json()['quarterly_volume']} == {'Seller A', 'Seller B'}
+        assert api_client.get('/api/company/Acme Foods/trends/', {'breakdown': 'hs'}).status_code == 400
@@ -0,0 +1,108 @@
+"""
+Tests for binary embedding vector storage.
+
+Tests cover:
+- float32 / float16 packing and zero-copy unpacking
+- Vector column kept in sync on save
+- Bulk loading into one matrix with a single query
+- Batched backfill of rows written without a vector
+"""
+
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from trade_data.models import CompanyEmbedding, ProductEmbedding
+from trade_data.vectors import load_vectors, pack_vector, unpack_vector
+
+
+class TestPacking:
+    """Bytes layout of the vector column."""
+
+    def test_round_trip_is_zero_copy(self):
+        data = pack_vector([1.0, 0.5, -2.0])
+        assert len(data) == 12
+        view = unpack_vector(data)
+        assert view.dtype == np.float32
+        assert list(view) == [1.0, 0.5, -2.0]
+        assert view.base is data
+        assert not view.flags.writeable
+
+    def test_float16_halves_the_size(self):
+        data = pack_vector([0.1, 0.2], 'float16')
+        assert len(data) == 4
+        assert unpack_vector(data, 'float16') == pytest.approx([0.1, 0.2], abs=1e-3)
+
+    def test_empty_and_invalid(self):
+        assert pack_vector([]) is None
+        assert pack_vector({'a': 1}) is None
+        assert unpack_vector(None) is None
+
+
+@pytest.mark.django_db
+class TestModelVectors:
+    """Vector column on CompanyEmbedding / ProductEmbedding."""
+
+    def test_save_fills_vector(self):
+        emb = CompanyEmbedding.objects.create(company_name='Acme Foods', embedding=[3.0, 4.0])
+        emb.refresh_from_db()
+        assert emb.vector_dtype == 'float32'
+        assert list(emb.as_array()) == [3.0, 4.0]
+
+        emb.embedding = [1.0, 2.0]
+        emb.save(update_fields=['embedding'])
+        emb.refresh_from_db()
+        assert list(emb.as_array()) == [1.0, 2.0]
+
+    def test_float16_setting(self, settings):
+        settings.EMBEDDING_VECTOR_DTYPE = 'float16'
+        emb = CompanyEmbedding.objects.create(company_name='Acme Foods', embedding=[0.25, 0.5])
+        emb.refresh_from_db()
+        assert emb.vector_dtype == 'float16'
+        assert len(bytes(emb.vector)) == 4
+
+    def test_load_vectors_single_query(self, settings):
+        CompanyEmbedding.objects.create(company_name='A', embedding=[1.0, 0.0], cluster_tag='x')
+        settings.EMBEDDING_VECTOR_DTYPE = 'float16'
+        CompanyEmbedding.objects.create(company_name='B', embedding=[0.0, 2.0], cluster_tag='y')
+        CompanyEmbedding.objects.create(company_name='Old', embedding=[1.0, 1.0, 1.0])
+
+        with CaptureQueriesContext(connection) as ctx:
+            rows, matrix = load_vectors(CompanyEmbedding.objects.order_by('company_name'), 'company_name', 'cluster_tag')
+        assert len(ctx.captured_queries) == 1
+        assert sorted(rows) == [('A', 'x'), ('B', 'y')]
+        assert matrix.dtype == np.float32
+        assert matrix.shape == (2, 2)
+        by_name = dict(zip((name for name, _ in rows), matrix.tolist()))
+        assert by_name == {'A': [1.0, 0.0], 'B': [0.0, 2.0]}
+
+    def test_load_vectors_falls_back_to_json(self):
+        CompanyEmbedding.objects.bulk_create([CompanyEmbedding(company_name='Raw', embedding=[0.5, 0.5])])
+        rows, matrix = load_vectors(CompanyEmbedding.objects.all(), 'company_name')
+        assert rows == [('Raw',)]
+        assert matrix.tolist() == [[0.5, 0.5]]
+
+    def test_load_vectors_empty(self):
+        rows, matrix = load_vectors(ProductEmbedding.objects.all(), 'product_item_id')
+        assert rows == []
+        assert matrix.shape == (0, 0)
+
+
+@pytest.mark.django_db
+class TestBackfillCommand:
+    """backfill_embedding_vectors."""
+
+    def test_backfills_missing_and_reencodes(self):
+        CompanyEmbedding.objects.bulk_create([
+            CompanyEmbedding(company_name=f'C{i}', embedding=[float(i), 1.0]) for i in range(5)
+        ])
+        call_command('backfill_embedding_vectors', batch_size=2, stdout=StringIO())
+        assert not CompanyEmbedding.objects.filter(vector__isnull=True).exists()
+        assert list(CompanyEmbedding.objects.get(company_name='C3').as_array()) == [3.0, 1.0]
+
+        call_command('backfill_embedding_vectors', dtype='float16', all=True, stdout=StringIO())
+        assert set(CompanyEmbedding.objects.values_list('vector_dtype', flat=True)) == {'float16'}
@@ -4,6 +4,7 @@ from .pdf_export_view import export_comparison_pdf
 
 urlpatterns = [
     path('explorer/', views.explorer_api, name='explorer_api'),
+    path('explorer/export/', views.explorer_export_api, name='explorer_export_api'),
     path('company/<str:company_name>/overview/', views.company_overview_api),
     path('company/<str:company_name>/products/', views.company_products_api),
     path('company/<str:company_name>/partners/', views.company_partners_api),
@@ -21,4 +22,6 @@ urlpatterns = [
     path('predict/sellers/<str:buyer_name>/', views.predict_sellers_api, name='predict_sellers'),
     path('predict/buyers/<str:seller_name>/', views.predict_buyers_api, name='predict_buyers'),
     path('predict/methods/', views.link_prediction_methods_api, name='link_prediction_methods'),
+
+    path('cache-stats/', views.cache_stats_api, name='ledger_cache_stats'),
 ]
\ No newline at end of file
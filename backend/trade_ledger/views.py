@@ -1,33 +1,35 @@
-from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.cache import cache_page
 import json
-from .services.explorer import get_explorer_companies
+from .services.explorer import get_explorer_page, iter_explorer_companies
 from .services.company import get_company_overview_metrics
 from .services.products import get_company_product_performance, get_avg_price_trend_monthly, get_volume_share, get_co_traded_products, get_product_clusters
 from .services.partners import get_top_partners, get_trade_volume_by_country, get_partner_trends, get_product_mix_per_partner
-from .services.trends import get_volume_price_monthly, get_yoy_growth_by_quarter
+from .services.trends import TREND_BREAKDOWNS, get_volume_price_monthly, get_yoy_growth_by_quarter
 from .services.compare import get_company_comparison_metrics
 from trade_data.models import CompanyEmbedding, ProductEmbedding, Transaction  
+from .response_cache import FILTER_PARAMS, cached_json, get_cache_stats, parse_date
+from utils.conditional import conditional_on_data_version
+from utils.fast_json import FastJsonResponse
+from utils.streaming_export import EXPORT_FORMATS, export_response
 
 
 
 def _parse_date(date_str):
-    if not date_str:
-        return None
-    from datetime import datetime
-    try:
-        return datetime.strptime(date_str, '%Y-%m-%d').date()
-    except:
-        return None
+    return parse_date(date_str)
 
 
 
 
 
-@cache_page(60 * 15)  
+@conditional_on_data_version
+@cached_json('explorer', params=FILTER_PARAMS + ('search', 'limit', 'sort', 'cursor'),
+             defaults={'direction': 'import', 'limit': 1000, 'sort': 'volume'})
 def explorer_api(request):
+    """
+    Explorer table, one page at a time: ``sort`` (volume|value|partners|last_trade),
+    ``limit`` rows per page (max 5000) and ``cursor`` = the previous page's ``next_cursor``.
+    """
     direction = request.GET.get('direction', 'import')
     date_from = _parse_date(request.GET.get('date_from'))
     date_to = _parse_date(request.GET.get('date_to'))
@@ -36,20 +38,27 @@ def explorer_api(request):
     product_subcategory_id = request.GET.get('product_subcategory_id')
     product_item_id = request.GET.get('product_item_id')
     search_query = request.GET.get('search')
-    
-    limit = min(int(request.GET.get('limit', 1000)), 5000)
+    sort = request.GET.get('sort') or 'volume'
+    cursor = request.GET.get('cursor') or None
 
-    companies = get_explorer_companies(
-        direction=direction,
-        date_from=date_from,
-        date_to=date_to,
-        country=country,
-        product_category_id=product_category_id,
-        product_subcategory_id=product_subcategory_id,
-        product_item_id=product_item_id,
-        search_query=search_query,
-        limit=limit
-    )
+    limit = max(min(int(request.GET.get('limit', 1000)), 5000), 1)
+
+    try:
+        companies, next_cursor = get_explorer_page(
+            direction=direction,
+            date_from=date_from,
+            date_to=date_to,
+            country=country,
+            product_category_id=product_category_id,
+            product_subcategory_id=product_subcategory_id,
+            product_item_id=product_item_id,
+            search_query=search_query,
+            sort=sort,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as exc:
+        return FastJsonResponse({"error": str(exc)}, status=400)
 
     
     company_names = [c['company'] for c in companies]
@@ -60,17 +69,80 @@ def explorer_api(request):
     for c in companies:
         c['segment_tag'] = embedding_map.get(c['company'], "Other")
 
-    return JsonResponse({"results": companies})
+    return FastJsonResponse({"results": companies, "sort": sort, "next_cursor": next_cursor})
+
+
+
+EXPLORER_EXPORT_COLUMNS = [
+    ('company', 'Company'),
+    ('country', 'Main Counterparty Country'),
+    ('total_volume', 'Total Volume (MT)'),
+    ('total_value', 'Total Value (USD)'),
+    ('avg_price', 'Avg Price (USD/MT)'),
+    ('active_partners', 'Active Partners'),
+    ('transaction_count', 'Transactions'),
+    ('first_trade', 'First Trade'),
+    ('last_trade', 'Last Trade'),
+    ('yoy_growth', 'YoY Growth (%)'),
+    ('top_products', 'Top Products'),
+    ('segment_tag', 'Segment'),
+]
+
+
+def _with_segment_tags(companies, batch_size=2000):
+    """Adds the GNN segment tag to streamed explorer rows, one lookup per batch."""
+    batch = []
+    for company in companies:
+        batch.append(company)
+        if len(batch) >= batch_size:
+            yield from _tag_batch(batch)
+            batch = []
+    if batch:
+        yield from _tag_batch(batch)
+
+
+def _tag_batch(batch):
+    embedding_map = dict(
+        CompanyEmbedding.objects.filter(company_name__in=[c['company'] for c in batch])
+        .values_list('company_name', 'cluster_tag')
+    )
+    for c in batch:
+        c['segment_tag'] = embedding_map.get(c['company'], "Other")
+        yield c
+
 
+def explorer_export_api(request):
+    """Explorer table as a streaming CSV (default) or XLSX download, without the row limit."""
+    fmt = request.GET.get('fmt', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return FastJsonResponse({"error": f"fmt must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+
+    direction = request.GET.get('direction', 'import')
+    companies = iter_explorer_companies(
+        direction=direction,
+        date_from=_parse_date(request.GET.get('date_from')),
+        date_to=_parse_date(request.GET.get('date_to')),
+        country=request.GET.get('country'),
+        product_category_id=request.GET.get('product_category_id'),
+        product_subcategory_id=request.GET.get('product_subcategory_id'),
+        product_item_id=request.GET.get('product_item_id'),
+        search_query=request.GET.get('search'),
+    )
+    return export_response(
+        _with_segment_tags(companies),
+        EXPLORER_EXPORT_COLUMNS,
+        filename=f"explorer_{direction}",
+        fmt=fmt,
+        sheet_title='Explorer',
+    )
 
 
 
 
-@cache_page(60 * 60)  
+@conditional_on_data_version
+@cached_json('company_overview', params=FILTER_PARAMS, defaults={'direction': 'import'}, timeout=6 * 60 * 60)
 def company_overview_api(request, company_name):
     from .services.gnn import get_similar_companies
-    from trade_data.models import Transaction
-    from django.db.models import Sum
     
     direction = request.GET.get('direction', 'import')
     date_from = _parse_date(request.GET.get('date_from'))
@@ -113,24 +185,6 @@ def company_overview_api(request, company_name):
         metrics['similar_companies'] = []
     
     
-    company_field = 'buyer' if direction == 'import' else 'seller'
-    country_dist_qs = (
-        Transaction.objects.filter(**{company_field: company_name})
-        .values('country')
-        .annotate(volume=Sum('qty_mt'), value=Sum('usd'))
-        .order_by('-volume')[:10]
-    )
-    metrics['country_distribution'] = [
-        {
-            'name': row['country'] or 'Unknown',
-            'volume': float(row['volume'] or 0),
-            'value': float(row['value'] or 0)
-        }
-        for row in country_dist_qs
-    ]
-    
-    
-    
     if 'top_products' in metrics:
         
         metrics['products'] = [
@@ -154,13 +208,15 @@ def company_overview_api(request, company_name):
     metrics['total_volume'] = metrics.get('total_volume_mt', 0)
     metrics['total_partners'] = metrics.get('active_partners', 0)
 
-    return JsonResponse(metrics)
+    return FastJsonResponse(metrics)
 
 
 
 
 
 
+@conditional_on_data_version
+@cached_json('company_products', params=FILTER_PARAMS, defaults={'direction': 'import'}, timeout=6 * 60 * 60)
 def company_products_api(request, company_name):
     direction = request.GET.get('direction', 'import')
     date_from = _parse_date(request.GET.get('date_from'))
@@ -210,7 +266,7 @@ def company_products_api(request, company_name):
     
     product_clusters = get_product_clusters(company_name, direction)
 
-    return JsonResponse({
+    return FastJsonResponse({
         "product_performance": performance,
         "avg_price_trend": price_trend,
         "volume_share": volume_share,
@@ -222,7 +278,8 @@ def company_products_api(request, company_name):
 
 
 
-@cache_page(60 * 60)  
+@conditional_on_data_version
+@cached_json('company_partners', params=FILTER_PARAMS, defaults={'direction': 'import'}, timeout=6 * 60 * 60)
 def company_partners_api(request, company_name):
     direction = request.GET.get('direction', 'import')
     date_from = _parse_date(request.GET.get('date_from'))
@@ -246,14 +303,14 @@ def company_partners_api(request, company_name):
         country=country
     ))
 
-    partner_trends = list(get_partner_trends(
+    partner_trends = get_partner_trends(
         company_name=company_name,
         direction=direction,
         date_from=date_from,
         date_to=date_to,
         country=country,
-        limit=5
-    ))
+        top_n=5
+    )
 
     product_mix = {}
     for partner in top_partners[:3]:
@@ -268,7 +325,7 @@ def company_partners_api(request, company_name):
         ))
         product_mix[partner_name] = mix
 
-    return JsonResponse({
+    return FastJsonResponse({
         "top_partners": top_partners,
         "trade_volume_by_country": trade_by_country,
         "partner_trends": partner_trends,
@@ -280,29 +337,41 @@ def company_partners_api(request, company_name):
 
 
 
+@conditional_on_data_version
+@cached_json('company_trends', params=FILTER_PARAMS + ('breakdown',), defaults={'direction': 'import'}, timeout=6 * 60 * 60)
 def company_trends_api(request, company_name):
+    """
+    Gap-filled monthly and quarterly series with YoY / MoM / QoQ growth;
+    ``breakdown=product|partner`` splits them into one series per key.
+    """
     direction = request.GET.get('direction', 'import')
     date_from = _parse_date(request.GET.get('date_from'))
     date_to = _parse_date(request.GET.get('date_to'))
     country = request.GET.get('country')
+    breakdown = request.GET.get('breakdown') or None
 
-    volume_price = list(get_volume_price_monthly(
+    if breakdown is not None and breakdown not in TREND_BREAKDOWNS:
+        return FastJsonResponse({"error": f"breakdown must be one of {', '.join(TREND_BREAKDOWNS)}"}, status=400)
+
+    volume_price = get_volume_price_monthly(
         company_name=company_name,
         direction=direction,
+        breakdown=breakdown,
         date_from=date_from,
         date_to=date_to,
         country=country
-    ))
+    )
 
-    quarterly = list(get_yoy_growth_by_quarter(
+    quarterly = get_yoy_growth_by_quarter(
         company_name=company_name,
         direction=direction,
+        breakdown=breakdown,
         date_from=date_from,
         date_to=date_to,
         country=country
-    ))
+    )
 
-    return JsonResponse({
+    return FastJsonResponse({
         "volume_price_trend": volume_price,
         "quarterly_volume": quarterly
     })
@@ -313,6 +382,7 @@ def company_trends_api(request, company_name):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@cached_json('compare', params=('companies', 'direction', 'date_from', 'date_to', 'country'), defaults={'direction': 'import'}, from_body=True)
 def compare_companies_api(request):
     from .services.compare import get_company_comparison_metrics
     
@@ -324,10 +394,10 @@ def compare_companies_api(request):
         date_to = _parse_date(data.get('date_to'))
         country = data.get('country')
     except:
-        return JsonResponse({"error": "Invalid JSON"}, status=400)
+        return FastJsonResponse({"error": "Invalid JSON"}, status=400)
 
     if len(company_names) < 2:
-        return JsonResponse({"error": "Select at least 2 companies"}, status=400)
+        return FastJsonResponse({"error": "Select at least 2 companies"}, status=400)
 
     
     metrics = get_company_comparison_metrics(
@@ -348,7 +418,7 @@ def compare_companies_api(request):
     
     result = {'companies': companies_data}
 
-    return JsonResponse(result)
+    return FastJsonResponse(result)
 
 
 
@@ -357,46 +427,56 @@ def compare_companies_api(request):
 
 
 
+@conditional_on_data_version
+@cached_json('similar_companies', timeout=24 * 60 * 60)
 def similar_companies_api(request, company_name):
     """Explorer → Peer company recommendation (uses fuzzy matching for company names)"""
-    from .services.gnn import get_similar_companies
+    from .services.gnn import find_company_candidates, get_similar_companies
     similar = get_similar_companies(company_name, top_k=4)
-    return JsonResponse({"similar_companies": similar})
+    payload = {"similar_companies": similar}
+    if not similar:
+        payload["did_you_mean"] = find_company_candidates(company_name)
+    return FastJsonResponse(payload)
 
 
 
 
 def potential_partners_api(request, company_name):
     """Overview → Link prediction (same as similar companies)"""
-    return similar_companies_api(request, company_name)
+    return similar_companies_api(request, company_name=company_name)
 
 
 
 
+@conditional_on_data_version
+@cached_json('network_influence', timeout=24 * 60 * 60)
 def network_influence_api(request, company_name):
     """Overview → Centrality metrics"""
     try:
         emb = CompanyEmbedding.objects.get(company_name=company_name)
-        return JsonResponse({
+        return FastJsonResponse({
             "pagerank": float(emb.pagerank),
             "degree": emb.degree
         })
     except CompanyEmbedding.DoesNotExist:
-        return JsonResponse({"pagerank": 0.0, "degree": 0})
+        return FastJsonResponse({"pagerank": 0.0, "degree": 0})
 
 
-@cache_page(60 * 60 * 24)  
+@conditional_on_data_version
+@cached_json('product_clusters', timeout=24 * 60 * 60)
 def product_clusters_api(request):
     """Products → Latent category cards"""
     clusters = list(
         ProductEmbedding.objects.values_list('cluster_tag', flat=True).distinct()
     )
-    return JsonResponse({"clusters": clusters})
+    return FastJsonResponse({"clusters": clusters})
 
 
 
 
 
+@conditional_on_data_version
+@cached_json('predict_sellers', params=('method', 'top_k'), defaults={'method': 'combined', 'top_k': 10}, timeout=24 * 60 * 60)
 def predict_sellers_api(request, buyer_name):
     """
     Predict potential sellers for a buyer.
@@ -429,9 +509,11 @@ def predict_sellers_api(request, buyer_name):
     else:  
         result = predict_sellers_combined(buyer_name, top_k)
     
-    return JsonResponse(result)
+    return FastJsonResponse(result)
 
 
+@conditional_on_data_version
+@cached_json('predict_buyers', params=('method', 'top_k'), defaults={'method': 'combined', 'top_k': 10}, timeout=24 * 60 * 60)
 def predict_buyers_api(request, seller_name):
     """
     Predict potential buyers for a seller.
@@ -458,7 +540,7 @@ def predict_buyers_api(request, seller_name):
     else:  
         result = predict_buyers_combined(seller_name, top_k)
     
-    return JsonResponse(result)
+    return FastJsonResponse(result)
 
 
 def link_prediction_methods_api(request):
@@ -495,4 +577,9 @@ def link_prediction_methods_api(request):
             "description": "Aggregates scores from all methods for best results"
         }
     ]
-    return JsonResponse({"methods": methods})
\ No newline at end of file
+    return FastJsonResponse({"methods": methods})
+
+
+def cache_stats_api(request):
+    """Response cache hit ratios and recompute times per endpoint."""
+    return FastJsonResponse(get_cache_stats())
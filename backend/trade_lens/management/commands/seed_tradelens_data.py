@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from django.core.management.base import BaseCommand
 from trade_lens.models import TradeLensProduct, TradeLensTransaction
+from utils.data_version import bump_data_version
 
 
 class Command(BaseCommand):
@@ -224,6 +225,8 @@ class Command(BaseCommand):
         if transactions:
             TradeLensTransaction.objects.bulk_create(transactions)
         
+        bump_data_version('seed_tradelens_data')
+
         total_products = TradeLensProduct.objects.count()
         total_transactions = TradeLensTransaction.objects.count()
         
@@ -1,11 +1,14 @@
 from django.db.models import Avg, Sum, Count, F
 from django.db.models.functions import TruncMonth, ExtractYear, ExtractMonth
+from django.utils.decorators import method_decorator
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
 
+from utils.conditional import conditional_on_data_version
+
 from .models import TradeLensProduct, TradeLensTransaction
 from .serializers import (
     TradeLensProductSerializer,
@@ -24,7 +27,17 @@ class TradeLensProductViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = TradeLensProductSerializer
     permission_classes = [IsAuthenticated]
 
+    # Handlers run after authentication, so 304s are only sent to signed-in users.
+    @method_decorator(conditional_on_data_version)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(conditional_on_data_version)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=True, methods=['get'])
+    @method_decorator(conditional_on_data_version)
     def overview(self, request, pk=None):
         """Overview stats: avg price, supply chain flow, provinces, ports"""
         product = self.get_object()
@@ -88,6 +101,7 @@ class TradeLensProductViewSet(viewsets.ReadOnlyModelViewSet):
         })
 
     @action(detail=True, methods=['get'])
+    @method_decorator(conditional_on_data_version)
     def summary(self, request, pk=None):
         """Summary: filters, total qty, top buyers/sellers"""
         product = self.get_object()
@@ -160,6 +174,7 @@ class TradeLensProductViewSet(viewsets.ReadOnlyModelViewSet):
         })
 
     @action(detail=True, methods=['get'])
+    @method_decorator(conditional_on_data_version)
     def comparison(self, request, pk=None):
         """Comparison: price trends, country comparisons"""
         product = self.get_object()
@@ -234,6 +249,7 @@ class TradeLensProductViewSet(viewsets.ReadOnlyModelViewSet):
         })
 
     @action(detail=True, methods=['get'])
+    @method_decorator(conditional_on_data_version)
     def details(self, request, pk=None):
         """Details: paginated transaction table"""
         product = self.get_object()
@@ -270,6 +286,7 @@ class TradeLensProductViewSet(viewsets.ReadOnlyModelViewSet):
         return paginator.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['get'])
+    @method_decorator(conditional_on_data_version)
     def global_view(self, request, pk=None):
         """Global view: trade distribution by country for map"""
         product = self.get_object()
@@ -0,0 +1,52 @@
+"""
+Conditional GET (ETag / Last-Modified, 304 Not Modified) for read-only
+analytics endpoints, derived from the ledger data version.
+
+The validators cost one cache read: the ETag hashes the data version with the
+request path, query string and Accept header, and Last-Modified is the time of
+the last data version bump. A client that polls with ``If-None-Match`` /
+``If-Modified-Since`` gets an empty 304 until the next load, without the view
+running or its JSON being serialized.
+
+Usage:
+    @conditional_on_data_version
+    def explorer_api(request): ...
+
+    class MyViewSet(viewsets.ViewSet):
+        @method_decorator(conditional_on_data_version)
+        def list(self, request): ...
+
+Only use it on GET endpoints whose response depends on nothing but ledger
+data and the request URL (not on the user).
+"""
+
+import hashlib
+from datetime import datetime, timezone
+
+from django.views.decorators.http import condition
+
+from utils.data_version import get_data_version_info
+
+
+def data_version_etag(request, *args, **kwargs):
+    version, _ = get_data_version_info()
+    fingerprint = '|'.join((
+        str(version),
+        request.path,
+        request.META.get('QUERY_STRING', ''),
+        request.META.get('HTTP_ACCEPT', ''),
+    ))
+    return hashlib.md5(fingerprint.encode('utf-8')).hexdigest()
+
+
+def data_version_last_modified(request, *args, **kwargs):
+    _, bumped_at = get_data_version_info()
+    if bumped_at is None:
+        return None
+    return datetime.fromtimestamp(bumped_at, tz=timezone.utc)
+
+
+conditional_on_data_version = condition(
+    etag_func=data_version_etag,
+    last_modified_func=data_version_last_modified,
+)
@@ -0,0 +1,105 @@
+"""
+Global ledger data version, kept in the default cache backend.
+
+Every command that loads or rewrites ledger data (ingestion, imports,
+embedding/index builds, aggregate refreshes, backfills) calls
+``bump_data_version()`` once it has finished. Anything cached under a key
+built by ``versioned_cache_key()`` is therefore unreachable after the next
+load, so cached results can use long TTLs without ever being served stale.
+
+The bump must happen after the writes are committed (inside an ``atomic()``
+block, register it with ``transaction.on_commit``): a bump before the commit
+lets a concurrent request cache the old rows under the new version, where
+they would stay until the next load.
+
+``per_data_version`` memoizes an expensive in-process build (matrices,
+indexes) until the next bump, for results too large to round-trip through
+the cache on every request.
+
+The counter is seeded from the current time in microseconds, so it keeps
+increasing even if the cache is flushed or Redis restarts between loads.
+With the LocMem fallback each process has its own counter; that is fine for
+a single dev server but production should run with Redis.
+"""
+
+import functools
+import hashlib
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger('zarailink')
+
+DATA_VERSION_KEY = 'ledger:data_version'
+DATA_VERSION_BUMPED_AT_KEY = 'ledger:data_version:bumped_at'
+
+
+def _seed():
+    return time.time_ns() // 1000
+
+
+def get_data_version():
+    """Current data version; initialised on first use."""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, _seed(), timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def bump_data_version(reason=None):
+    """Advances the data version and returns the new value."""
+    try:
+        version = cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        # Key missing (first run or cache flushed): start from a fresh seed,
+        # which is always ahead of any version handed out before.
+        version = _seed()
+        if not cache.add(DATA_VERSION_KEY, version, timeout=None):
+            version = cache.incr(DATA_VERSION_KEY)
+    cache.set(DATA_VERSION_BUMPED_AT_KEY, time.time(), timeout=None)
+    logger.info(f"Ledger data version bumped to {version}" + (f" ({reason})" if reason else ""))
+    return version
+
+
+def get_data_version_info():
+    """(version, unix timestamp of the last bump or None)."""
+    return get_data_version(), cache.get(DATA_VERSION_BUMPED_AT_KEY)
+
+
+def versioned_cache_key(namespace, *parts):
+    """
+    Cache key for ``namespace`` and ``parts`` under the current data version.
+
+    >>> versioned_cache_key('explorer', 'import', '2025-01-01')  # doctest: +SKIP
+    'explorer:v1729339200000000:3f1c...'
+    """
+    digest = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+    return f"{namespace}:v{get_data_version()}:{digest}"
+
+
+def per_data_version(build):
+    """
+    Decorator for a no-argument ``build()`` whose result is kept in this
+    process until the data version changes; concurrent callers wait for one
+    rebuild instead of each running it. ``.cache_clear()`` drops the result.
+    """
+    lock = threading.Lock()
+    state = {}
+
+    @functools.wraps(build)
+    def wrapper():
+        version = get_data_version()
+        entry = state.get('entry')
+        if entry is None or entry[0] != version:
+            with lock:
+                entry = state.get('entry')
+                if entry is None or entry[0] != version:
+                    entry = (version, build())
+                    state['entry'] = entry
+        return entry[1]
+
+    wrapper.cache_clear = state.clear
+    return wrapper
@@ -0,0 +1,91 @@
+"""
+Fast JSON encoding for large analytics payloads.
+
+Uses orjson when it is installed: it serializes dates, datetimes, UUIDs and
+numpy values natively and is several times faster than the stdlib encoder on
+row-heavy responses (see trade_ledger/tests/test_fast_json.py). Without orjson
+everything falls back to the stdlib encoder with the same output rules.
+
+- ``dumps(data)`` -> UTF-8 bytes
+- ``FastJsonResponse`` drop-in for ``JsonResponse``
+- ``FastJSONRenderer`` drop-in for DRF's ``JSONRenderer``
+
+Decimals are written as JSON numbers (like DRF's encoder does), not as the
+strings ``DjangoJSONEncoder`` produces.
+"""
+
+import json
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.utils.encoders import JSONEncoder as DRFJSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+_fallback_encoder = DRFJSONEncoder()
+
+
+def _default(obj):
+    """Types orjson does not handle itself (Decimal, sets, lazy strings, querysets...)."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return _fallback_encoder.default(obj)
+
+
+class FastJSONEncoder(DjangoJSONEncoder):
+    """Stdlib fallback with the same Decimal handling as the orjson path."""
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        try:
+            return super().default(obj)
+        except TypeError:
+            return _fallback_encoder.default(obj)
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+    def dumps(data):
+        return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+else:
+    def dumps(data):
+        return json.dumps(data, cls=FastJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJsonResponse(HttpResponse):
+    """``JsonResponse`` with the fast encoder. Same ``safe`` semantics."""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    DRF renderer using ``dumps``. Indented output (browsable API,
+    ``Accept: application/json; indent=4``) still goes through the parent class.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
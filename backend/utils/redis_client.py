@@ -105,47 +105,29 @@ class RedisClient:
     def _inmemory_search(cls, query_embedding, top_k=5):
         """Fallback in-memory vector search using database embeddings."""
         try:
-            from trade_data.models import CompanyEmbedding
             from companies.models import Company
-            from sklearn.metrics.pairwise import cosine_similarity
+            from trade_ledger.services.embedding_store import get_company_embedding_store
             
-            
-            all_embeddings = list(CompanyEmbedding.objects.all().values('company_name', 'embedding'))
-            if not all_embeddings:
+            store = get_company_embedding_store()
+            if not len(store):
                 logger.warning("No company embeddings found in database")
                 return []
             
-            
-            names = []
-            vectors = []
-            for emb in all_embeddings:
-                names.append(emb['company_name'])
-                vectors.append(emb['embedding'])
-            
-            vectors = np.array(vectors)
-            query_vec = np.array(query_embedding).reshape(1, -1)
-            
-            
-            similarities = cosine_similarity(query_vec, vectors)[0]
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
-            
-            
             results = []
-            for i in top_indices:
-                company_name = names[i]
+            for company_name, score, _ in store.nearest(query_embedding, top_k):
                 
                 company = Company.objects.filter(name__icontains=company_name).first()
                 if company:
                     results.append({
                         'id': str(company.id),
-                        'score': float(similarities[i]),
+                        'score': score,
                         'name': company_name
                     })
                 else:
                     
                     results.append({
                         'id': company_name,  
-                        'score': float(similarities[i]),
+                        'score': score,
                         'name': company_name
                     })
             
@@ -144,6 +144,42 @@ else:
 OPENAI_API_KEY = os.getenv('OPENAI_KEY', '')
 
 
+# Parquet snapshots of the trade ledger for offline jobs (export_ledger_parquet)
+LEDGER_SNAPSHOT_DIR = os.getenv('LEDGER_SNAPSHOT_DIR', str(BASE_DIR / 'ledger_snapshots'))
+
+# Range partitioning of the Transaction table by reporting_date (manage_ledger_partitions)
+LEDGER_PARTITIONING = {
+    'granularity': os.getenv('LEDGER_PARTITION_GRANULARITY', 'month'),
+    'by_trade_type': os.getenv('LEDGER_PARTITION_BY_TRADE_TYPE', 'False') == 'True',
+    'premake': int(os.getenv('LEDGER_PARTITION_PREMAKE', '3')),
+}
+
+# Storage precision of the binary CompanyEmbedding / ProductEmbedding vector column
+# (trade_data/vectors.py): 'float32', or 'float16' for half the size.
+EMBEDDING_VECTOR_DTYPE = os.getenv('EMBEDDING_VECTOR_DTYPE', 'float32')
+
+
+REST_FRAMEWORK = {
+    # orjson-backed JSON (utils/fast_json.py); falls back to the stdlib encoder when orjson is missing.
+    'DEFAULT_RENDERER_CLASSES': [
+        'utils.fast_json.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+
+# Trade ledger API response cache (trade_ledger/response_cache.py). Keys carry
+# the data version, so entries only need to expire to bound memory use.
+LEDGER_RESPONSE_CACHE = {
+    'ENABLED': os.getenv('LEDGER_RESPONSE_CACHE_ENABLED', 'True') == 'True',
+    # Seconds an expired entry may still be served while one request recomputes it.
+    'STALE_TTL': int(os.getenv('LEDGER_RESPONSE_CACHE_STALE_TTL', str(24 * 60 * 60))),
+    # Single-flight lock lifetime, and how long a cold miss waits for another worker's result.
+    'LOCK_TIMEOUT': int(os.getenv('LEDGER_RESPONSE_CACHE_LOCK_TIMEOUT', '30')),
+    'LOCK_WAIT': float(os.getenv('LEDGER_RESPONSE_CACHE_LOCK_WAIT', '5')),
+}
+
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,